@@ -0,0 +1,139 @@
+"""
+Benchmark da Exportação de Registros
+Mede tempo e pico de memória das exportações em streaming
+
+Uso:
+    python benchmarks/bench_exportacao.py --registros 1000000 --formatos csv xlsx pdf
+
+Gera um banco sintético com o número pedido de registros e exporta todos
+pelo mesmo caminho usado pela janela de registros (ler_registros_em_lotes
++ exportador do formato). Cada exportação roda em um processo próprio, que
+informa quanto o pico de memória residente cresceu durante a exportação;
+esse valor deve ficar estável qualquer que seja o número de registros
+no CSV e no XLSX. No PDF o tempo por página é constante, mas o reportlab
+mantém as páginas na memória até gravar o arquivo.
+O pico só é medido em sistemas com o módulo resource (Linux/macOS).
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.relatorios import EXPORTADORES, InfoRelatorio
+from database.conexoes import ConfiguracaoBanco
+from database.models import Database, FiltroRegistros
+
+
+def popular(db: Database, registros: int, alunos: int, semente: int) -> date:
+    """
+    Gera alunos e registros distribuídos pelos dias anteriores a hoje
+
+    Returns:
+        Primeiro dia com registros
+    """
+    rng = random.Random(semente)
+    cursor = db.conn.cursor()
+    cursor.executemany(
+        'INSERT INTO alunos (matricula, nome, turma) VALUES (?, ?, ?)',
+        ((f"{i:06d}", f"Aluno {i}", f"{i % 12 + 1}º ano") for i in range(alunos))
+    )
+
+    # Duas passagens (entrada e saída) por aluno e por dia
+    dias = max(1, registros // (alunos * 2))
+    inicio = date.today() - timedelta(days=dias)
+
+    def linhas():
+        for n in range(registros):
+            dia = inicio + timedelta(days=n // (alunos * 2))
+            base = datetime.combine(dia, datetime.min.time())
+            entrada = (n // alunos) % 2 == 0
+            hora = timedelta(hours=7 if entrada else 12, seconds=rng.randrange(3600))
+            yield (n % alunos + 1, 'entrada' if entrada else 'saida', base + hora, 95.0, 0)
+
+    cursor.executemany(
+        'INSERT INTO registros (aluno_id, tipo, data_hora, confianca, manual) VALUES (?, ?, ?, ?, ?)',
+        linhas()
+    )
+    db.conn.commit()
+    return inicio
+
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo em MB (None se indisponível)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+
+
+def exportar(db_path: str, filtro: FiltroRegistros, formato: str, arquivo: str, lote: int, resultado):
+    """Executa uma exportação (em um processo próprio) e devolve as medidas pela fila"""
+    # Sem mmap: as páginas do banco mapeadas contariam como memória residente
+    db = Database(db_path, ConfiguracaoBanco(mmap_mb=0))
+    info = InfoRelatorio(escola="Escola de Teste", titulo="Benchmark de exportação",
+                         rodape=["Guardião Escolar"])
+    total = db.contar_registros(filtro)
+    antes = pico_memoria_mb()
+
+    inicio = time.perf_counter()
+    escritas = EXPORTADORES[formato](db.ler_registros_em_lotes(filtro, lote), arquivo, info, total)
+    duracao = time.perf_counter() - inicio
+
+    depois = pico_memoria_mb()
+    db.close()
+    resultado.put((escritas, duracao, None if antes is None else depois - antes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação de registros")
+    parser.add_argument("--registros", type=int, default=1_000_000, help="Registros no banco")
+    parser.add_argument("--alunos", type=int, default=1000, help="Alunos na escola")
+    parser.add_argument("--formatos", nargs="+", default=sorted(EXPORTADORES),
+                        choices=sorted(EXPORTADORES), help="Formatos a exportar")
+    parser.add_argument("--lote", type=int, default=1000, help="Linhas lidas do banco por vez")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db = Database(os.path.join(diretorio, "bench.db"))
+
+        print(f"Gerando {args.registros} registros para {args.alunos} alunos...")
+        inicio = time.perf_counter()
+        primeiro_dia = popular(db, args.registros, args.alunos, args.semente)
+        print(f"Banco gerado em {time.perf_counter() - inicio:.1f} s\n")
+
+        filtro = FiltroRegistros(data_inicio=primeiro_dia, data_fim=date.today())
+        db_path = db.db_path
+        db.close()
+
+        contexto = multiprocessing.get_context("spawn")
+        print(f"{'Formato':<10}{'Registros':>12}{'Tempo (s)':>12}{'Reg/s':>12}"
+              f"{'Pico (MB)':>12}{'Arquivo (MB)':>14}")
+        print("-" * 72)
+        for formato in args.formatos:
+            arquivo = os.path.join(diretorio, f"registros.{formato}")
+            fila = contexto.Queue()
+            processo = contexto.Process(target=exportar,
+                                        args=(db_path, filtro, formato, arquivo, args.lote, fila))
+            processo.start()
+            escritas, duracao, pico = fila.get()
+            processo.join()
+
+            tamanho = os.path.getsize(arquivo) / 1024 / 1024
+            pico_texto = "-" if pico is None else f"{pico:.1f}"
+            print(f"{formato:<10}{escritas:>12}{duracao:>12.1f}{escritas / duracao:>12.0f}"
+                  f"{pico_texto:>12}{tamanho:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
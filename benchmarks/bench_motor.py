@@ -0,0 +1,96 @@
+"""
+Benchmark do Motor de Processos
+Mede a vazão (frames/s) de detecção + encoding com diferentes tamanhos de pool
+
+Uso:
+    python benchmarks/bench_motor.py --imagem foto_com_rostos.jpg --frames 200
+
+Sem --imagem são usados frames sintéticos (sem rostos), o que mede apenas
+a detecção e o transporte pela memória compartilhada. Sem a biblioteca
+face_recognition instalada, mede apenas o transporte.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.motor_processos as motor_processos
+from core.motor_processos import MotorProcessos, _inicializar_processo, _processar_quadro
+
+
+def medir_sequencial(frames) -> float:
+    """Processa os frames na thread atual e retorna frames/s"""
+    _inicializar_processo()
+    inicio = time.perf_counter()
+    for frame in frames:
+        _processar_quadro(None, 0, frame.shape, frame)
+    return len(frames) / (time.perf_counter() - inicio)
+
+
+def medir_motor(frames, processos: int) -> float:
+    """Processa os frames no pool e retorna frames/s (sem descartar nenhum)"""
+    motor = MotorProcessos(processos)
+    try:
+        # Aquece os processos (spawn + import do dlib) fora da medição
+        for _ in range(processos):
+            motor.enviar(frames[0])
+        while motor.pendentes:
+            motor.coletar(0.1)
+
+        recebidos = 0
+        inicio = time.perf_counter()
+        for frame in frames:
+            while motor.enviar(frame) is None:
+                recebidos += len(motor.coletar(0.05))
+        while recebidos < len(frames):
+            recebidos += len(motor.coletar(0.05))
+        return len(frames) / (time.perf_counter() - inicio)
+    finally:
+        motor.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de processos")
+    parser.add_argument("--imagem", help="Imagem com rostos usada como frame")
+    parser.add_argument("--frames", type=int, default=200, help="Frames por medição")
+    parser.add_argument("--processos", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help="Tamanhos de pool a avaliar")
+    args = parser.parse_args()
+
+    if args.imagem:
+        import cv2
+        frame = cv2.imread(args.imagem)
+        if frame is None:
+            parser.error(f"Não foi possível ler a imagem {args.imagem}")
+    else:
+        frame = np.random.default_rng(0).integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    frames = [frame] * args.frames
+
+    # Sem a biblioteca cada quadro só atravessa a memória compartilhada: a
+    # aceleração medida é a do transporte, não a do reconhecimento
+    _inicializar_processo()
+    somente_transporte = not motor_processos.FACE_RECOGNITION_AVAILABLE
+
+    print(f"Frame {frame.shape[1]}x{frame.shape[0]}, {args.frames} frames por medição")
+    if somente_transporte:
+        print("AVISO: face_recognition não instalada; medindo apenas o transporte (sem detecção nem encoding)")
+    print()
+    print(f"{'Configuração':<20}{'Frames/s':>12}{'Aceleração':>12}")
+    print("-" * 44)
+    base = medir_sequencial(frames)
+    print(f"{'sequencial':<20}{base:>12.1f}{1.0:>12.2f}")
+    for processos in args.processos:
+        vazao = medir_motor(frames, processos)
+        print(f"{f'{processos} processo(s)':<20}{vazao:>12.1f}{vazao / base:>12.2f}")
+    if somente_transporte:
+        print("\nResultado apenas do transporte: não representa a aceleração do reconhecimento")
+
+
+if __name__ == "__main__":
+    main()
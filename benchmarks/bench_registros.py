@@ -0,0 +1,137 @@
+"""
+Benchmark das Consultas de Registros
+Mede as consultas diárias em uma tabela sintética com vários anos de histórico
+
+Uso:
+    python benchmarks/bench_registros.py --alunos 1000 --anos 3
+
+Compara o filtro antigo com DATE(data_hora) com o intervalo semiaberto
+usado pelo Database e mostra o plano de execução de cada consulta. O
+tempo das consultas diárias deve se manter estável conforme o histórico
+cresce. Também mede a primeira página e uma página do meio da paginação por
+chave de consultar_registros, que devem custar o mesmo.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Database, FiltroRegistros
+
+
+CONSULTA_ANTIGA = '''
+    SELECT tipo, COUNT(*) as total
+    FROM registros
+    WHERE DATE(data_hora) = ?
+    GROUP BY tipo
+'''
+
+CONSULTA_INTERVALO = '''
+    SELECT tipo, COUNT(*) as total
+    FROM registros
+    WHERE data_hora >= ? AND data_hora < ?
+    GROUP BY tipo
+'''
+
+
+def popular(db: Database, alunos: int, anos: int, semente: int) -> date:
+    """
+    Gera alunos e registros de entrada/saída em todos os dias úteis do período
+
+    Returns:
+        Último dia com registros
+    """
+    rng = random.Random(semente)
+    cursor = db.conn.cursor()
+    cursor.executemany(
+        'INSERT INTO alunos (matricula, nome, turma) VALUES (?, ?, ?)',
+        ((f"{i:06d}", f"Aluno {i}", f"{i % 12 + 1}º ano") for i in range(alunos))
+    )
+
+    ultimo = date.today() - timedelta(days=1)
+    dia = ultimo - timedelta(days=365 * anos)
+    while dia <= ultimo:
+        if dia.weekday() < 5:
+            base = datetime.combine(dia, datetime.min.time())
+            linhas = []
+            for aluno_id in range(1, alunos + 1):
+                entrada = base + timedelta(hours=7, seconds=rng.randrange(3600))
+                saida = base + timedelta(hours=12, seconds=rng.randrange(3600))
+                linhas.append((aluno_id, 'entrada', entrada, 95.0, 0))
+                linhas.append((aluno_id, 'saida', saida, 95.0, 0))
+            cursor.executemany(
+                'INSERT INTO registros (aluno_id, tipo, data_hora, confianca, manual) VALUES (?, ?, ?, ?, ?)',
+                linhas
+            )
+        dia += timedelta(days=1)
+    db.conn.commit()
+    cursor.execute('ANALYZE')
+    return ultimo
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    """Executa a função várias vezes e retorna a média em ms"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def plano(db: Database, consulta: str, parametros) -> str:
+    """Retorna o plano de execução resumido de uma consulta"""
+    linhas = db.conn.execute('EXPLAIN QUERY PLAN ' + consulta, parametros).fetchall()
+    return "; ".join(row['detail'] for row in linhas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das consultas de registros")
+    parser.add_argument("--alunos", type=int, default=1000, help="Alunos na escola")
+    parser.add_argument("--anos", type=int, default=3, help="Anos de histórico")
+    parser.add_argument("--repeticoes", type=int, default=20, help="Repetições por consulta")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db = Database(os.path.join(diretorio, "bench.db"))
+
+        print(f"Gerando {args.anos} ano(s) de registros para {args.alunos} alunos...")
+        inicio = time.perf_counter()
+        dia = popular(db, args.alunos, args.anos, args.semente)
+        total = db.conn.execute('SELECT COUNT(*) FROM registros').fetchone()[0]
+        print(f"{total} registros gerados em {time.perf_counter() - inicio:.1f} s\n")
+
+        intervalo = Database._intervalo_dia(dia)
+        filtro_turma = FiltroRegistros.do_dia(dia, turma="1º ano")
+        filtro_ano = FiltroRegistros(data_inicio=dia - timedelta(days=365), data_fim=dia, tipo='entrada')
+        chaves = [(linha[0], linha[7]) for linha in db.iterar_registros(filtro_ano)]
+        chave_meio = chaves[len(chaves) // 2]
+        casos = [
+            ("contagem DATE()", lambda: db.conn.execute(CONSULTA_ANTIGA, (dia.isoformat(),)).fetchall(),
+             CONSULTA_ANTIGA, (dia.isoformat(),)),
+            ("contagem intervalo", lambda: db.conn.execute(CONSULTA_INTERVALO, intervalo).fetchall(),
+             CONSULTA_INTERVALO, intervalo),
+            ("listar_registros_do_dia", lambda: db.listar_registros_do_dia(dia), None, None),
+            ("resumo_por_turma", lambda: db.resumo_por_turma(dia), None, None),
+            ("resumo_registros turma", lambda: db.resumo_registros(filtro_turma), None, None),
+            ("primeira página", lambda: db.consultar_registros(filtro_ano), None, None),
+            ("página do meio", lambda: db.consultar_registros(filtro_ano, chave_meio), None, None),
+        ]
+
+        print(f"{'Consulta':<26}{'Média (ms)':>12}")
+        print("-" * 38)
+        for nome, funcao, consulta, parametros in casos:
+            print(f"{nome:<26}{cronometrar(funcao, args.repeticoes):>12.2f}")
+            if consulta:
+                print(f"  plano: {plano(db, consulta, parametros)}")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
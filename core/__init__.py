@@ -1,6 +1,28 @@
 # Módulo core - Reconhecimento facial e câmera
-from .facial_recognition import FacialRecognition
-from .camera_handler import CameraHandler
-from .config import get_config, GerenciadorConfig, ConfiguracaoSistema
+#
+# Os submódulos são importados sob demanda (PEP 562): importar core.config
+# não carrega o OpenCV, o numpy nem o face_recognition.
+import importlib
+
+_EXPORTACOES = {
+    'FacialRecognition': '.facial_recognition',
+    'CameraHandler': '.camera_handler',
+    'get_config': '.config',
+    'GerenciadorConfig': '.config',
+    'ConfiguracaoSistema': '.config',
+}
 
 __all__ = ['FacialRecognition', 'CameraHandler', 'get_config', 'GerenciadorConfig', 'ConfiguracaoSistema']
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo, __name__), nome)
+    globals()[nome] = valor  # As próximas consultas não passam por aqui
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,434 @@
+"""
+Módulo de Cadastro em Lote
+Cadastra alunos a partir de uma planilha CSV e de uma pasta de fotos por
+matrícula, sem a interface gráfica
+
+Uso (com o sistema fechado):
+    python -m core.cadastro_lote alunos.csv fotos/ --processos 4
+
+A planilha tem as colunas matricula, nome e turma (separadas por ";" ou ",")
+e as fotos de cada aluno ficam em fotos/<matricula>/ (.jpg, .jpeg ou .png).
+Os encodings são calculados em um pool de processos e anotados em um arquivo
+de progresso assim que cada aluno termina: se a execução for interrompida, a
+próxima continua de onde parou. No final os alunos são gravados no banco em
+uma única transação e a galeria é atualizada de uma só vez.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from database.models import Aluno, Database
+from .facial_recognition import FACE_RECOGNITION_AVAILABLE, FacialRecognition
+
+EXTENSOES_FOTO = (".jpg", ".jpeg", ".png")
+
+# Nome (sem extensão) da cópia da foto principal gravada na pasta do aluno.
+# Não é usada como entrada, para que uma nova execução sobre data/fotos
+# não conte a cópia como mais uma foto.
+NOME_FOTO_PRINCIPAL = "principal"
+
+# Lado maior das fotos na detecção. Fotos de celular têm milhares de pixels
+# de lado e o custo da detecção HOG cresce com a área, sem ganho de precisão
+# para um único rosto em primeiro plano.
+LADO_MAXIMO = 1024
+
+# Intervalo entre as linhas de andamento impressas durante o encoding
+INTERVALO_ANDAMENTO = 2.0
+
+# Carregado por _inicializar_processo, apenas nos processos do pool
+face_recognition = None
+
+
+@dataclass
+class AlunoPlanilha:
+    """Aluno lido da planilha, com as fotos encontradas para ele"""
+    matricula: str
+    nome: str
+    turma: str
+    fotos: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RelatorioLote:
+    """Contagens e tempos de uma execução do cadastro em lote"""
+    alunos_planilha: int = 0
+    ja_cadastrados: int = 0
+    retomados: int = 0  # Encodings vindos do arquivo de progresso
+    cadastrados: int = 0
+    sem_fotos: List[str] = field(default_factory=list)
+    sem_rosto: List[str] = field(default_factory=list)  # Menos fotos com rosto que o mínimo
+    duplicadas: List[str] = field(default_factory=list)  # Matrículas repetidas na planilha
+    fotos_processadas: int = 0
+    fotos_com_rosto: int = 0
+    processos: int = 0
+    tempo_encoding: float = 0.0
+    tempo_gravacao: float = 0.0
+
+    def imprimir(self):
+        """Imprime o resumo da execução"""
+        print("\nCadastro em lote concluído")
+        print(f"  Alunos na planilha:      {self.alunos_planilha:>8}")
+        print(f"  Já cadastrados:          {self.ja_cadastrados:>8}")
+        print(f"  Retomados do progresso:  {self.retomados:>8}")
+        print(f"  Cadastrados agora:       {self.cadastrados:>8}")
+        print(f"  Sem fotos:               {len(self.sem_fotos):>8}")
+        print(f"  Sem rosto suficiente:    {len(self.sem_rosto):>8}")
+        print(f"  Matrículas repetidas:    {len(self.duplicadas):>8}")
+        print(f"  Fotos processadas:       {self.fotos_processadas:>8} ({self.fotos_com_rosto} com rosto)")
+        if self.tempo_encoding > 0:
+            print(f"  Encoding:                {self.tempo_encoding:>8.1f} s "
+                  f"({self.fotos_processadas / self.tempo_encoding:.1f} fotos/s, {self.processos} processos)")
+        print(f"  Banco e galeria:         {self.tempo_gravacao:>8.1f} s")
+
+        for titulo, matriculas in (("Sem fotos", self.sem_fotos), ("Sem rosto suficiente", self.sem_rosto),
+                                   ("Matrículas repetidas (mantida a primeira linha)", self.duplicadas)):
+            if matriculas:
+                exibidas = ", ".join(matriculas[:20])
+                restantes = f" e mais {len(matriculas) - 20}" if len(matriculas) > 20 else ""
+                print(f"\n{titulo}: {exibidas}{restantes}")
+
+
+class ArquivoProgresso:
+    """
+    Encodings já calculados, uma linha JSON por aluno
+
+    Cada linha é descarregada no disco assim que o aluno termina. Uma linha
+    incompleta (queda durante a escrita) é ignorada na leitura, e o aluno
+    volta a ser processado.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = None
+
+    def carregar(self) -> Dict[str, dict]:
+        """
+        Lê os alunos já processados
+
+        Returns:
+            matrícula -> {'encodings': [...], 'fotos': [fotos com rosto]}
+        """
+        processados = {}
+        if not os.path.exists(self.caminho):
+            return processados
+
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    entrada = json.loads(linha)
+                    processados[entrada['matricula']] = entrada
+                except (ValueError, KeyError):
+                    continue
+        return processados
+
+    def anotar(self, matricula: str, encodings: List[list], fotos: List[str]):
+        """Registra um aluno processado"""
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        self._arquivo.write(json.dumps({'matricula': matricula, 'encodings': encodings, 'fotos': fotos}) + "\n")
+        self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def remover(self):
+        """Apaga o arquivo (o lote foi gravado no banco e na galeria)"""
+        self.fechar()
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+
+def ler_planilha(caminho: str, diretorio_fotos: str, max_fotos: int) -> Tuple[List[AlunoPlanilha], List[str]]:
+    """
+    Lê a planilha de alunos e localiza as fotos de cada um
+
+    Uma matrícula repetida faria a transação de cadastro falhar inteira (e
+    falhar de novo a cada retomada), então só a primeira linha de cada
+    matrícula é usada.
+
+    Args:
+        caminho: CSV com as colunas matricula, nome e turma
+        diretorio_fotos: Diretório com uma pasta de fotos por matrícula
+        max_fotos: Fotos usadas por aluno, no máximo
+
+    Returns:
+        Tupla (alunos, matrículas repetidas)
+
+    Raises:
+        ValueError: Se a planilha não tiver as colunas esperadas
+    """
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=";,")
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.reader(f, dialeto)
+
+        cabecalho = [coluna.strip().lower().replace("í", "i") for coluna in next(leitor, [])]
+        try:
+            colunas = [cabecalho.index(nome) for nome in ("matricula", "nome", "turma")]
+        except ValueError:
+            raise ValueError("A planilha deve ter as colunas matricula, nome e turma")
+
+        alunos = []
+        linhas_matricula = {}  # matrícula -> linha da primeira ocorrência
+        duplicadas = []
+        for numero, linha in enumerate(leitor, 2):
+            if not any(valor.strip() for valor in linha):
+                continue
+            try:
+                matricula, nome, turma = (linha[i].strip() for i in colunas)
+            except IndexError:
+                matricula = nome = turma = ""
+            if not (matricula and nome and turma):
+                print(f"Linha {numero} ignorada: matrícula, nome e turma são obrigatórios")
+                continue
+            if matricula in linhas_matricula:
+                print(f"Linha {numero} ignorada: matrícula {matricula} repetida "
+                      f"(já usada na linha {linhas_matricula[matricula]})")
+                if matricula not in duplicadas:
+                    duplicadas.append(matricula)
+                continue
+            linhas_matricula[matricula] = numero
+            alunos.append(AlunoPlanilha(matricula, nome, turma))
+
+    for aluno in alunos:
+        pasta = os.path.join(diretorio_fotos, aluno.matricula)
+        if os.path.isdir(pasta):
+            aluno.fotos = [
+                os.path.join(pasta, nome) for nome in sorted(os.listdir(pasta))
+                if nome.lower().endswith(EXTENSOES_FOTO)
+                and os.path.splitext(nome)[0].lower() != NOME_FOTO_PRINCIPAL
+            ][:max_fotos]
+    return alunos, duplicadas
+
+
+def _inicializar_processo():
+    """Carrega o face_recognition uma única vez em cada processo do pool"""
+    global face_recognition
+    import face_recognition
+
+
+def _codificar_fotos(matricula: str, fotos: List[str]) -> Tuple[str, List[list], List[str]]:
+    """
+    Calcula o encoding do rosto de cada foto (executado no processo do pool)
+
+    Returns:
+        Tupla (matrícula, encodings, fotos com rosto), na ordem das fotos
+    """
+    encodings = []
+    com_rosto = []
+    for caminho in fotos:
+        imagem = cv2.imread(caminho)
+        if imagem is None:
+            continue
+
+        escala = LADO_MAXIMO / max(imagem.shape[:2])
+        if escala < 1:
+            imagem = cv2.resize(imagem, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(imagem, cv2.COLOR_BGR2RGB)
+
+        rostos = face_recognition.face_locations(rgb, model="hog")
+        if not rostos:
+            continue
+
+        # Em uma foto de cadastro o aluno é o maior rosto
+        maior = max(rostos, key=lambda r: (r[2] - r[0]) * (r[1] - r[3]))
+        encodings.append(face_recognition.face_encodings(rgb, [maior])[0].tolist())
+        com_rosto.append(caminho)
+    return matricula, encodings, com_rosto
+
+
+def calcular_encodings(alunos: List[AlunoPlanilha], progresso: ArquivoProgresso,
+                       processos: int, relatorio: RelatorioLote) -> Dict[str, dict]:
+    """
+    Calcula os encodings dos alunos em um pool de processos
+
+    Cada aluno é anotado no arquivo de progresso assim que termina.
+
+    Returns:
+        matrícula -> {'encodings': [...], 'fotos': [...]}
+    """
+    resultados = {}
+    total = len(alunos)
+    if not total:
+        return resultados
+
+    relatorio.processos = processos
+    inicio = time.perf_counter()
+    ultimo_aviso = inicio
+
+    # "spawn" para não herdar o estado do processo principal
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_inicializar_processo) as executor:
+        futuros = [executor.submit(_codificar_fotos, aluno.matricula, aluno.fotos) for aluno in alunos]
+        for concluidos, futuro in enumerate(as_completed(futuros), 1):
+            matricula, encodings, fotos = futuro.result()
+            progresso.anotar(matricula, encodings, fotos)
+            resultados[matricula] = {'encodings': encodings, 'fotos': fotos}
+
+            agora = time.perf_counter()
+            if agora - ultimo_aviso >= INTERVALO_ANDAMENTO or concluidos == total:
+                ultimo_aviso = agora
+                print(f"  {concluidos}/{total} alunos ({concluidos / (agora - inicio):.1f} alunos/s)")
+
+    relatorio.tempo_encoding = time.perf_counter() - inicio
+    relatorio.fotos_processadas = sum(len(aluno.fotos) for aluno in alunos)
+    relatorio.fotos_com_rosto = sum(len(r['fotos']) for r in resultados.values())
+    return resultados
+
+
+def copiar_foto_principal(origem: str, diretorio_fotos: str, matricula: str) -> str:
+    """Copia a foto para fotos/<matrícula>/principal, como no cadastro pela câmera"""
+    destino_dir = os.path.join(diretorio_fotos, matricula)
+    os.makedirs(destino_dir, exist_ok=True)
+    destino = os.path.join(destino_dir, NOME_FOTO_PRINCIPAL + os.path.splitext(origem)[1].lower())
+    shutil.copyfile(origem, destino)
+    return destino
+
+
+def cadastrar_lote(planilha: str, diretorio_fotos: str, db_path: str, processos: int,
+                   max_fotos: int = 5, min_fotos: int = 1, arquivo_progresso: str = None) -> RelatorioLote:
+    """
+    Cadastra os alunos da planilha no banco e na galeria
+
+    Alunos cuja matrícula já existe no banco são ignorados, o que permite
+    reexecutar o cadastro com a planilha completa.
+
+    Args:
+        planilha: CSV com as colunas matricula, nome e turma
+        diretorio_fotos: Diretório com uma pasta de fotos por matrícula
+        db_path: Banco de dados (a galeria fica em faces/, ao lado dele)
+        processos: Processos do pool de encoding
+        max_fotos: Fotos usadas por aluno, no máximo
+        min_fotos: Fotos com rosto necessárias para cadastrar o aluno
+        arquivo_progresso: Arquivo de retomada (padrão: planilha + ".progresso")
+
+    Returns:
+        Relatório da execução
+
+    Raises:
+        OSError: Se a galeria não pôde ser gravada (o arquivo de progresso é mantido)
+    """
+    relatorio = RelatorioLote()
+    alunos, relatorio.duplicadas = ler_planilha(planilha, diretorio_fotos, max_fotos)
+    relatorio.alunos_planilha = len(alunos)
+
+    db = Database(db_path)
+    diretorio_dados = os.path.dirname(db_path) or "."
+    progresso = ArquivoProgresso(arquivo_progresso or planilha + ".progresso")
+    try:
+        processados = progresso.carregar()
+
+        novos = []
+        pendentes = []
+        existentes = {}  # matrícula -> id, dos alunos que já estão no banco
+        for aluno in alunos:
+            cadastrado = db.obter_aluno_por_matricula(aluno.matricula)
+            if cadastrado:
+                existentes[aluno.matricula] = cadastrado.id
+                relatorio.ja_cadastrados += 1
+            elif not aluno.fotos:
+                relatorio.sem_fotos.append(aluno.matricula)
+            else:
+                novos.append(aluno)
+                if aluno.matricula in processados:
+                    relatorio.retomados += 1
+                else:
+                    pendentes.append(aluno)
+
+        print(f"{len(alunos)} alunos na planilha: {relatorio.ja_cadastrados} já cadastrados, "
+              f"{relatorio.retomados} retomados, {len(pendentes)} a processar")
+        processados.update(calcular_encodings(pendentes, progresso, processos, relatorio))
+
+        inicio = time.perf_counter()
+        aprovados = []
+        for aluno in novos:
+            encodings = processados[aluno.matricula]['encodings']
+            if len(encodings) < min_fotos:
+                relatorio.sem_rosto.append(aluno.matricula)
+                continue
+            foto_path = copiar_foto_principal(processados[aluno.matricula]['fotos'][0],
+                                              os.path.join(diretorio_dados, "fotos"), aluno.matricula)
+            aprovados.append((aluno, foto_path))
+
+        facial_recognition = FacialRecognition(os.path.join(diretorio_dados, "faces", "encodings.pkl"))
+
+        # Todos os alunos em uma transação, com o encoding médio (o mesmo da galeria)
+        ids = db.inserir_alunos([
+            Aluno(matricula=aluno.matricula, nome=aluno.nome, turma=aluno.turma, ativo=True, foto_path=foto_path,
+                  face_encoding=facial_recognition.encoding_to_bytes(
+                      np.mean(processados[aluno.matricula]['encodings'], axis=0)))
+            for aluno, foto_path in aprovados
+        ])
+        cadastros = [(aluno_id, aluno.nome, processados[aluno.matricula]['encodings'])
+                     for aluno_id, (aluno, _) in zip(ids, aprovados)]
+
+        # Alunos gravados no banco por uma execução interrompida antes de atualizar a galeria
+        na_galeria = set(facial_recognition.known_ids)
+        for aluno in alunos:
+            aluno_id = existentes.get(aluno.matricula)
+            if aluno_id is not None and aluno_id not in na_galeria and aluno.matricula in processados:
+                cadastros.append((aluno_id, aluno.nome, processados[aluno.matricula]['encodings']))
+
+        # Galeria atualizada de uma vez (um único lote no journal)
+        relatorio.cadastrados = facial_recognition.cadastrar_rostos_lote(cadastros)
+        if cadastros and not relatorio.cadastrados:
+            # Mantém o arquivo de progresso: a próxima execução completa a galeria
+            raise OSError("alunos gravados no banco, mas o journal da galeria não pôde ser gravado; "
+                          "execute o cadastro novamente")
+        relatorio.tempo_gravacao = time.perf_counter() - inicio
+
+        progresso.remover()
+    finally:
+        progresso.fechar()
+        db.close()
+
+    return relatorio
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cadastro em lote de alunos a partir de fotos")
+    parser.add_argument("planilha", help="CSV com as colunas matricula, nome e turma")
+    parser.add_argument("fotos", help="Diretório com uma pasta de fotos por matrícula")
+    parser.add_argument("--banco", default="data/guardiao_escolar.db", help="Banco de dados do sistema")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1,
+                        help="Processos do pool de encoding")
+    parser.add_argument("--max-fotos", type=int, default=5, help="Fotos usadas por aluno, no máximo")
+    parser.add_argument("--min-fotos", type=int, default=1, help="Fotos com rosto necessárias por aluno")
+    parser.add_argument("--progresso", help="Arquivo de retomada (padrão: <planilha>.progresso)")
+    args = parser.parse_args()
+
+    if not FACE_RECOGNITION_AVAILABLE:
+        print("Erro: o cadastro em lote precisa da biblioteca face_recognition")
+        return 1
+
+    try:
+        relatorio = cadastrar_lote(args.planilha, args.fotos, args.banco, max(1, args.processos),
+                                   args.max_fotos, args.min_fotos, args.progresso)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}")
+        return 1
+
+    relatorio.imprimir()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
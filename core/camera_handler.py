@@ -5,14 +5,30 @@ Responsável por captura de vídeo e processamento de frames
 
 import cv2
 import numpy as np
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
 import os
+import threading
+import time
+
+from .fontes_frame import FonteFrames, abrir_fonte
+
+
+@dataclass
+class FrameCapturado:
+    """Frame capturado com metadados de sequência e horário"""
+    frame: np.ndarray
+    sequencia: int = 0
+    timestamp: float = 0.0  # time.monotonic() no momento da captura
 
 
 class CameraHandler:
     """Classe responsável pela manipulação da câmera/webcam"""
 
-    def __init__(self, camera_index: int = 0, width: int = 640, height: int = 480):
+    def __init__(self, camera_index: int = 0, width: int = 640, height: int = 480,
+                 usar_thread: bool = False, tamanho_buffer: int = 3,
+                 fonte: str = "", fonte_tempo_real: bool = True):
         """
         Inicializa o manipulador de câmera
 
@@ -20,13 +36,36 @@ class CameraHandler:
             camera_index: Índice da câmera (0 = padrão)
             width: Largura do frame
             height: Altura do frame
+            usar_thread: Captura continuamente em thread própria (não bloqueia quem lê)
+            tamanho_buffer: Número de posições do buffer circular da captura em thread
+            fonte: Fonte usada no lugar da câmera: arquivo de vídeo, pasta de
+                imagens ou "sintetica" (vazio = câmera; ver core.fontes_frame)
+            fonte_tempo_real: Entrega os frames da fonte no ritmo original
+                (False = o mais rápido possível)
         """
         self.camera_index = camera_index
         self.width = width
         self.height = height
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.fonte = fonte
+        self.fonte_tempo_real = fonte_tempo_real
+        self.cap: Optional[Union[cv2.VideoCapture, FonteFrames]] = None
         self.is_running = False
 
+        # Captura em thread com buffer circular pré-alocado
+        self.usar_thread = usar_thread
+        self.tamanho_buffer = max(3, tamanho_buffer)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._buffer: List[np.ndarray] = []
+        self._timestamps = [0.0] * self.tamanho_buffer
+        self._sequencia = 0  # Número do último frame publicado (0 = nenhum)
+        self._ultima_entregue = 0
+
+        # Contadores da captura
+        self.frames_capturados = 0
+        self.frames_descartados = 0  # Capturados mas nunca entregues
+        self.frames_duplicados = 0  # Entregues mais de uma vez
+
     def iniciar(self) -> bool:
         """
         Inicia a captura da câmera
@@ -35,15 +74,18 @@ class CameraHandler:
             True se iniciou com sucesso, False caso contrário
         """
         try:
-            # Tenta abrir a câmera
-            self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)  # CAP_DSHOW para Windows
+            if self.fonte:
+                self.cap = abrir_fonte(self.fonte, self.fonte_tempo_real)
+            else:
+                # Tenta abrir a câmera
+                self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)  # CAP_DSHOW para Windows
 
-            if not self.cap.isOpened():
-                # Tenta sem CAP_DSHOW
-                self.cap = cv2.VideoCapture(self.camera_index)
+                if not self.cap.isOpened():
+                    # Tenta sem CAP_DSHOW
+                    self.cap = cv2.VideoCapture(self.camera_index)
 
             if not self.cap.isOpened():
-                print(f"Erro: Não foi possível abrir a câmera {self.camera_index}")
+                print(f"Erro: Não foi possível abrir a {self.descricao}")
                 return False
 
             # Configura resolução
@@ -53,8 +95,12 @@ class CameraHandler:
             # Configura buffer pequeno para menor latência
             self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
-            self.is_running = True
-            print(f"Câmera {self.camera_index} iniciada com sucesso")
+            if self.usar_thread:
+                self._iniciar_thread_captura()
+            else:
+                self.is_running = True
+
+            print(f"Captura iniciada com sucesso ({self.descricao})")
             return True
 
         except Exception as e:
@@ -62,28 +108,132 @@ class CameraHandler:
             return False
 
     def parar(self):
-        """Para a captura da câmera"""
+        """
+        Para a captura da câmera
+
+        No modo em thread o dispositivo é liberado pela própria thread de
+        captura ao sair do loop: se uma leitura travada passar do tempo de
+        espera, o release não acontece com o read ainda em andamento.
+        """
         self.is_running = False
-        if self.cap:
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            if self._thread.is_alive():
+                print("Aviso: a thread de captura não terminou; a câmera será liberada quando ela sair")
+            self._thread = None
+            print(f"Captura: {self.frames_capturados} frames, "
+                  f"{self.frames_descartados} descartados, {self.frames_duplicados} duplicados")
+        elif self.cap:
             self.cap.release()
-            self.cap = None
+        self.cap = None
         print("Câmera parada")
 
-    def capturar_frame(self) -> Optional[np.ndarray]:
+    def _iniciar_thread_captura(self):
         """
-        Captura um frame da câmera
+        Ativa a captura e inicia a thread que lê a câmera continuamente
+
+        A thread é registrada antes de is_running: um leitor em outra thread
+        nunca vê a câmera ativa sem a thread de captura, o que o faria ler o
+        dispositivo diretamente ao mesmo tempo que ela.
+        """
+        with self._lock:
+            self._sequencia = 0
+            self._ultima_entregue = 0
+        self.frames_capturados = 0
+        self.frames_descartados = 0
+        self.frames_duplicados = 0
+        self._thread = threading.Thread(target=self._loop_captura, name="CapturaCamera", daemon=True)
+        self.is_running = True
+        self._thread.start()
+
+    def _loop_captura(self):
+        """
+        Lê frames da câmera para o buffer circular enquanto a câmera estiver ativa
+
+        A thread guarda a sua câmera e a libera ao sair, mesmo que parar já
+        tenha desistido de esperá-la (ou que outra captura tenha sido iniciada).
+        """
+        cap = self.cap
+        try:
+            self._capturar_continuamente(cap)
+        finally:
+            cap.release()
+
+    def _capturar_continuamente(self, cap):
+        """Loop da thread de captura (termina em parar ou ao trocar de câmera)"""
+        while self.is_running and self.cap is cap:
+            # Escreve sempre na posição seguinte à do último frame publicado,
+            # que nunca é a posição lida pelos consumidores
+            posicao = (self._sequencia + 1) % self.tamanho_buffer
+
+            if self._buffer:
+                ret, frame = cap.read(self._buffer[posicao])
+            else:
+                ret, frame = cap.read()
+
+            if not ret or frame is None:
+                time.sleep(0.01)
+                continue
+
+            if not self._buffer:
+                # Aloca o buffer com o tamanho real entregue pela câmera
+                self._buffer = [np.empty_like(frame) for _ in range(self.tamanho_buffer)]
+            if frame is not self._buffer[posicao]:
+                if frame.shape != self._buffer[posicao].shape:
+                    self._buffer[posicao] = np.empty_like(frame)
+                np.copyto(self._buffer[posicao], frame)
+
+            with self._lock:
+                self._timestamps[posicao] = time.monotonic()
+                self._sequencia += 1
+            self.frames_capturados += 1
+
+    def capturar_frame_detalhado(self) -> Optional[FrameCapturado]:
+        """
+        Captura um frame com número de sequência e horário
+
+        No modo em thread retorna imediatamente uma cópia do frame mais recente
+        do buffer (sem bloquear). Compare ``sequencia`` com a do último frame
+        recebido para saber se há um frame novo.
 
         Returns:
-            Frame em formato numpy array (BGR) ou None se falhar
+            FrameCapturado ou None se não houver frame disponível
         """
         if not self.is_running or self.cap is None:
             return None
 
-        ret, frame = self.cap.read()
+        if self._thread is None:
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self._sequencia += 1
+            return FrameCapturado(frame, self._sequencia, time.monotonic())
 
-        if ret:
-            return frame
-        return None
+        with self._lock:
+            sequencia = self._sequencia
+            if sequencia == 0:
+                return None
+
+            if sequencia == self._ultima_entregue:
+                self.frames_duplicados += 1
+            elif sequencia > self._ultima_entregue + 1:
+                self.frames_descartados += sequencia - self._ultima_entregue - 1
+            self._ultima_entregue = sequencia
+
+            posicao = sequencia % self.tamanho_buffer
+            return FrameCapturado(self._buffer[posicao].copy(), sequencia, self._timestamps[posicao])
+
+    def capturar_frame(self) -> Optional[np.ndarray]:
+        """
+        Captura um frame da câmera
+
+        Returns:
+            Frame em formato numpy array (BGR) ou None se falhar
+        """
+        capturado = self.capturar_frame_detalhado()
+        if capturado is None:
+            return None
+        return capturado.frame
 
     def capturar_frame_rgb(self) -> Optional[np.ndarray]:
         """
@@ -205,6 +355,13 @@ class CameraHandler:
         """
         return cv2.resize(frame, (largura, altura))
 
+    @property
+    def descricao(self) -> str:
+        """Nome da origem dos frames, para mensagens (ex.: "câmera 0")"""
+        if self.fonte:
+            return f"fonte de frames {self.fonte}"
+        return f"câmera {self.camera_index}"
+
     @property
     def esta_ativa(self) -> bool:
         """Verifica se a câmera está ativa"""
@@ -214,16 +371,22 @@ class CameraHandler:
         """
         Lista câmeras disponíveis no sistema
 
+        Os índices são sondados em paralelo: abrir um índice sem câmera pode
+        levar segundos em alguns drivers, e em sequência esses tempos somavam.
+
         Args:
             max_cameras: Número máximo de câmeras a verificar
 
         Returns:
             Lista de índices de câmeras disponíveis
         """
-        cameras = []
-        for i in range(max_cameras):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                cameras.append(i)
+        def disponivel(indice: int) -> bool:
+            cap = cv2.VideoCapture(indice)
+            try:
+                return cap.isOpened()
+            finally:
                 cap.release()
-        return cameras
+
+        with ThreadPoolExecutor(max_workers=max(1, max_cameras)) as executor:
+            resultados = list(executor.map(disponivel, range(max_cameras)))
+        return [i for i, aberta in enumerate(resultados) if aberta]
@@ -21,6 +21,26 @@ class ConfiguracaoSistema:
     tolerancia_reconhecimento: float = 0.6
     tempo_entre_registros: int = 60  # segundos
 
+    # Índice de busca na galeria (exato = força bruta, ivf = aproximado)
+    indice_reconhecimento: str = "exato"
+    ivf_listas: int = 0  # 0 = automático (~raiz quadrada do total de alunos)
+    ivf_sondagens: int = 8  # listas visitadas por busca (maior = mais recall, mais lento)
+    processos_reconhecimento: int = 0  # processos para detecção/encoding (0 = desativado)
+
+    # Câmera
+    captura_em_thread: bool = True  # lê a câmera em thread própria (não trava a interface)
+    fonte_frames: str = ""  # vazio = câmera; vídeo, pasta de imagens ou "sintetica" (testes sem webcam)
+    fonte_tempo_real: bool = True  # fonte no ritmo original (False = o mais rápido possível)
+
+    # Banco de dados
+    banco_wal: bool = True  # journal WAL (consultas longas não bloqueiam os registros)
+    banco_synchronous: str = "NORMAL"  # NORMAL é seguro com WAL e evita fsync a cada commit
+    banco_cache_mb: int = 16  # cache de páginas por conexão
+    banco_mmap_mb: int = 256  # leitura do arquivo via mmap (0 = desativado)
+    banco_conexoes: int = 4  # conexões ociosas mantidas no pool
+    escritor_intervalo_ms: int = 200  # espera máxima de um registro antes de ser gravado
+    escritor_max_lote: int = 100  # registros acumulados que disparam a gravação
+
     # Aparência
     tema: str = "escuro"
 
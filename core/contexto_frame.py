@@ -0,0 +1,79 @@
+"""
+Módulo de Contexto de Frame
+Compartilha os buffers derivados de um frame entre detecção, encoding e exibição
+"""
+
+import threading
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+
+class ContextoFrame:
+    """
+    Frame BGR com seus buffers derivados calculados sob demanda
+
+    Cada buffer (RGB, RGB reduzido para detecção, tons de cinza) é calculado
+    no máximo uma vez, na primeira vez em que é pedido, e reaproveitado por
+    todos os consumidores do mesmo frame, inclusive em threads diferentes.
+    Os buffers devem ser tratados como somente leitura.
+    """
+
+    # Escala usada na detecção de rostos (1/4 da resolução)
+    ESCALA_DETECCAO = 0.25
+
+    def __init__(self, bgr: np.ndarray):
+        """
+        Args:
+            bgr: Frame original em BGR (OpenCV). Não deve ser alterado depois.
+        """
+        self.bgr = bgr
+        self._lock = threading.Lock()
+        self._rgb: Optional[np.ndarray] = None
+        self._rgb_reduzido: Optional[np.ndarray] = None
+        self._cinza: Optional[np.ndarray] = None
+
+    @classmethod
+    def de(cls, frame: Union[np.ndarray, "ContextoFrame"]) -> "ContextoFrame":
+        """Retorna o próprio contexto ou cria um a partir de um frame BGR"""
+        if isinstance(frame, cls):
+            return frame
+        return cls(frame)
+
+    @property
+    def shape(self):
+        """Dimensões do frame original"""
+        return self.bgr.shape
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Frame completo em RGB, contíguo (formato exigido pelo dlib e pelo QImage)"""
+        with self._lock:
+            if self._rgb is None:
+                self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+            return self._rgb
+
+    @property
+    def rgb_reduzido(self) -> np.ndarray:
+        """Frame RGB reduzido para detecção de rostos"""
+        with self._lock:
+            if self._rgb_reduzido is None:
+                largura = int(self.bgr.shape[1] * self.ESCALA_DETECCAO)
+                altura = int(self.bgr.shape[0] * self.ESCALA_DETECCAO)
+                if self._rgb is not None:
+                    self._rgb_reduzido = cv2.resize(self._rgb, (largura, altura))
+                else:
+                    # Reduz antes de converter: evita converter o frame inteiro
+                    # quando não há rostos e o RGB completo não é necessário
+                    reduzido = cv2.resize(self.bgr, (largura, altura))
+                    self._rgb_reduzido = cv2.cvtColor(reduzido, cv2.COLOR_BGR2RGB)
+            return self._rgb_reduzido
+
+    @property
+    def cinza(self) -> np.ndarray:
+        """Frame em tons de cinza"""
+        with self._lock:
+            if self._cinza is None:
+                self._cinza = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+            return self._cinza
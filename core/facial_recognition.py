@@ -3,19 +3,76 @@ Módulo de Reconhecimento Facial
 Responsável por detectar e reconhecer rostos usando a biblioteca face_recognition
 """
 
+import importlib.util
 import os
 import pickle
+import threading
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 from dataclasses import dataclass
 
-try:
-    import face_recognition
-    FACE_RECOGNITION_AVAILABLE = True
-except ImportError:
-    FACE_RECOGNITION_AVAILABLE = False
+from .contexto_frame import ContextoFrame
+from .galeria import GaleriaFacial
+from .indice import criar_indice
+from .persistencia import (
+    JournalGaleria, OperacaoGaleria, gravar_atomico,
+    gravar_galeria_binaria, abrir_galeria_binaria,
+    OP_CADASTRAR, OP_REMOVER, OP_RENOMEAR
+)
+
+# O face_recognition carrega o dlib e os modelos de detecção/encoding, o que
+# leva de centenas de ms a alguns segundos. Na importação deste módulo só se
+# verifica se ele está instalado; a importação real acontece no primeiro uso
+# (ou antes, em segundo plano, por aquecer_modelos).
+FACE_RECOGNITION_AVAILABLE = importlib.util.find_spec("face_recognition") is not None
+if not FACE_RECOGNITION_AVAILABLE:
     print("AVISO: Biblioteca face_recognition não instalada. Usando modo simulado.")
 
+face_recognition = None
+_lock_importacao = threading.Lock()
+
+
+def carregar_face_recognition():
+    """
+    Importa o face_recognition na primeira chamada (seguro entre threads)
+
+    Returns:
+        O módulo face_recognition, ou None se indisponível
+    """
+    global face_recognition, FACE_RECOGNITION_AVAILABLE
+    if face_recognition is None and FACE_RECOGNITION_AVAILABLE:
+        with _lock_importacao:
+            if face_recognition is None and FACE_RECOGNITION_AVAILABLE:
+                try:
+                    import face_recognition as modulo
+                except ImportError as e:
+                    # Instalado, mas o dlib ou os modelos não carregam
+                    FACE_RECOGNITION_AVAILABLE = False
+                    print(f"AVISO: Não foi possível carregar o face_recognition ({e}). Usando modo simulado.")
+                else:
+                    face_recognition = modulo
+    return face_recognition
+
+
+def aquecer_modelos() -> bool:
+    """
+    Carrega o face_recognition e executa uma detecção e um encoding de teste
+
+    O dlib só carrega o detector e a rede de encoding no primeiro uso; feito
+    em segundo plano na inicialização, o primeiro rosto real não paga esse
+    custo. Bloqueia até terminar.
+
+    Returns:
+        True se os modelos foram carregados, False no modo simulado
+    """
+    modulo = carregar_face_recognition()
+    if modulo is None:
+        return False
+    imagem = np.zeros((64, 64, 3), dtype=np.uint8)
+    modulo.face_locations(imagem, model="hog")
+    modulo.face_encodings(imagem, known_face_locations=[(8, 56, 56, 8)])
+    return True
+
 
 @dataclass
 class ResultadoReconhecimento:
@@ -30,177 +87,339 @@ class ResultadoReconhecimento:
 class FacialRecognition:
     """Classe responsável pelo reconhecimento facial"""
 
-    def __init__(self, encodings_path: str = "data/faces/encodings.pkl", tolerance: float = 0.6):
+    # Compacta o journal em snapshot quando ele passa deste tamanho
+    # (ou de metade da galeria, o que for maior)
+    LIMITE_JOURNAL = 256
+
+    def __init__(self, encodings_path: str = "data/faces/encodings.pkl", tolerance: float = 0.6,
+                 indice: str = "exato", ivf_listas: int = 0, ivf_sondagens: int = 8):
         """
         Inicializa o sistema de reconhecimento facial
 
         Args:
-            encodings_path: Caminho para o arquivo de encodings salvos
+            encodings_path: Caminho do arquivo legado de encodings (pickle). A galeria
+                binária (galeria.bin) e o journal ficam no mesmo diretório.
             tolerance: Tolerância para matching (menor = mais rigoroso)
+            indice: Tipo de índice de busca ("exato" ou "ivf")
+            ivf_listas: Número de listas do índice IVF (0 = automático)
+            ivf_sondagens: Listas visitadas por busca no IVF (maior = mais recall)
         """
         self.encodings_path = encodings_path
         self.tolerance = tolerance
 
-        # Dicionários para armazenar encodings conhecidos
-        self.known_encodings: List[np.ndarray] = []
-        self.known_ids: List[int] = []
-        self.known_names: List[str] = []
+        # Galeria matricial com os encodings conhecidos
+        # (protegida por lock: o reconhecimento roda fora da thread da interface)
+        self._lock = threading.RLock()
+        self.galeria = GaleriaFacial()
+        self.indice = criar_indice(indice, self.galeria, ivf_listas, ivf_sondagens)
 
         # Garante que o diretório existe
         os.makedirs(os.path.dirname(encodings_path), exist_ok=True)
 
+        # Snapshot binário e journal de alterações (aplicado sobre o snapshot ao iniciar)
+        diretorio = os.path.dirname(encodings_path)
+        self.galeria_path = os.path.join(diretorio, "galeria.bin")
+        self.journal = JournalGaleria(os.path.join(diretorio, "galeria.journal"))
+        # Tamanho do journal a partir do qual a compactação volta a ser tentada após uma falha
+        self._compactar_apos = 0
+
         # Carrega encodings salvos
         self._load_encodings()
 
     def _load_encodings(self):
-        """Carrega encodings do arquivo pickle"""
-        if os.path.exists(self.encodings_path):
+        """Abre o snapshot binário da galeria e reaplica o journal de alterações"""
+        migrar = False
+        if os.path.exists(self.galeria_path):
+            try:
+                # Mapeamento em memória: não lê os encodings do disco agora
+                self.galeria.adotar(*abrir_galeria_binaria(self.galeria_path))
+            except Exception as e:
+                print(f"Erro ao carregar galeria: {e}")
+                self.galeria.limpar()
+        elif os.path.exists(self.encodings_path):
+            # Formato antigo (pickle): lido uma única vez e convertido
             try:
                 with open(self.encodings_path, 'rb') as f:
                     data = pickle.load(f)
-                    self.known_encodings = data.get('encodings', [])
-                    self.known_ids = data.get('ids', [])
-                    self.known_names = data.get('names', [])
-                print(f"Carregados {len(self.known_encodings)} encodings faciais")
+                encodings = data.get('encodings', [])
+                ids = data.get('ids', [])
+                names = data.get('names', [])
+                for encoding, aluno_id, nome in zip(encodings, ids, names):
+                    self.galeria.adicionar(aluno_id, nome, encoding)
+                migrar = True
             except Exception as e:
                 print(f"Erro ao carregar encodings: {e}")
-                self.known_encodings = []
-                self.known_ids = []
-                self.known_names = []
+                self.galeria.limpar()
+
+        try:
+            for operacao in self.journal.ler():
+                self._aplicar(operacao)
+        except Exception as e:
+            print(f"Erro ao ler journal da galeria: {e}")
+
+        if len(self.galeria) or self.journal.total_registros:
+            print(f"Carregados {len(self.galeria)} encodings faciais "
+                  f"({self.journal.total_registros} alterações no journal)")
 
-    def _save_encodings(self):
-        """Salva encodings no arquivo pickle"""
+        if migrar:
+            print("Convertendo encodings para o formato binário da galeria...")
+            self.compactar()
+
+    def _aplicar(self, operacao: OperacaoGaleria) -> bool:
+        """Aplica uma operação do journal à galeria em memória"""
+        if operacao.operacao == OP_CADASTRAR:
+            self.galeria.remover(operacao.aluno_id)
+            self.galeria.adicionar(operacao.aluno_id, operacao.nome, operacao.encoding)
+            return True
+        if operacao.operacao == OP_REMOVER:
+            return self.galeria.remover(operacao.aluno_id)
+        if operacao.operacao == OP_RENOMEAR:
+            return self.galeria.renomear(operacao.aluno_id, operacao.nome)
+        return False
+
+    def _registrar(self, operacoes: List[OperacaoGaleria]) -> bool:
+        """
+        Grava operações no journal, aplica-as à galeria e compacta quando ele cresce demais
+
+        As operações só são aplicadas depois de gravadas: se o journal falhar,
+        a galeria em memória continua igual à do disco.
+
+        Returns:
+            False se o journal não pôde ser gravado (nenhuma operação aplicada)
+        """
         try:
-            data = {
-                'encodings': self.known_encodings,
-                'ids': self.known_ids,
-                'names': self.known_names
-            }
-            with open(self.encodings_path, 'wb') as f:
-                pickle.dump(data, f)
-            print(f"Salvos {len(self.known_encodings)} encodings faciais")
+            self.journal.anexar(operacoes)
         except Exception as e:
-            print(f"Erro ao salvar encodings: {e}")
+            print(f"Erro ao gravar journal da galeria: {e}")
+            return False
+
+        for operacao in operacoes:
+            self._aplicar(operacao)
+
+        limite = max(self.LIMITE_JOURNAL, len(self.galeria) // 2, self._compactar_apos)
+        if self.journal.total_registros > limite:
+            self.compactar()
+        return True
+
+    def compactar(self) -> bool:
+        """
+        Grava um snapshot completo da galeria e esvazia o journal
+
+        O snapshot é gravado de forma atômica. Se o processo cair entre a
+        gravação e a limpeza do journal, as operações são reaplicadas na
+        próxima inicialização sem alterar o resultado (são idempotentes).
+        Depois da gravação a galeria volta a ser mapeada do arquivo novo.
+
+        No Windows o arquivo não pode ser substituído enquanto outro processo
+        o mantém mapeado (por exemplo, outra instância ou um benchmark com a
+        galeria aberta): a compactação falha, o journal é mantido e uma nova
+        tentativa é feita depois de mais LIMITE_JOURNAL alterações.
+
+        Returns:
+            True se o snapshot foi gravado
+        """
+        with self._lock:
+            try:
+                # Solta o mapeamento do arquivo antigo antes de substituí-lo
+                self.galeria.materializar()
+                gravar_atomico(self.galeria_path, lambda f: gravar_galeria_binaria(
+                    f, self.galeria.matriz, self.galeria.ids,
+                    self.galeria.normas, self.galeria.nomes
+                ))
+                self.journal.truncar()
+                self.galeria.adotar(*abrir_galeria_binaria(self.galeria_path))
+                self._compactar_apos = 0
+                print(f"Salvos {len(self.galeria)} encodings faciais")
+                return True
+            except PermissionError as e:
+                print(f"Galeria em uso por outro processo, compactação adiada (journal mantido): {e}")
+            except Exception as e:
+                print(f"Erro ao salvar encodings: {e}")
+            self._compactar_apos = self.journal.total_registros + self.LIMITE_JOURNAL
+            return False
+
+    def configurar_indice(self, indice: str, ivf_listas: int = 0, ivf_sondagens: int = 8):
+        """
+        Troca o índice de busca usado no reconhecimento
+
+        Args:
+            indice: Tipo de índice ("exato" ou "ivf")
+            ivf_listas: Número de listas do IVF (0 = automático)
+            ivf_sondagens: Listas visitadas por busca no IVF
+        """
+        with self._lock:
+            self.indice = criar_indice(indice, self.galeria, ivf_listas, ivf_sondagens)
 
-    def detectar_rostos(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    @property
+    def known_encodings(self) -> List[np.ndarray]:
+        """Encodings conhecidos (cópias das linhas da galeria)"""
+        return list(self.galeria.matriz.astype(np.float64))
+
+    @property
+    def known_ids(self) -> List[int]:
+        """IDs dos alunos cadastrados, na ordem da galeria"""
+        return self.galeria.ids.tolist()
+
+    @property
+    def known_names(self) -> List[str]:
+        """Nomes dos alunos cadastrados, na ordem da galeria"""
+        return list(self.galeria.nomes)
+
+    def detectar_rostos(self, frame: Union[np.ndarray, ContextoFrame]) -> List[Tuple[int, int, int, int]]:
         """
         Detecta rostos em um frame
 
         Args:
-            frame: Imagem em formato numpy array (BGR do OpenCV)
+            frame: Imagem BGR do OpenCV ou ContextoFrame (reaproveita o RGB reduzido)
 
         Returns:
             Lista de localizações de rostos (top, right, bottom, left)
         """
-        if not FACE_RECOGNITION_AVAILABLE:
+        fr = carregar_face_recognition()
+        if fr is None:
             return []
 
-        # Converte de BGR (OpenCV) para RGB e garante array contíguo
-        rgb_frame = np.ascontiguousarray(frame[:, :, ::-1])
-
-        # Reduz a imagem para processamento mais rápido
-        small_frame = self._resize_frame(rgb_frame, 0.25)
+        # Frame RGB reduzido para processamento mais rápido (calculado uma vez por frame)
+        contexto = ContextoFrame.de(frame)
+        small_frame = contexto.rgb_reduzido
 
         # Detecta rostos
-        face_locations = face_recognition.face_locations(small_frame, model="hog")
+        face_locations = fr.face_locations(small_frame, model="hog")
 
         # Ajusta coordenadas para o tamanho original
-        face_locations = [(int(top * 4), int(right * 4), int(bottom * 4), int(left * 4))
+        fator = 1 / ContextoFrame.ESCALA_DETECCAO
+        face_locations = [(int(top * fator), int(right * fator), int(bottom * fator), int(left * fator))
                          for (top, right, bottom, left) in face_locations]
 
         return face_locations
 
-    def _resize_frame(self, frame: np.ndarray, scale: float) -> np.ndarray:
-        """Redimensiona o frame mantendo proporções"""
-        import cv2
-        width = int(frame.shape[1] * scale)
-        height = int(frame.shape[0] * scale)
-        return cv2.resize(frame, (width, height))
-
-    def reconhecer_rosto(self, frame: np.ndarray, face_location: Tuple[int, int, int, int] = None) -> ResultadoReconhecimento:
+    def reconhecer_rosto(self, frame: Union[np.ndarray, ContextoFrame],
+                         face_location: Tuple[int, int, int, int] = None) -> ResultadoReconhecimento:
         """
         Tenta reconhecer um rosto no frame
 
         Args:
-            frame: Imagem em formato numpy array (BGR do OpenCV)
+            frame: Imagem BGR do OpenCV ou ContextoFrame
             face_location: Localização específica do rosto (opcional)
 
         Returns:
             ResultadoReconhecimento com informações do reconhecimento
         """
-        resultado = ResultadoReconhecimento()
+        fr = carregar_face_recognition()
+        if fr is None or len(self.galeria) == 0:
+            return ResultadoReconhecimento()
 
-        if not FACE_RECOGNITION_AVAILABLE:
-            return resultado
-
-        if len(self.known_encodings) == 0:
-            return resultado
-
-        # Converte para RGB e garante array contíguo
-        rgb_frame = np.ascontiguousarray(frame[:, :, ::-1])
+        contexto = ContextoFrame.de(frame)
 
         # Se não foi passada localização, detecta rostos
         if face_location is None:
-            face_locations = face_recognition.face_locations(rgb_frame, model="hog")
+            face_locations = fr.face_locations(contexto.rgb, model="hog")
             if not face_locations:
-                return resultado
+                return ResultadoReconhecimento()
             face_location = face_locations[0]
-        else:
-            face_locations = [face_location]
 
-        resultado.face_location = face_location
+        return self.reconhecer_rostos(contexto, [face_location])[0]
+
+    def reconhecer_rostos(self, frame: Union[np.ndarray, ContextoFrame],
+                          face_locations: List[Tuple[int, int, int, int]]) -> List[ResultadoReconhecimento]:
+        """
+        Reconhece vários rostos do mesmo frame de uma só vez
+
+        Todos os rostos são codificados em uma única chamada de face_encodings
+        e comparados com a galeria em uma única operação matriz-matriz.
+
+        Args:
+            frame: Imagem BGR do OpenCV ou ContextoFrame (reaproveita o RGB completo)
+            face_locations: Localizações dos rostos (top, right, bottom, left)
+
+        Returns:
+            Um ResultadoReconhecimento por localização, na mesma ordem
+        """
+        resultados = [ResultadoReconhecimento(face_location=loc) for loc in face_locations]
+
+        if not face_locations or len(self.galeria) == 0:
+            return resultados
+        fr = carregar_face_recognition()
+        if fr is None:
+            return resultados
+
+        # RGB contíguo do frame (compartilhado com a exibição e a detecção)
+        rgb_frame = ContextoFrame.de(frame).rgb
+
+        # Gera os encodings de todos os rostos de uma vez
+        face_encodings = fr.face_encodings(rgb_frame, face_locations)
+
+        if len(face_encodings) != len(face_locations):
+            return resultados
 
-        # Gera encoding do rosto detectado
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        return self.identificar_encodings(np.asarray(face_encodings, dtype=np.float32), face_locations)
 
-        if not face_encodings:
-            return resultado
+    def identificar_encodings(self, encodings: np.ndarray,
+                              face_locations: List[Tuple[int, int, int, int]]) -> List[ResultadoReconhecimento]:
+        """
+        Compara encodings já calculados com a galeria
+
+        Usado quando os encodings vêm de fora desta instância (por exemplo,
+        do pool de processos do MotorProcessos).
+
+        Args:
+            encodings: Matriz (rostos x 128) de encodings
+            face_locations: Localização de cada rosto, na mesma ordem
+
+        Returns:
+            Um ResultadoReconhecimento por localização, na mesma ordem
+        """
+        resultados = [ResultadoReconhecimento(face_location=loc) for loc in face_locations]
 
-        face_encoding = face_encodings[0]
+        if encodings is None or len(encodings) != len(face_locations) or len(self.galeria) == 0:
+            return resultados
 
-        # Compara com rostos conhecidos
-        distances = face_recognition.face_distance(self.known_encodings, face_encoding)
+        with self._lock:
+            # Compara com rostos conhecidos através do índice configurado
+            correspondencias = self.indice.buscar_lote(np.asarray(encodings, dtype=np.float32))
 
-        if len(distances) > 0:
-            best_match_index = np.argmin(distances)
-            best_distance = distances[best_match_index]
+            for resultado, melhor in zip(resultados, correspondencias):
+                if melhor is None:
+                    continue
+                best_match_index, best_distance = melhor
 
-            # Verifica se está dentro da tolerância
-            if best_distance <= self.tolerance:
-                # Calcula confiança (quanto menor a distância, maior a confiança)
-                confianca = (1 - best_distance) * 100
+                # Verifica se está dentro da tolerância
+                if best_distance <= self.tolerance:
+                    # Calcula confiança (quanto menor a distância, maior a confiança)
+                    confianca = (1 - best_distance) * 100
 
-                resultado.reconhecido = True
-                resultado.aluno_id = self.known_ids[best_match_index]
-                resultado.nome = self.known_names[best_match_index]
-                resultado.confianca = round(confianca, 1)
+                    resultado.reconhecido = True
+                    resultado.aluno_id = int(self.galeria.ids[best_match_index])
+                    resultado.nome = self.galeria.nomes[best_match_index]
+                    resultado.confianca = round(confianca, 1)
 
-        return resultado
+        return resultados
 
-    def gerar_encoding(self, frame: np.ndarray) -> Optional[np.ndarray]:
+    def gerar_encoding(self, frame: Union[np.ndarray, ContextoFrame]) -> Optional[np.ndarray]:
         """
         Gera encoding facial de um frame
 
         Args:
-            frame: Imagem em formato numpy array (BGR do OpenCV)
+            frame: Imagem BGR do OpenCV ou ContextoFrame
 
         Returns:
             Encoding facial ou None se não detectar rosto
         """
-        if not FACE_RECOGNITION_AVAILABLE:
+        fr = carregar_face_recognition()
+        if fr is None:
             return None
 
-        # Converte para RGB e garante array contíguo (necessário para dlib)
-        rgb_frame = np.ascontiguousarray(frame[:, :, ::-1])
+        # RGB contíguo (necessário para dlib)
+        rgb_frame = ContextoFrame.de(frame).rgb
 
         # Detecta rostos
-        face_locations = face_recognition.face_locations(rgb_frame, model="hog")
+        face_locations = fr.face_locations(rgb_frame, model="hog")
 
         if not face_locations:
             return None
 
         # Gera encoding do primeiro rosto detectado
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        face_encodings = fr.face_encodings(rgb_frame, face_locations)
 
         if face_encodings:
             return face_encodings[0]
@@ -222,21 +441,37 @@ class FacialRecognition:
         if not encodings:
             return False
 
-        # Remove encodings anteriores deste aluno (se existirem)
-        self.remover_rosto(aluno_id)
+        return self.cadastrar_rostos_lote([(aluno_id, nome, encodings)]) == 1
 
-        # Calcula encoding médio para maior robustez
-        encoding_medio = np.mean(encodings, axis=0)
+    def cadastrar_rostos_lote(self, cadastros: List[Tuple[int, str, List[np.ndarray]]]) -> int:
+        """
+        Cadastra vários rostos gravando um único lote no journal
 
-        # Adiciona aos conhecidos
-        self.known_encodings.append(encoding_medio)
-        self.known_ids.append(aluno_id)
-        self.known_names.append(nome)
+        O custo de disco é proporcional ao tamanho do lote, não ao da galeria.
 
-        # Salva no arquivo
-        self._save_encodings()
+        Args:
+            cadastros: Lista de tuplas (aluno_id, nome, encodings)
 
-        return True
+        Returns:
+            Número de alunos cadastrados (0 se o journal não pôde ser gravado)
+        """
+        operacoes = []
+        for aluno_id, nome, encodings in cadastros:
+            if not encodings:
+                continue
+            # Calcula encoding médio para maior robustez
+            # (substitui encodings anteriores do aluno, se existirem)
+            encoding_medio = np.mean(encodings, axis=0)
+            operacoes.append(OperacaoGaleria(OP_CADASTRAR, aluno_id, nome, encoding_medio))
+
+        if not operacoes:
+            return 0
+
+        with self._lock:
+            if not self._registrar(operacoes):
+                return 0
+
+        return len(operacoes)
 
     def remover_rosto(self, aluno_id: int) -> bool:
         """
@@ -248,14 +483,10 @@ class FacialRecognition:
         Returns:
             True se removido com sucesso
         """
-        if aluno_id in self.known_ids:
-            index = self.known_ids.index(aluno_id)
-            del self.known_encodings[index]
-            del self.known_ids[index]
-            del self.known_names[index]
-            self._save_encodings()
-            return True
-        return False
+        with self._lock:
+            if self.galeria.indice_de(aluno_id) is None:
+                return False
+            return self._registrar([OperacaoGaleria(OP_REMOVER, aluno_id)])
 
     def atualizar_nome(self, aluno_id: int, novo_nome: str) -> bool:
         """
@@ -268,16 +499,14 @@ class FacialRecognition:
         Returns:
             True se atualizado com sucesso
         """
-        if aluno_id in self.known_ids:
-            index = self.known_ids.index(aluno_id)
-            self.known_names[index] = novo_nome
-            self._save_encodings()
-            return True
-        return False
+        with self._lock:
+            if self.galeria.indice_de(aluno_id) is None:
+                return False
+            return self._registrar([OperacaoGaleria(OP_RENOMEAR, aluno_id, novo_nome)])
 
     def total_cadastrados(self) -> int:
         """Retorna o total de rostos cadastrados"""
-        return len(self.known_encodings)
+        return len(self.galeria)
 
     def encoding_to_bytes(self, encoding: np.ndarray) -> bytes:
         """Converte encoding numpy para bytes (para salvar no banco)"""
@@ -0,0 +1,241 @@
+"""
+Módulo de Fontes de Frames
+Fontes gravadas ou sintéticas usadas no lugar da câmera, para reproduzir e
+medir o desempenho do sistema sem uma webcam
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+EXTENSOES_IMAGEM = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Nome da fonte sintética na configuração ("sintetica" ou "sintetica:640x480")
+FONTE_SINTETICA = "sintetica"
+
+
+class FonteFrames(ABC):
+    """
+    Fonte de frames com a mesma interface de cv2.VideoCapture
+
+    O CameraHandler usa apenas isOpened, read, set, get e release, então
+    uma fonte pode substituir a câmera sem mudar a captura (em thread ou
+    não). As subclasses implementam _ler e _reiniciar.
+
+    Com ``tempo_real`` os frames são entregues no ritmo de ``fps``, como
+    uma câmera; sem ele, o mais rápido possível (para benchmarks). Uma
+    fonte atrasada não tenta recuperar o atraso entregando frames em rajada.
+    """
+
+    def __init__(self, fps: float = 30.0, tempo_real: bool = True, repetir: bool = True):
+        """
+        Args:
+            fps: Frames por segundo no modo tempo real
+            tempo_real: Entrega os frames no ritmo de fps
+            repetir: Recomeça do primeiro frame ao chegar ao fim
+        """
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.tempo_real = tempo_real
+        self.repetir = repetir
+        self.frames_lidos = 0
+        self._aberta = True
+        self._proximo_instante = 0.0
+
+    @abstractmethod
+    def _ler(self, destino: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Próximo frame BGR, ou None no fim da fonte"""
+
+    @abstractmethod
+    def _reiniciar(self) -> bool:
+        """Volta ao primeiro frame (False se não for possível)"""
+
+    def _aguardar_ritmo(self):
+        """Dorme até o instante do próximo frame no modo tempo real"""
+        intervalo = 1.0 / self.fps
+        agora = time.monotonic()
+        if self._proximo_instante - agora > 0:
+            time.sleep(self._proximo_instante - agora)
+        elif agora - self._proximo_instante > intervalo:
+            # Atrasada (ou primeiro frame): recomeça a contagem a partir de agora
+            self._proximo_instante = agora
+        self._proximo_instante += intervalo
+
+    @staticmethod
+    def _copiar_para(frame: np.ndarray, destino: Optional[np.ndarray]) -> np.ndarray:
+        """Copia o frame para o buffer do chamador, quando ele tem o mesmo formato"""
+        if destino is not None and destino.shape == frame.shape and destino.dtype == frame.dtype:
+            np.copyto(destino, frame)
+            return destino
+        return frame
+
+    # ==================== INTERFACE DO cv2.VideoCapture ====================
+
+    def isOpened(self) -> bool:
+        return self._aberta
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Lê o próximo frame
+
+        Args:
+            image: Buffer opcional onde o frame é escrito (como em cv2.VideoCapture.read)
+
+        Returns:
+            Tupla (sucesso, frame BGR)
+        """
+        if not self._aberta:
+            return False, None
+
+        if self.tempo_real:
+            self._aguardar_ritmo()
+
+        frame = self._ler(image)
+        if frame is None and self.repetir and self._reiniciar():
+            frame = self._ler(image)
+        if frame is None:
+            return False, None
+
+        self.frames_lidos += 1
+        return True, frame
+
+    def set(self, propriedade: int, valor: float) -> bool:
+        """Resolução e buffer são os da fonte: os ajustes da câmera são ignorados"""
+        return False
+
+    def get(self, propriedade: int) -> float:
+        if propriedade == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self):
+        self._aberta = False
+
+
+class FonteVideo(FonteFrames):
+    """Frames de um arquivo de vídeo, no fps gravado no arquivo"""
+
+    def __init__(self, caminho: str, tempo_real: bool = True, repetir: bool = True):
+        self.caminho = caminho
+        self.cap = cv2.VideoCapture(caminho)
+        super().__init__(self.cap.get(cv2.CAP_PROP_FPS), tempo_real, repetir)
+        self._aberta = self.cap.isOpened()
+
+    def _ler(self, destino: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        ret, frame = self.cap.read(destino) if destino is not None else self.cap.read()
+        return frame if ret else None
+
+    def _reiniciar(self) -> bool:
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class FonteImagens(FonteFrames):
+    """Frames de uma pasta de imagens, em ordem alfabética do nome do arquivo"""
+
+    def __init__(self, diretorio: str, fps: float = 30.0, tempo_real: bool = True, repetir: bool = True):
+        super().__init__(fps, tempo_real, repetir)
+        self.diretorio = diretorio
+        self.arquivos: List[str] = sorted(
+            os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+            if nome.lower().endswith(EXTENSOES_IMAGEM)
+        )
+        self._posicao = 0
+        self._aberta = bool(self.arquivos)
+
+    def _ler(self, destino: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        while self._posicao < len(self.arquivos):
+            frame = cv2.imread(self.arquivos[self._posicao])
+            self._posicao += 1
+            if frame is not None:
+                return self._copiar_para(frame, destino)
+            print(f"Imagem ignorada (não pôde ser lida): {self.arquivos[self._posicao - 1]}")
+        return None
+
+    def _reiniciar(self) -> bool:
+        self._posicao = 0
+        return True
+
+
+class FonteSintetica(FonteFrames):
+    """
+    Frames gerados, sem arquivo: um padrão aleatório fixo que desliza na horizontal
+
+    Os frames dependem apenas da semente e do número do frame, então duas
+    execuções recebem exatamente os mesmos frames.
+    """
+
+    def __init__(self, largura: int = 640, altura: int = 480, fps: float = 30.0,
+                 tempo_real: bool = True, repetir: bool = True, total: int = 0, semente: int = 0):
+        """
+        Args:
+            largura: Largura dos frames
+            altura: Altura dos frames
+            fps: Frames por segundo no modo tempo real
+            tempo_real: Entrega os frames no ritmo de fps
+            repetir: Recomeça ao chegar a ``total`` frames
+            total: Número de frames da fonte (0 = infinita)
+            semente: Semente do padrão gerado
+        """
+        super().__init__(fps, tempo_real, repetir)
+        self.largura = largura
+        self.altura = altura
+        self.total = total
+        self._numero = 0
+
+        # Padrão com o dobro da largura: cada frame é uma janela deslocada dele
+        padrao = np.random.default_rng(semente).integers(0, 256, size=(altura, largura, 3), dtype=np.uint8)
+        self._padrao = np.concatenate([padrao, padrao], axis=1)
+
+    def _ler(self, destino: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if self.total and self._numero >= self.total:
+            return None
+        deslocamento = (self._numero * 4) % self.largura
+        self._numero += 1
+        janela = self._padrao[:, deslocamento:deslocamento + self.largura]
+        if destino is not None and destino.shape == janela.shape:
+            np.copyto(destino, janela)
+            return destino
+        return janela.copy()
+
+    def _reiniciar(self) -> bool:
+        self._numero = 0
+        return True
+
+
+def abrir_fonte(especificacao: str, tempo_real: bool = True, repetir: bool = True) -> FonteFrames:
+    """
+    Abre a fonte de frames descrita por um texto da configuração
+
+    Args:
+        especificacao: "sintetica" (ou "sintetica:LARGURAxALTURA"), uma pasta
+            de imagens ou um arquivo de vídeo
+        tempo_real: Entrega os frames no ritmo da fonte
+        repetir: Recomeça do primeiro frame ao chegar ao fim
+
+    Raises:
+        ValueError: Se a especificação não corresponde a nenhuma fonte
+    """
+    nome, _, parametros = especificacao.partition(":")
+    if nome == FONTE_SINTETICA:
+        largura, altura = 640, 480
+        if parametros:
+            try:
+                largura, altura = (int(valor) for valor in parametros.lower().split("x"))
+            except ValueError:
+                raise ValueError(f"Resolução inválida na fonte sintética: {parametros}")
+        return FonteSintetica(largura, altura, tempo_real=tempo_real, repetir=repetir)
+
+    if os.path.isdir(especificacao):
+        return FonteImagens(especificacao, tempo_real=tempo_real, repetir=repetir)
+    if os.path.isfile(especificacao):
+        return FonteVideo(especificacao, tempo_real=tempo_real, repetir=repetir)
+
+    raise ValueError(f"Fonte de frames não encontrada: {especificacao}")
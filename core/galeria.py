@@ -0,0 +1,252 @@
+"""
+Módulo da Galeria de Encodings Faciais
+Armazena os encodings conhecidos em uma matriz float32 contígua e pré-alocada
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+
+class GaleriaFacial:
+    """
+    Galeria de rostos conhecidos em formato matricial
+
+    Os encodings ficam em uma única matriz float32 contígua (capacidade x dimensão),
+    com arrays paralelos de IDs, nomes e normas ao quadrado. A capacidade cresce
+    por duplicação (custo amortizado O(1) por cadastro) e as remoções compactam
+    a matriz, de modo que as linhas válidas são sempre ``[0, total)``.
+    """
+
+    CAPACIDADE_INICIAL = 64
+
+    def __init__(self, dimensao: int = 128, capacidade: int = CAPACIDADE_INICIAL):
+        """
+        Inicializa uma galeria vazia
+
+        Args:
+            dimensao: Dimensão dos encodings (128 para o modelo do dlib)
+            capacidade: Número de linhas pré-alocadas
+        """
+        self.dimensao = dimensao
+        self.versao = 0  # Incrementada a cada alteração (usada pelos índices)
+        self._total = 0
+        self._alocar(max(1, capacidade))
+        self._nomes: Sequence[str] = []
+
+    def _alocar(self, capacidade: int):
+        """Aloca (ou realoca) os buffers preservando as linhas válidas"""
+        matriz = np.zeros((capacidade, self.dimensao), dtype=np.float32)
+        ids = np.zeros(capacidade, dtype=np.int64)
+        normas = np.zeros(capacidade, dtype=np.float32)
+        distancias = np.empty(capacidade, dtype=np.float32)
+
+        if self._total > 0:
+            matriz[:self._total] = self._matriz[:self._total]
+            ids[:self._total] = self._ids[:self._total]
+            normas[:self._total] = self._normas[:self._total]
+
+        self._matriz = matriz
+        self._ids = ids
+        self._normas = normas
+        self._distancias = distancias
+
+    def adotar(self, matriz: np.ndarray, ids: np.ndarray, normas: np.ndarray, nomes: Sequence[str]):
+        """
+        Passa a usar arrays externos como armazenamento (sem copiá-los)
+
+        Usado para abrir a galeria direto de um arquivo mapeado em memória.
+        Os arrays devem aceitar escrita (ex.: memmap copy-on-write). A
+        capacidade fica igual ao total, então o primeiro cadastro realoca
+        os buffers em memória própria, e a tabela de nomes só é convertida
+        em lista na primeira alteração.
+
+        Args:
+            matriz: Matriz float32 (total x dimensão)
+            ids: IDs int64
+            normas: Normas ao quadrado float32
+            nomes: Sequência de nomes (pode ser preguiçosa)
+        """
+        self.dimensao = matriz.shape[1]
+        self._total = matriz.shape[0]
+        self._matriz = matriz
+        self._ids = ids
+        self._normas = normas
+        self._distancias = np.empty(max(1, self._total), dtype=np.float32)
+        self._nomes = nomes
+        self.versao += 1
+
+    def materializar(self):
+        """Copia o armazenamento para memória própria (desfaz o mapeamento do arquivo)"""
+        self._alocar(max(self.CAPACIDADE_INICIAL, self._total))
+        self._materializar_nomes()
+
+    def _materializar_nomes(self):
+        """Converte uma tabela de nomes preguiçosa em lista antes de alterá-la"""
+        if not isinstance(self._nomes, list):
+            self._nomes = list(self._nomes)
+
+    @property
+    def capacidade(self) -> int:
+        """Número de linhas atualmente alocadas"""
+        return self._matriz.shape[0]
+
+    def __len__(self) -> int:
+        return self._total
+
+    @property
+    def matriz(self) -> np.ndarray:
+        """View (sem cópia) da matriz de encodings válidos"""
+        return self._matriz[:self._total]
+
+    @property
+    def ids(self) -> np.ndarray:
+        """View (sem cópia) dos IDs válidos"""
+        return self._ids[:self._total]
+
+    @property
+    def nomes(self) -> Sequence[str]:
+        """Nomes paralelos às linhas da matriz"""
+        return self._nomes
+
+    @property
+    def normas(self) -> np.ndarray:
+        """View das normas ao quadrado de cada linha"""
+        return self._normas[:self._total]
+
+    def indice_de(self, aluno_id: int) -> Optional[int]:
+        """Retorna a linha do aluno na matriz ou None se não cadastrado"""
+        posicoes = np.flatnonzero(self._ids[:self._total] == aluno_id)
+        if len(posicoes) == 0:
+            return None
+        return int(posicoes[0])
+
+    def adicionar(self, aluno_id: int, nome: str, encoding: np.ndarray) -> int:
+        """
+        Adiciona um encoding ao final da galeria
+
+        Args:
+            aluno_id: ID do aluno
+            nome: Nome do aluno
+            encoding: Vetor de dimensão ``self.dimensao``
+
+        Returns:
+            Índice da linha ocupada
+        """
+        if self._total == self.capacidade:
+            self._alocar(max(self.CAPACIDADE_INICIAL, self.capacidade * 2))
+
+        self._materializar_nomes()
+        linha = self._total
+        self._matriz[linha] = encoding
+        self._ids[linha] = aluno_id
+        self._normas[linha] = np.dot(self._matriz[linha], self._matriz[linha])
+        self._nomes.append(nome)
+        self._total += 1
+        self.versao += 1
+        return linha
+
+    def remover(self, aluno_id: int) -> bool:
+        """
+        Remove um aluno e compacta a matriz
+
+        Args:
+            aluno_id: ID do aluno a remover
+
+        Returns:
+            True se o aluno estava cadastrado
+        """
+        linha = self.indice_de(aluno_id)
+        if linha is None:
+            return False
+
+        self._materializar_nomes()
+        ultimo = self._total - 1
+        if linha < ultimo:
+            # Desloca as linhas seguintes para manter a ordem de cadastro
+            self._matriz[linha:ultimo] = self._matriz[linha + 1:self._total]
+            self._ids[linha:ultimo] = self._ids[linha + 1:self._total]
+            self._normas[linha:ultimo] = self._normas[linha + 1:self._total]
+        del self._nomes[linha]
+        self._total = ultimo
+        self.versao += 1
+        return True
+
+    def renomear(self, aluno_id: int, nome: str) -> bool:
+        """Atualiza o nome associado a um aluno"""
+        linha = self.indice_de(aluno_id)
+        if linha is None:
+            return False
+        self._materializar_nomes()
+        self._nomes[linha] = nome
+        return True
+
+    def limpar(self):
+        """Remove todos os encodings mantendo a capacidade alocada"""
+        self._total = 0
+        self._nomes = []
+        self.versao += 1
+
+    def distancias(self, encoding: np.ndarray) -> np.ndarray:
+        """
+        Calcula a distância euclidiana do encoding a todas as linhas
+
+        Usa ||g - q||² = ||g||² - 2 g·q + ||q||² sobre a matriz contígua,
+        escrevendo no buffer pré-alocado da galeria (sem alocação por chamada).
+
+        Args:
+            encoding: Encoding de consulta
+
+        Returns:
+            View do buffer interno com ``len(self)`` distâncias. O conteúdo é
+            sobrescrito na próxima chamada.
+        """
+        n = self._total
+        saida = self._distancias[:n]
+        if n == 0:
+            return saida
+
+        consulta = np.asarray(encoding, dtype=np.float32)
+        np.dot(self._matriz[:n], consulta, out=saida)
+        saida *= -2.0
+        saida += self._normas[:n]
+        saida += np.dot(consulta, consulta)
+        np.maximum(saida, 0.0, out=saida)
+        np.sqrt(saida, out=saida)
+        return saida
+
+    def melhores_correspondencias(self, encodings: np.ndarray) -> List[Optional[Tuple[int, float]]]:
+        """
+        Busca a linha mais próxima de cada encoding em uma operação matriz-matriz
+
+        Args:
+            encodings: Matriz (k x dimensão) de consultas
+
+        Returns:
+            Lista com uma tupla (linha, distância) por consulta, ou None se a
+            galeria estiver vazia
+        """
+        consultas = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dimensao)
+        if self._total == 0:
+            return [None] * len(consultas)
+
+        n = self._total
+        d2 = consultas @ self._matriz[:n].T
+        d2 *= -2.0
+        d2 += self._normas[:n]
+        d2 += np.einsum('ij,ij->i', consultas, consultas)[:, None]
+        linhas = np.argmin(d2, axis=1)
+        melhores = np.sqrt(np.maximum(d2[np.arange(len(consultas)), linhas], 0.0))
+        return [(int(linha), float(d)) for linha, d in zip(linhas, melhores)]
+
+    def melhor_correspondencia(self, encoding: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        Retorna a linha mais próxima do encoding e sua distância
+
+        Returns:
+            Tupla (linha, distância) ou None se a galeria estiver vazia
+        """
+        if self._total == 0:
+            return None
+        distancias = self.distancias(encoding)
+        linha = int(np.argmin(distancias))
+        return linha, float(distancias[linha])
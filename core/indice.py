@@ -0,0 +1,260 @@
+"""
+Módulo de Índices de Busca Facial
+Camada plugável de busca do vizinho mais próximo sobre a GaleriaFacial
+"""
+
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .galeria import GaleriaFacial
+
+
+class IndiceExato:
+    """Busca exata por força bruta (compara com todas as linhas da galeria)"""
+
+    nome = "exato"
+
+    def __init__(self, galeria: GaleriaFacial):
+        self.galeria = galeria
+
+    def buscar(self, encoding: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        Busca o encoding mais próximo na galeria
+
+        Args:
+            encoding: Encoding de consulta
+
+        Returns:
+            Tupla (linha na galeria, distância) ou None se a galeria estiver vazia
+        """
+        return self.galeria.melhor_correspondencia(encoding)
+
+    def buscar_lote(self, encodings: np.ndarray) -> List[Optional[Tuple[int, float]]]:
+        """
+        Busca o encoding mais próximo de cada consulta (matriz-matriz)
+
+        Args:
+            encodings: Matriz (k x dimensão) de consultas
+
+        Returns:
+            Uma tupla (linha, distância) ou None por consulta
+        """
+        return self.galeria.melhores_correspondencias(encodings)
+
+
+class IndiceIVF:
+    """
+    Índice aproximado por arquivo invertido (IVF) em NumPy puro
+
+    Os encodings são agrupados por k-means em ``listas`` centróides. Cada busca
+    compara a consulta apenas com as linhas das ``sondagens`` listas mais
+    próximas. Mais sondagens = maior recall e maior latência.
+
+    O índice é reconstruído sob demanda quando a versão da galeria muda. Os
+    centróides só são retreinados quando a galeria dobra ou cai pela metade
+    desde o último treino; nas demais alterações as linhas são apenas
+    redistribuídas entre as listas existentes.
+    """
+
+    nome = "ivf"
+
+    # Abaixo deste tamanho a busca exata é tão rápida quanto o IVF
+    MINIMO_LINHAS = 1000
+    ITERACOES_KMEANS = 10
+
+    def __init__(self, galeria: GaleriaFacial, listas: int = 0, sondagens: int = 8, semente: int = 0):
+        """
+        Inicializa o índice
+
+        Args:
+            galeria: Galeria indexada
+            listas: Número de listas invertidas (0 = automático, ~√N)
+            sondagens: Número de listas visitadas por busca
+            semente: Semente do k-means (para resultados reproduzíveis)
+        """
+        self.galeria = galeria
+        self.listas = listas
+        self.sondagens = max(1, sondagens)
+        self.semente = semente
+
+        self._versao = -1
+        self._total_treino = 0
+        self._centroides: Optional[np.ndarray] = None
+        self._normas_centroides: Optional[np.ndarray] = None
+        self._matriz_ordenada: Optional[np.ndarray] = None
+        self._normas_ordenadas: Optional[np.ndarray] = None
+        self._linhas_ordenadas: Optional[np.ndarray] = None
+        self._inicios: Optional[np.ndarray] = None
+
+    @property
+    def listas_treinadas(self) -> int:
+        """Número de listas do último treino (0 se ainda não treinado)"""
+        return 0 if self._centroides is None else len(self._centroides)
+
+    def _num_listas(self, total: int) -> int:
+        """Número de listas para uma galeria de ``total`` linhas"""
+        if self.listas > 0:
+            return min(self.listas, total)
+        return max(1, int(np.sqrt(total)))
+
+    @staticmethod
+    def _distancias_quadradas(pontos: np.ndarray, normas_pontos: np.ndarray,
+                              centros: np.ndarray, normas_centros: np.ndarray) -> np.ndarray:
+        """Matriz de distâncias ao quadrado entre pontos e centros"""
+        d2 = pontos @ centros.T
+        d2 *= -2.0
+        d2 += normas_pontos[:, None]
+        d2 += normas_centros[None, :]
+        return d2
+
+    def _treinar(self, matriz: np.ndarray, normas: np.ndarray):
+        """Treina os centróides com k-means (Lloyd)"""
+        total = matriz.shape[0]
+        k = self._num_listas(total)
+        rng = np.random.default_rng(self.semente)
+        centroides = matriz[rng.choice(total, size=k, replace=False)].copy()
+
+        for _ in range(self.ITERACOES_KMEANS):
+            normas_c = np.einsum('ij,ij->i', centroides, centroides)
+            atribuicao = np.argmin(self._distancias_quadradas(matriz, normas, centroides, normas_c), axis=1)
+            contagem = np.bincount(atribuicao, minlength=k)
+            somas = np.zeros_like(centroides)
+            np.add.at(somas, atribuicao, matriz)
+            ocupadas = contagem > 0
+            centroides[ocupadas] = somas[ocupadas] / contagem[ocupadas, None]
+
+        self._centroides = centroides
+        self._normas_centroides = np.einsum('ij,ij->i', centroides, centroides)
+        self._total_treino = total
+
+    def _reconstruir(self):
+        """Reconstrói as listas invertidas a partir da galeria atual"""
+        matriz = self.galeria.matriz
+        normas = self.galeria.normas
+        total = matriz.shape[0]
+
+        precisa_treinar = (
+            self._centroides is None
+            or total > 2 * self._total_treino
+            or total < self._total_treino // 2
+        )
+        if precisa_treinar:
+            self._treinar(matriz, normas)
+
+        d2 = self._distancias_quadradas(matriz, normas, self._centroides, self._normas_centroides)
+        atribuicao = np.argmin(d2, axis=1)
+
+        # Ordena as linhas por lista para que cada lista seja um bloco contíguo
+        ordem = np.argsort(atribuicao, kind='stable')
+        contagem = np.bincount(atribuicao, minlength=len(self._centroides))
+        self._inicios = np.concatenate(([0], np.cumsum(contagem)))
+        self._linhas_ordenadas = ordem
+        self._matriz_ordenada = np.ascontiguousarray(matriz[ordem])
+        self._normas_ordenadas = normas[ordem]
+        self._versao = self.galeria.versao
+
+    def buscar(self, encoding: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        Busca aproximada do encoding mais próximo
+
+        Args:
+            encoding: Encoding de consulta
+
+        Returns:
+            Tupla (linha na galeria, distância) ou None se a galeria estiver vazia
+        """
+        if len(self.galeria) < self.MINIMO_LINHAS:
+            return self.galeria.melhor_correspondencia(encoding)
+        return self.buscar_lote(np.asarray(encoding, dtype=np.float32)[None, :])[0]
+
+    def buscar_lote(self, encodings: np.ndarray) -> List[Optional[Tuple[int, float]]]:
+        """
+        Busca aproximada para várias consultas
+
+        As consultas são agrupadas pelas listas que sondam: cada lista visitada
+        custa um único produto matriz-matriz com todas as consultas que a
+        sondam, em vez de uma busca por consulta.
+
+        Args:
+            encodings: Matriz (k x dimensão) de consultas
+
+        Returns:
+            Uma tupla (linha, distância) ou None por consulta
+        """
+        if len(self.galeria) < self.MINIMO_LINHAS:
+            return self.galeria.melhores_correspondencias(encodings)
+
+        if self._versao != self.galeria.versao:
+            self._reconstruir()
+
+        consultas = np.asarray(encodings, dtype=np.float32)
+        if consultas.ndim == 1:
+            consultas = consultas[None, :]
+        total_consultas = consultas.shape[0]
+        if total_consultas == 0:
+            return []
+        normas_consultas = np.einsum('ij,ij->i', consultas, consultas)
+
+        # Listas mais próximas de cada consulta (k x sondagens)
+        d2_centros = self._normas_centroides[None, :] - 2.0 * (consultas @ self._centroides.T)
+        sondagens = min(self.sondagens, d2_centros.shape[1])
+        listas = np.argpartition(d2_centros, sondagens - 1, axis=1)[:, :sondagens]
+
+        # Pares (consulta, lista) ordenados por lista: cada lista vira um bloco de consultas
+        pares_listas = listas.ravel()
+        pares_consultas = np.repeat(np.arange(total_consultas), sondagens)
+        ordem = np.argsort(pares_listas, kind='stable')
+        pares_listas = pares_listas[ordem]
+        pares_consultas = pares_consultas[ordem]
+        unicas, inicios_pares = np.unique(pares_listas, return_index=True)
+        fins_pares = np.append(inicios_pares[1:], len(pares_listas))
+
+        melhor_d2 = np.full(total_consultas, np.inf)
+        melhor_posicao = np.full(total_consultas, -1, dtype=np.int64)
+        for lista, inicio_par, fim_par in zip(unicas, inicios_pares, fins_pares):
+            inicio, fim = self._inicios[lista], self._inicios[lista + 1]
+            if inicio == fim:
+                continue
+            indices = pares_consultas[inicio_par:fim_par]
+            d2 = self._normas_ordenadas[None, inicio:fim] - 2.0 * (
+                consultas[indices] @ self._matriz_ordenada[inicio:fim].T)
+            posicoes = np.argmin(d2, axis=1)
+            minimos = d2[np.arange(len(indices)), posicoes]
+            melhores = minimos < melhor_d2[indices]
+            melhor_d2[indices[melhores]] = minimos[melhores]
+            melhor_posicao[indices[melhores]] = inicio + posicoes[melhores]
+
+        resultados: List[Optional[Tuple[int, float]]] = []
+        for i in range(total_consultas):
+            if melhor_posicao[i] < 0:
+                resultados.append(None)
+                continue
+            distancia = float(np.sqrt(max(melhor_d2[i] + normas_consultas[i], 0.0)))
+            resultados.append((int(self._linhas_ordenadas[melhor_posicao[i]]), distancia))
+        return resultados
+
+
+TIPOS_INDICE = {
+    IndiceExato.nome: IndiceExato,
+    IndiceIVF.nome: IndiceIVF,
+}
+
+
+def criar_indice(tipo: str, galeria: GaleriaFacial, listas: int = 0, sondagens: int = 8):
+    """
+    Cria o índice de busca configurado
+
+    Args:
+        tipo: "exato" ou "ivf"
+        galeria: Galeria a indexar
+        listas: Número de listas do IVF (0 = automático)
+        sondagens: Listas visitadas por busca no IVF
+
+    Returns:
+        Instância do índice (tipos desconhecidos caem no índice exato)
+    """
+    if tipo == IndiceIVF.nome:
+        return IndiceIVF(galeria, listas=listas, sondagens=sondagens)
+    if tipo not in TIPOS_INDICE:
+        print(f"AVISO: Índice '{tipo}' desconhecido. Usando busca exata.")
+    return IndiceExato(galeria)
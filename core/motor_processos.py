@@ -0,0 +1,308 @@
+"""
+Módulo do Motor de Processos
+Executa detecção e encoding facial em um pool de processos, usando todos os
+núcleos da CPU
+"""
+
+import heapq
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .contexto_frame import ContextoFrame
+
+
+# Carregados por _inicializar_processo, apenas nos processos do pool
+face_recognition = None
+FACE_RECOGNITION_AVAILABLE = False
+
+# Memória compartilhada aberta em cada processo do pool (nome -> SharedMemory)
+_memorias_processo: Dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass
+class ResultadoProcessamento:
+    """Rostos encontrados em um frame processado pelo pool"""
+    sequencia: int
+    fonte: int = 0  # Câmera de origem do frame
+    face_locations: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    encodings: Optional[np.ndarray] = None  # (rostos x 128), na ordem de face_locations
+    duracao: float = 0.0  # Segundos gastos no processo do pool
+
+
+def _inicializar_processo():
+    """Carrega o face_recognition uma única vez em cada processo do pool"""
+    global face_recognition, FACE_RECOGNITION_AVAILABLE
+    try:
+        import face_recognition
+        FACE_RECOGNITION_AVAILABLE = True
+    except ImportError:
+        FACE_RECOGNITION_AVAILABLE = False
+
+
+def _aquecer_processo() -> bool:
+    """Detecção e encoding de teste, para carregar os modelos do dlib no processo do pool"""
+    if not FACE_RECOGNITION_AVAILABLE:
+        return False
+    imagem = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(imagem, model="hog")
+    face_recognition.face_encodings(imagem, known_face_locations=[(8, 56, 56, 8)])
+    return True
+
+
+def _abrir_memoria(nome: str) -> shared_memory.SharedMemory:
+    """Abre (ou reaproveita) no processo do pool a memória compartilhada indicada"""
+    memoria = _memorias_processo.get(nome)
+    if memoria is None:
+        # Uma memória nova substitui a anterior (realocação por mudança de resolução)
+        for antiga in _memorias_processo.values():
+            antiga.close()
+        _memorias_processo.clear()
+        memoria = shared_memory.SharedMemory(name=nome)
+        _memorias_processo[nome] = memoria
+    return memoria
+
+
+def _processar_quadro(nome_memoria: Optional[str], deslocamento: int, forma: Tuple[int, ...],
+                      frame: Optional[np.ndarray]):
+    """
+    Detecta e codifica os rostos de um frame (executado no processo do pool)
+
+    Args:
+        nome_memoria: Memória compartilhada onde está o frame (None = frame enviado direto)
+        deslocamento: Posição do frame na memória compartilhada
+        forma: Dimensões do frame BGR
+        frame: Frame enviado por pickle quando não cabe na memória compartilhada
+
+    Returns:
+        Tupla (localizações, encodings, duração)
+    """
+    inicio = time.perf_counter()
+    if frame is None:
+        memoria = _abrir_memoria(nome_memoria)
+        frame = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf, offset=deslocamento)
+
+    if not FACE_RECOGNITION_AVAILABLE:
+        return [], None, time.perf_counter() - inicio
+
+    contexto = ContextoFrame(frame)
+    fator = 1 / ContextoFrame.ESCALA_DETECCAO
+    face_locations = [
+        (int(top * fator), int(right * fator), int(bottom * fator), int(left * fator))
+        for (top, right, bottom, left) in face_recognition.face_locations(contexto.rgb_reduzido, model="hog")
+    ]
+
+    encodings = None
+    if face_locations:
+        # O RGB é uma cópia: o slot da memória compartilhada pode ser liberado em seguida
+        encodings = np.asarray(face_recognition.face_encodings(contexto.rgb, face_locations),
+                               dtype=np.float32)
+    return face_locations, encodings, time.perf_counter() - inicio
+
+
+class MotorProcessos:
+    """
+    Pool de processos para detecção e encoding facial
+
+    O dlib roda preso ao GIL no processo da interface, ocupando um único
+    núcleo. O motor distribui os frames entre processos do pool: cada frame
+    é copiado para um slot de um anel em memória compartilhada e só o
+    endereço do slot atravessa a fronteira entre processos, sem serializar
+    o frame inteiro. Os processos devolvem localizações e encodings, e os
+    resultados são entregues na ordem dos frames de cada fonte, mesmo que
+    terminem fora de ordem.
+
+    Quando todos os slots estão ocupados o frame é recusado (o chamador
+    descarta), de modo que a fila nunca cresce além do que o pool consegue
+    processar.
+    """
+
+    def __init__(self, processos: int, slots_por_processo: int = 2):
+        """
+        Inicializa o motor
+
+        Args:
+            processos: Número de processos do pool
+            slots_por_processo: Frames em voo por processo (mantém o pool ocupado)
+        """
+        self.processos = max(1, processos)
+        self.total_slots = self.processos * max(1, slots_por_processo)
+
+        # "spawn" evita herdar as threads do Qt e da câmera em um fork
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_processo
+        )
+
+        self._lock = threading.Lock()
+        self._memoria: Optional[shared_memory.SharedMemory] = None
+        self._tamanho_slot = 0
+        self._slots_livres: List[int] = list(range(self.total_slots))
+
+        # Reordenação por fonte: próxima sequência a entregar e resultados adiantados
+        self._sequencias: Dict[int, int] = {}
+        self._proxima_entrega: Dict[int, int] = {}
+        self._adiantados: Dict[int, list] = {}
+        self._prontos: List[ResultadoProcessamento] = []
+        self._pendentes = 0
+        self._futuros = set()  # Frames ainda não concluídos (cancelados em parar)
+        self._evento = threading.Event()
+
+        # Estatísticas
+        self.frames_enviados = 0
+        self.frames_recusados = 0
+        self.frames_processados = 0
+        self.tempo_processamento = 0.0
+
+    @property
+    def pendentes(self) -> int:
+        """Frames enviados cujo resultado ainda não foi coletado"""
+        with self._lock:
+            return self._pendentes + len(self._prontos)
+
+    def aquecer(self):
+        """
+        Inicia os processos do pool e carrega os modelos em cada um (não bloqueia)
+
+        Sem isso, os primeiros frames esperam o spawn dos processos e o
+        carregamento do dlib.
+        """
+        for _ in range(self.processos):
+            self._executor.submit(_aquecer_processo)
+
+    def _garantir_memoria(self, tamanho: int) -> bool:
+        """
+        Garante slots com pelo menos ``tamanho`` bytes (chamado com o lock)
+
+        Returns:
+            False se a memória precisaria ser realocada com frames em voo
+        """
+        if tamanho <= self._tamanho_slot:
+            return True
+        if len(self._slots_livres) < self.total_slots:
+            return False
+
+        self._liberar_memoria()
+        self._memoria = shared_memory.SharedMemory(create=True, size=tamanho * self.total_slots)
+        self._tamanho_slot = tamanho
+        return True
+
+    def _liberar_memoria(self):
+        """Libera a memória compartilhada atual"""
+        if self._memoria is not None:
+            self._memoria.close()
+            self._memoria.unlink()
+            self._memoria = None
+            self._tamanho_slot = 0
+
+    def enviar(self, frame: np.ndarray, fonte: int = 0) -> Optional[int]:
+        """
+        Envia um frame BGR para o pool (não bloqueia)
+
+        Args:
+            frame: Frame BGR (uint8, altura x largura x 3)
+            fonte: Identificador da câmera, para ordenar os resultados por fonte
+
+        Returns:
+            Sequência atribuída ao frame, ou None se o pool estiver cheio
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+
+        with self._lock:
+            if not self._slots_livres:
+                self.frames_recusados += 1
+                return None
+            memoria_ok = self._garantir_memoria(frame.nbytes)
+            slot = self._slots_livres.pop()
+
+            sequencia = self._sequencias.get(fonte, 0)
+            self._sequencias[fonte] = sequencia + 1
+            self._proxima_entrega.setdefault(fonte, sequencia)
+            self._pendentes += 1
+            self.frames_enviados += 1
+
+            if memoria_ok:
+                # Copia o frame para o slot; só nome, posição e forma vão ao processo
+                deslocamento = slot * self._tamanho_slot
+                destino = np.ndarray(frame.shape, dtype=np.uint8,
+                                     buffer=self._memoria.buf, offset=deslocamento)
+                destino[...] = frame
+                argumentos = (self._memoria.name, deslocamento, frame.shape, None)
+            else:
+                # Frame maior que os slots com frames em voo: envia por pickle
+                argumentos = (None, 0, frame.shape, frame)
+
+        futuro = self._executor.submit(_processar_quadro, *argumentos)
+        with self._lock:
+            self._futuros.add(futuro)
+        futuro.add_done_callback(
+            lambda f, s=slot, q=sequencia, o=fonte: self._concluir(f, s, q, o)
+        )
+        return sequencia
+
+    def _concluir(self, futuro, slot: int, sequencia: int, fonte: int):
+        """Recebe o resultado de um frame e libera o slot (thread do executor)"""
+        resultado = ResultadoProcessamento(sequencia, fonte)
+        try:
+            if not futuro.cancelled():
+                resultado.face_locations, resultado.encodings, resultado.duracao = futuro.result()
+        except Exception as e:
+            # O frame segue vazio para não travar a entrega dos seguintes
+            print(f"Erro no processo de reconhecimento: {e}")
+
+        with self._lock:
+            self._futuros.discard(futuro)
+            self._slots_livres.append(slot)
+            self._pendentes -= 1
+            self.frames_processados += 1
+            self.tempo_processamento += resultado.duracao
+
+            # Entrega em ordem: guarda os adiantados até a vez deles
+            adiantados = self._adiantados.setdefault(fonte, [])
+            heapq.heappush(adiantados, (sequencia, id(resultado), resultado))
+            while adiantados and adiantados[0][0] == self._proxima_entrega[fonte]:
+                self._prontos.append(heapq.heappop(adiantados)[2])
+                self._proxima_entrega[fonte] += 1
+        self._evento.set()
+
+    def coletar(self, timeout: Optional[float] = 0.0) -> List[ResultadoProcessamento]:
+        """
+        Retira os resultados prontos, na ordem dos frames de cada fonte
+
+        Args:
+            timeout: Tempo máximo de espera por um resultado (None = indefinido, 0 = não espera)
+
+        Returns:
+            Resultados prontos (lista vazia se nenhum ficou pronto a tempo)
+        """
+        if timeout != 0.0:
+            self._evento.wait(timeout)
+
+        with self._lock:
+            prontos = self._prontos
+            self._prontos = []
+            self._evento.clear()
+        return prontos
+
+    def parar(self):
+        """Encerra os processos do pool e libera a memória compartilhada"""
+        # Cancela os frames que ainda não começaram (cancel_futures só existe a partir do Python 3.9)
+        with self._lock:
+            futuros = list(self._futuros)
+        for futuro in futuros:
+            futuro.cancel()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._liberar_memoria()
+
+        if self.frames_processados:
+            media = self.tempo_processamento / self.frames_processados * 1000
+            print(f"Motor de processos: {self.frames_processados} frames processados, "
+                  f"{self.frames_recusados} recusados, {media:.1f} ms/frame por processo")
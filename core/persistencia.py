@@ -0,0 +1,350 @@
+"""
+Módulo de Persistência da Galeria Facial
+Journal append-only de alterações, snapshot binário mapeado em memória
+e gravação atômica de arquivos
+"""
+
+import os
+import struct
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, BinaryIO, Tuple
+
+import numpy as np
+
+
+# Operações registradas no journal
+OP_CADASTRAR = 1
+OP_REMOVER = 2
+OP_RENOMEAR = 3
+
+# Cabeçalho de cada registro: tamanho do payload e CRC32 do payload
+_CABECALHO = struct.Struct('<II')
+# Início do payload: operação, ID do aluno, tamanho do nome (bytes), dimensão do encoding
+_PAYLOAD = struct.Struct('<BqHH')
+
+
+# Formato binário da galeria (little-endian):
+#   cabeçalho de 96 bytes
+#   matriz float32 (total x dimensão)
+#   IDs int64 (total)
+#   normas ao quadrado float32 (total)
+#   offsets dos nomes uint64 (total + 1)
+#   texto dos nomes em UTF-8
+# Cada seção começa em um offset múltiplo de 64 bytes.
+MAGICO_GALERIA = b"GEGALERI"
+VERSAO_GALERIA = 1
+# mágico, versão, dimensão, total, offsets de matriz, ids, normas, nomes e texto, tamanho do texto
+_CABECALHO_GALERIA = struct.Struct('<8sIIQQQQQQQ')
+_TAMANHO_CABECALHO = 96
+_ALINHAMENTO = 64
+
+
+@dataclass
+class OperacaoGaleria:
+    """Uma alteração registrada no journal da galeria"""
+    operacao: int
+    aluno_id: int
+    nome: str = ""
+    encoding: Optional[np.ndarray] = None
+
+
+def gravar_atomico(caminho: str, escrever: Callable[[BinaryIO], None]):
+    """
+    Grava um arquivo de forma atômica (arquivo temporário + rename)
+
+    Se o processo cair no meio da gravação, o arquivo anterior continua
+    intacto: o rename só acontece depois que o conteúdo novo está no disco.
+
+    No Windows o rename falha com PermissionError se o arquivo de destino
+    estiver aberto ou mapeado em memória (np.memmap) por outro processo.
+    Nesse caso, ou em qualquer outra falha, o arquivo anterior é mantido e o
+    temporário é removido.
+
+    Args:
+        caminho: Caminho final do arquivo
+        escrever: Função que recebe o arquivo temporário aberto e escreve o conteúdo
+
+    Raises:
+        OSError: Se a gravação ou a substituição falhar (PermissionError no
+            caso do arquivo em uso no Windows)
+    """
+    temporario = caminho + ".tmp"
+    try:
+        with open(temporario, 'wb') as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+        raise
+
+    # Garante que o rename também chegou ao disco (não suportado no Windows)
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    try:
+        fd = os.open(diretorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class JournalGaleria:
+    """
+    Journal append-only das alterações da galeria
+
+    Cada registro é gravado com tamanho e CRC32, de modo que um registro
+    incompleto (queda de energia no meio da escrita) é detectado e descartado
+    na leitura. Todas as operações são idempotentes, então reaplicar o journal
+    sobre um snapshot que já as contém produz a mesma galeria.
+    """
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa o journal
+
+        Args:
+            caminho: Caminho do arquivo de journal
+        """
+        self.caminho = caminho
+        self.total_registros = 0
+        self._arquivo: Optional[BinaryIO] = None
+
+    @staticmethod
+    def _codificar(op: OperacaoGaleria) -> bytes:
+        """Serializa uma operação como registro do journal"""
+        nome = op.nome.encode('utf-8')
+        encoding = b""
+        dimensao = 0
+        if op.encoding is not None:
+            vetor = np.ascontiguousarray(op.encoding, dtype='<f4')
+            dimensao = vetor.shape[0]
+            encoding = vetor.tobytes()
+
+        payload = _PAYLOAD.pack(op.operacao, op.aluno_id, len(nome), dimensao) + nome + encoding
+        return _CABECALHO.pack(len(payload), zlib.crc32(payload)) + payload
+
+    @staticmethod
+    def _decodificar(payload: bytes) -> OperacaoGaleria:
+        """Converte o payload de um registro em operação"""
+        operacao, aluno_id, tamanho_nome, dimensao = _PAYLOAD.unpack_from(payload)
+        inicio = _PAYLOAD.size
+        nome = payload[inicio:inicio + tamanho_nome].decode('utf-8')
+        encoding = None
+        if dimensao:
+            encoding = np.frombuffer(payload, dtype='<f4', count=dimensao,
+                                     offset=inicio + tamanho_nome).astype(np.float32)
+        return OperacaoGaleria(operacao, aluno_id, nome, encoding)
+
+    def ler(self) -> Iterator[OperacaoGaleria]:
+        """
+        Lê as operações registradas, na ordem em que foram gravadas
+
+        Um registro final incompleto ou corrompido encerra a leitura e é
+        removido do arquivo, para que novas operações sejam anexadas depois
+        do último registro válido.
+        """
+        self.total_registros = 0
+        if not os.path.exists(self.caminho):
+            return
+
+        with open(self.caminho, 'rb') as f:
+            dados = f.read()
+
+        posicao = 0
+        while posicao + _CABECALHO.size <= len(dados):
+            tamanho, crc = _CABECALHO.unpack_from(dados, posicao)
+            inicio = posicao + _CABECALHO.size
+            payload = dados[inicio:inicio + tamanho]
+            if len(payload) < tamanho or zlib.crc32(payload) != crc:
+                break
+            posicao = inicio + tamanho
+            self.total_registros += 1
+            yield self._decodificar(payload)
+
+        if posicao < len(dados):
+            print(f"AVISO: Journal da galeria truncado em {posicao} bytes (registro incompleto)")
+            self.fechar()
+            with open(self.caminho, 'r+b') as f:
+                f.truncate(posicao)
+
+    def anexar(self, operacoes: List[OperacaoGaleria]):
+        """
+        Anexa operações ao journal com um único fsync
+
+        Args:
+            operacoes: Operações a registrar (um lote inteiro custa um fsync)
+
+        Raises:
+            OSError: Se o lote não pôde ser gravado; o que chegou a ser escrito
+                dele é descartado, para não esconder os lotes seguintes na leitura
+        """
+        if not operacoes:
+            return
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, 'ab')
+        posicao = self._arquivo.tell()
+        try:
+            self._arquivo.write(b"".join(self._codificar(op) for op in operacoes))
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+        except OSError:
+            self._descartar_a_partir(posicao)
+            raise
+        self.total_registros += len(operacoes)
+
+    def _descartar_a_partir(self, posicao: int):
+        """Fecha o arquivo e remove o lote parcialmente gravado a partir de posicao"""
+        try:
+            self.fechar()
+        except OSError:
+            self._arquivo = None
+        try:
+            with open(self.caminho, 'r+b') as f:
+                f.truncate(posicao)
+        except OSError as e:
+            # A próxima leitura para no registro parcial e o remove do arquivo
+            print(f"Erro ao descartar lote incompleto do journal: {e}")
+
+    def truncar(self):
+        """Esvazia o journal (após a compactação em snapshot)"""
+        self.fechar()
+        with open(self.caminho, 'wb') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.total_registros = 0
+
+    def fechar(self):
+        """Fecha o arquivo do journal"""
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class TabelaNomes(Sequence):
+    """
+    Tabela de nomes lida sob demanda do arquivo binário
+
+    Os nomes só são decodificados quando acessados, então abrir a galeria
+    não custa nada proporcional ao número de alunos.
+    """
+
+    def __init__(self, offsets: np.ndarray, texto: np.ndarray):
+        self._offsets = offsets
+        self._texto = texto
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        inicio, fim = int(self._offsets[indice]), int(self._offsets[indice + 1])
+        return bytes(self._texto[inicio:fim]).decode('utf-8')
+
+
+def _alinhar(posicao: int) -> int:
+    """Arredonda a posição para o próximo múltiplo do alinhamento"""
+    return (posicao + _ALINHAMENTO - 1) // _ALINHAMENTO * _ALINHAMENTO
+
+
+def gravar_galeria_binaria(f: BinaryIO, matriz: np.ndarray, ids: np.ndarray,
+                           normas: np.ndarray, nomes: Sequence[str]):
+    """
+    Escreve a galeria no formato binário versionado
+
+    Args:
+        f: Arquivo aberto em modo binário
+        matriz: Matriz de encodings (total x dimensão)
+        ids: IDs dos alunos
+        normas: Normas ao quadrado de cada encoding
+        nomes: Nomes dos alunos
+    """
+    total, dimensao = matriz.shape
+    nomes_bytes = [nome.encode('utf-8') for nome in nomes]
+    offsets = np.zeros(total + 1, dtype='<u8')
+    if total:
+        np.cumsum([len(n) for n in nomes_bytes], out=offsets[1:])
+    texto = b"".join(nomes_bytes)
+
+    secoes = [
+        np.ascontiguousarray(matriz, dtype='<f4').tobytes(),
+        np.ascontiguousarray(ids, dtype='<i8').tobytes(),
+        np.ascontiguousarray(normas, dtype='<f4').tobytes(),
+        offsets.tobytes(),
+        texto,
+    ]
+    posicoes = []
+    posicao = _TAMANHO_CABECALHO
+    for secao in secoes:
+        posicao = _alinhar(posicao)
+        posicoes.append(posicao)
+        posicao += len(secao)
+
+    cabecalho = _CABECALHO_GALERIA.pack(
+        MAGICO_GALERIA, VERSAO_GALERIA, dimensao, total, *posicoes, len(texto)
+    )
+    f.write(cabecalho.ljust(_TAMANHO_CABECALHO, b"\0"))
+    escrito = _TAMANHO_CABECALHO
+    for inicio, secao in zip(posicoes, secoes):
+        f.write(b"\0" * (inicio - escrito))
+        f.write(secao)
+        escrito = inicio + len(secao)
+
+
+def abrir_galeria_binaria(caminho: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, TabelaNomes]:
+    """
+    Abre a galeria binária com numpy.memmap (custo O(1), sem ler os dados)
+
+    O mapeamento é copy-on-write: alterações em memória não tocam o arquivo,
+    e processos que abrem o mesmo arquivo compartilham as páginas do cache
+    do sistema operacional enquanto não as modificam.
+
+    Args:
+        caminho: Caminho do arquivo binário
+
+    Returns:
+        Tupla (matriz, ids, normas, nomes)
+
+    Raises:
+        ValueError: Se o arquivo não estiver no formato esperado
+    """
+    tamanho_arquivo = os.path.getsize(caminho)
+    with open(caminho, 'rb') as f:
+        cabecalho = f.read(_TAMANHO_CABECALHO)
+    if len(cabecalho) < _CABECALHO_GALERIA.size:
+        raise ValueError("Arquivo da galeria truncado")
+
+    (magico, versao, dimensao, total, pos_matriz, pos_ids, pos_normas,
+     pos_offsets, pos_texto, tamanho_texto) = _CABECALHO_GALERIA.unpack_from(cabecalho)
+    if magico != MAGICO_GALERIA:
+        raise ValueError("Arquivo não é uma galeria do Guardião Escolar")
+    if versao != VERSAO_GALERIA:
+        raise ValueError(f"Versão da galeria não suportada: {versao}")
+    if pos_texto + tamanho_texto > tamanho_arquivo:
+        raise ValueError("Arquivo da galeria truncado")
+
+    def mapear(dtype, posicao, forma):
+        if np.prod(forma) == 0:
+            return np.zeros(forma, dtype=dtype)
+        return np.memmap(caminho, dtype=dtype, mode='c', offset=posicao, shape=forma)
+
+    matriz = mapear('<f4', pos_matriz, (total, dimensao))
+    ids = mapear('<i8', pos_ids, (total,))
+    normas = mapear('<f4', pos_normas, (total,))
+    offsets = mapear('<u8', pos_offsets, (total + 1,))
+    texto = mapear('u1', pos_texto, (tamanho_texto,))
+    return matriz, ids, normas, TabelaNomes(offsets, texto)
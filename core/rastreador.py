@@ -0,0 +1,183 @@
+"""
+Módulo de Rastreamento de Rostos
+Associa rostos detectados entre frames para evitar encodings repetidos
+"""
+
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .facial_recognition import ResultadoReconhecimento
+
+
+@dataclass
+class Trilha:
+    """Um rosto acompanhado ao longo de vários frames"""
+    id: int
+    face_location: Tuple[int, int, int, int]
+    visto_em: float  # time.monotonic() da última detecção associada
+    resultado: Optional[ResultadoReconhecimento] = None  # Último reconhecimento
+    avaliado_em: float = 0.0  # Momento do último encoding
+
+    @property
+    def identificada(self) -> bool:
+        """Indica se a trilha já foi associada a um aluno"""
+        return self.resultado is not None and self.resultado.reconhecido
+
+
+def calcular_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Calcula a interseção sobre união entre dois conjuntos de retângulos
+
+    Args:
+        a: Array (N, 4) no formato (top, right, bottom, left)
+        b: Array (M, 4) no mesmo formato
+
+    Returns:
+        Matriz (N, M) de IoU
+    """
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+
+    intersecao = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    uniao = area_a[:, None] + area_b[None, :] - intersecao
+    return np.where(uniao > 0, intersecao / np.maximum(uniao, 1), 0.0)
+
+
+class RastreadorRostos:
+    """
+    Rastreador de rostos por sobreposição (IoU) entre detecções consecutivas
+
+    Cada rosto recebe uma trilha com ID próprio. Quando a trilha é reconhecida
+    com confiança alta, a identidade fica em cache e não é preciso gerar o
+    encoding de novo enquanto a confiança (que decai com o tempo) não cair
+    abaixo do mínimo. Assim o mesmo aluno parado em frente à câmera custa
+    aproximadamente um encoding, em vez de um por ciclo de reconhecimento.
+    """
+
+    def __init__(self, iou_minimo: float = 0.3, tempo_perda: float = 1.0,
+                 confianca_minima: float = 50.0, meia_vida: float = 10.0,
+                 intervalo_desconhecido: float = 0.5):
+        """
+        Inicializa o rastreador
+
+        Args:
+            iou_minimo: Sobreposição mínima para associar uma detecção a uma trilha
+            tempo_perda: Segundos sem detecção até a trilha ser descartada
+            confianca_minima: Confiança (%) abaixo da qual a identidade é reavaliada
+            meia_vida: Segundos para a confiança em cache cair pela metade
+            intervalo_desconhecido: Intervalo mínimo entre encodings de um rosto não reconhecido
+        """
+        self.iou_minimo = iou_minimo
+        self.tempo_perda = tempo_perda
+        self.confianca_minima = confianca_minima
+        self.meia_vida = meia_vida
+        self.intervalo_desconhecido = intervalo_desconhecido
+
+        self.trilhas: List[Trilha] = []
+        self._proximo_id = 1
+
+        # Estatísticas
+        self.encodings_realizados = 0
+        self.encodings_evitados = 0
+
+    def atualizar(self, face_locations: List[Tuple[int, int, int, int]],
+                  agora: Optional[float] = None) -> List[Trilha]:
+        """
+        Associa as detecções do frame atual às trilhas existentes
+
+        Args:
+            face_locations: Rostos detectados (top, right, bottom, left)
+            agora: Horário do frame (time.monotonic() se omitido)
+
+        Returns:
+            Uma trilha por detecção, na mesma ordem de ``face_locations``
+        """
+        if agora is None:
+            agora = time.monotonic()
+
+        # Descarta trilhas que não são vistas há muito tempo
+        self.trilhas = [t for t in self.trilhas if agora - t.visto_em <= self.tempo_perda]
+
+        resultado: List[Optional[Trilha]] = [None] * len(face_locations)
+        if face_locations and self.trilhas:
+            iou = calcular_iou(
+                np.asarray(face_locations, dtype=np.float64),
+                np.asarray([t.face_location for t in self.trilhas], dtype=np.float64)
+            )
+            # Associação gulosa: pares com maior sobreposição primeiro
+            usadas = set()
+            for indice in np.argsort(-iou, axis=None):
+                deteccao, trilha = np.unravel_index(indice, iou.shape)
+                if iou[deteccao, trilha] < self.iou_minimo:
+                    break
+                if resultado[deteccao] is not None or trilha in usadas:
+                    continue
+                resultado[deteccao] = self.trilhas[trilha]
+                usadas.add(trilha)
+
+        for i, face_location in enumerate(face_locations):
+            trilha = resultado[i]
+            if trilha is None:
+                trilha = Trilha(self._proximo_id, face_location, agora)
+                self._proximo_id += 1
+                self.trilhas.append(trilha)
+                resultado[i] = trilha
+            trilha.face_location = face_location
+            trilha.visto_em = agora
+
+        return resultado
+
+    def confianca_atual(self, trilha: Trilha, agora: Optional[float] = None) -> float:
+        """Confiança da identidade em cache, com decaimento exponencial"""
+        if not trilha.identificada:
+            return 0.0
+        if agora is None:
+            agora = time.monotonic()
+        decorrido = max(0.0, agora - trilha.avaliado_em)
+        return trilha.resultado.confianca * 0.5 ** (decorrido / self.meia_vida)
+
+    def precisa_codificar(self, trilha: Trilha, agora: Optional[float] = None) -> bool:
+        """
+        Indica se a trilha precisa de um novo encoding
+
+        Returns:
+            True para trilhas novas, não reconhecidas (respeitando o intervalo
+            mínimo) ou cuja confiança decaiu abaixo do mínimo
+        """
+        if agora is None:
+            agora = time.monotonic()
+
+        if trilha.resultado is None:
+            precisa = True
+        elif not trilha.identificada:
+            precisa = agora - trilha.avaliado_em >= self.intervalo_desconhecido
+        else:
+            precisa = self.confianca_atual(trilha, agora) < self.confianca_minima
+
+        if not precisa:
+            self.encodings_evitados += 1
+        return precisa
+
+    def registrar_resultado(self, trilha: Trilha, resultado: ResultadoReconhecimento,
+                            agora: Optional[float] = None):
+        """Guarda o resultado do encoding na trilha"""
+        trilha.resultado = resultado
+        trilha.avaliado_em = time.monotonic() if agora is None else agora
+        self.encodings_realizados += 1
+
+    def resultado_em_cache(self, trilha: Trilha) -> Optional[ResultadoReconhecimento]:
+        """Retorna o último resultado da trilha com a posição atual do rosto"""
+        if trilha.resultado is None:
+            return None
+        return replace(trilha.resultado, face_location=trilha.face_location)
+
+    def limpar(self):
+        """Descarta todas as trilhas"""
+        self.trilhas = []
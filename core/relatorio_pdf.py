@@ -0,0 +1,233 @@
+"""
+Módulo do Relatório PDF
+Desenho das páginas do relatório de registros com o reportlab
+(importado apenas quando um PDF é exportado)
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+from .relatorios import InfoRelatorio
+
+
+class PaginasPdf:
+    """
+    Desenha o relatório PDF página a página, direto no canvas
+
+    Cada página recebe uma tabela própria com no máximo as linhas que cabem
+    nela, com alturas de linha e larguras de coluna fixas. Assim o reportlab
+    nunca precisa dividir uma tabela grande entre páginas, e o custo de
+    cada página é o mesmo do início ao fim do relatório. Os comandos de
+    estilo comuns são montados uma única vez e os TableStyle de cada
+    sequência de entradas/saídas ficam em cache.
+    """
+
+    MARGEM = 15 * mm
+    ALTURA_CABECALHO_TABELA = 22
+    ALTURA_LINHA = 17
+    ALTURA_RODAPE = 12 * mm
+    MAX_ESTILOS_EM_CACHE = 512
+
+    COLUNAS = ["Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança", "Modo"]
+    LARGURAS = [60, 180, 80, 60, 60, 60, 50]
+
+    def __init__(self, arquivo: str, info: InfoRelatorio):
+        self.info = info
+        self.canvas = Canvas(arquivo, pagesize=landscape(A4), pageCompression=1)
+        self.canvas.setTitle(info.titulo)
+        self.largura, self.altura = landscape(A4)
+        self.gerado_em = datetime.now().strftime("%d/%m/%Y às %H:%M")
+
+        self.colunas = (["Data"] if info.varios_dias else []) + self.COLUNAS
+        self.larguras = ([65] if info.varios_dias else []) + self.LARGURAS
+        self._coluna_nome = self.colunas.index("Nome")
+
+        estilos = getSampleStyleSheet()
+        self.estilo_escola = ParagraphStyle('Escola', parent=estilos['Heading1'], fontSize=20,
+                                            textColor=colors.HexColor('#E94560'), alignment=1)
+        self.estilo_titulo = ParagraphStyle('Titulo', parent=estilos['Heading2'], fontSize=14,
+                                            textColor=colors.HexColor('#333333'), alignment=1)
+        self.estilo_texto = ParagraphStyle('Resumo', parent=estilos['Normal'], fontSize=11, alignment=1)
+        self.estilo_secao = ParagraphStyle('Secao', parent=estilos['Heading3'], fontSize=12,
+                                           textColor=colors.HexColor('#E94560'))
+        self.estilo_creditos = ParagraphStyle('Creditos', parent=estilos['Normal'], fontSize=9,
+                                              textColor=colors.HexColor('#3498db'), alignment=1)
+
+        self.cor_entrada = colors.HexColor('#D5F5E3')
+        self.cor_saida = colors.HexColor('#FADBD8')
+        self._comandos_base = [
+            # Cabeçalho
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E94560')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+
+            # Corpo
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (self._coluna_nome, 1), (self._coluna_nome, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+
+            # Bordas
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#3a3a5c')),
+        ]
+        self._estilos: Dict[bytes, TableStyle] = {}
+
+        self.pagina = 0
+        self.secao: Optional[str] = None
+        self.linhas: List[list] = []
+        self.entradas = bytearray()
+        self.topo = 0.0  # Posição vertical onde começa a tabela da página atual
+        self.capacidade = 0  # Linhas que cabem na página atual
+
+    # ==================== PÁGINAS ====================
+
+    def _paragrafo(self, texto: str, estilo, y: float) -> float:
+        """Desenha um parágrafo centralizado na largura útil e retorna o y abaixo dele"""
+        paragrafo = Paragraph(texto, estilo)
+        largura_util = self.largura - 2 * self.MARGEM
+        _, altura = paragrafo.wrapOn(self.canvas, largura_util, self.altura)
+        paragrafo.drawOn(self.canvas, self.MARGEM, y - altura)
+        return y - altura - estilo.spaceAfter
+
+    def _nova_pagina(self):
+        """Fecha a página atual (se houver) e prepara a próxima"""
+        if self.pagina:
+            self._desenhar_rodape()
+            self.canvas.showPage()
+        self.pagina += 1
+
+        y = self.altura - self.MARGEM
+        if self.pagina == 1:
+            y = self._paragrafo(self.info.escola, self.estilo_escola, y)
+            y = self._paragrafo(self.info.titulo, self.estilo_titulo, y)
+            if self.info.resumo is not None:
+                entradas = sum(t['entrada'] for t in self.info.resumo.values())
+                saidas = sum(t['saida'] for t in self.info.resumo.values())
+                y = self._paragrafo(
+                    f"<b>Total:</b> {entradas + saidas} registros | <b>Entradas:</b> {entradas} | "
+                    f"<b>Saídas:</b> {saidas}", self.estilo_texto, y
+                ) - 10
+        else:
+            self.canvas.setFont('Helvetica', 8)
+            self.canvas.setFillColor(colors.gray)
+            self.canvas.drawString(self.MARGEM, y - 8, f"{self.info.escola} - {self.info.titulo}")
+            y -= 18
+
+        if self.secao is not None:
+            y = self._paragrafo(self._titulo_secao(), self.estilo_secao, y)
+
+        self.topo = y
+        disponivel = y - self.MARGEM - self.ALTURA_RODAPE - self.ALTURA_CABECALHO_TABELA
+        self.capacidade = max(1, int(disponivel // self.ALTURA_LINHA))
+
+    def _titulo_secao(self) -> str:
+        """Título da seção (turma) com os totais do resumo"""
+        titulo = f"Turma {self.secao or '---'}"
+        totais = (self.info.resumo or {}).get(self.secao)
+        if totais:
+            titulo += f" - Entradas: {totais['entrada']} | Saídas: {totais['saida']}"
+        return titulo
+
+    def _desenhar_rodape(self):
+        """Data de geração e número da página"""
+        self.canvas.setFont('Helvetica', 8)
+        self.canvas.setFillColor(colors.gray)
+        self.canvas.drawString(self.MARGEM, self.MARGEM, f"Relatório gerado em {self.gerado_em}")
+        self.canvas.drawRightString(self.largura - self.MARGEM, self.MARGEM, f"Página {self.pagina}")
+
+    # ==================== TABELAS ====================
+
+    def _estilo(self, entradas: bytes) -> TableStyle:
+        """TableStyle da sequência de tipos da página (em cache)"""
+        estilo = self._estilos.get(entradas)
+        if estilo is not None:
+            return estilo
+
+        # Um comando BACKGROUND por sequência de linhas do mesmo tipo
+        comandos = list(self._comandos_base)
+        inicio = 0
+        for i in range(1, len(entradas) + 1):
+            if i == len(entradas) or entradas[i] != entradas[inicio]:
+                cor = self.cor_entrada if entradas[inicio] else self.cor_saida
+                comandos.append(('BACKGROUND', (0, inicio + 1), (-1, i), cor))
+                inicio = i
+
+        estilo = TableStyle(comandos)
+        if len(self._estilos) >= self.MAX_ESTILOS_EM_CACHE:
+            self._estilos.clear()
+        self._estilos[bytes(entradas)] = estilo
+        return estilo
+
+    def _desenhar_tabela(self):
+        """Desenha as linhas acumuladas como a tabela da página atual"""
+        if not self.linhas:
+            return
+        tabela = Table(
+            [self.colunas] + self.linhas,
+            colWidths=self.larguras,
+            rowHeights=[self.ALTURA_CABECALHO_TABELA] + [self.ALTURA_LINHA] * len(self.linhas),
+            style=self._estilo(bytes(self.entradas))
+        )
+        largura, altura = tabela.wrapOn(self.canvas, self.largura, self.altura)
+        tabela.drawOn(self.canvas, (self.largura - largura) / 2, self.topo - altura)
+        self.topo -= altura
+        self.linhas = []
+        self.entradas = bytearray()
+
+    # ==================== INTERFACE ====================
+
+    def iniciar_secao(self, secao: str):
+        """Começa uma nova seção (turma) em uma nova página"""
+        self._desenhar_tabela()
+        self.secao = secao
+        self._nova_pagina()
+
+    def adicionar(self, linha: tuple):
+        """Adiciona uma linha do banco, desenhando a página quando ela fica cheia"""
+        if not self.pagina:
+            self._nova_pagina()
+        elif len(self.linhas) >= self.capacidade:
+            self._desenhar_tabela()
+            self._nova_pagina()
+
+        data_hora = linha[0] or ""
+        valores = [
+            data_hora[11:19] or "--:--:--",
+            linha[1] or "---",
+            linha[2] or "---",
+            linha[3] or "---",
+            "Entrada" if linha[4] == "entrada" else "Saída",
+            f"{linha[5] or 0.0:.1f}%",
+            "Manual" if linha[6] else "Auto"
+        ]
+        if self.info.varios_dias:
+            valores.insert(0, f"{data_hora[8:10]}/{data_hora[5:7]}/{data_hora[0:4]}" if data_hora else "")
+        self.linhas.append(valores)
+        self.entradas.append(1 if linha[4] == "entrada" else 0)
+
+    def finalizar(self):
+        """Desenha o que falta e os créditos e grava o arquivo"""
+        if not self.pagina:
+            self._nova_pagina()
+        self._desenhar_tabela()
+
+        if self.info.rodape:
+            texto = "<br/>".join(self.info.rodape)
+            if self.topo - self.MARGEM - self.ALTURA_RODAPE < 40:
+                self.secao = None
+                self._nova_pagina()
+            self._paragrafo(texto, self.estilo_creditos, self.topo - 15)
+
+        self._desenhar_rodape()
+        self.canvas.save()
@@ -0,0 +1,315 @@
+"""
+Módulo de Relatórios
+Exportação dos registros em streaming: as linhas chegam do banco em lotes
+e são escritas direto no arquivo, sem montar a lista completa na memória
+"""
+
+import csv
+import importlib.util
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Bibliotecas opcionais de exportação. Só se verifica aqui se estão
+# instaladas: juntas levam centenas de ms para importar, então são
+# importadas apenas na primeira exportação do formato.
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+
+# Colunas dos arquivos exportados
+CABECALHO_REGISTROS = ["Data", "Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança (%)", "Modo"]
+
+# Buffer de escrita dos arquivos de texto
+TAMANHO_BUFFER = 1024 * 1024
+
+# Largura das colunas da planilha, na ordem de CABECALHO_REGISTROS
+LARGURAS_EXCEL = [12, 10, 30, 12, 10, 10, 14, 12]
+
+
+class ExportacaoCancelada(Exception):
+    """Exportação interrompida a pedido do usuário"""
+
+
+@dataclass
+class InfoRelatorio:
+    """Textos de cabeçalho e rodapé de um relatório"""
+    escola: str
+    titulo: str
+    rodape: List[str] = field(default_factory=list)
+    varios_dias: bool = False  # Inclui a data nas tabelas do PDF
+    resumo: Optional[Dict[str, dict]] = None  # turma -> {'entrada': total, 'saida': total}
+
+
+def descrever_periodo(data_inicio: date, data_fim: date) -> str:
+    """Período no formato usado nos títulos ("dd/mm/aaaa" ou "dd/mm/aaaa a dd/mm/aaaa")"""
+    if data_inicio == data_fim:
+        return data_inicio.strftime("%d/%m/%Y")
+    return f"{data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
+
+
+def formatar_linha(linha: tuple) -> list:
+    """
+    Converte uma linha do banco para as colunas de CABECALHO_REGISTROS
+
+    A data e o horário são recortados do texto ISO, sem criar datetime.
+
+    Args:
+        linha: (data_hora, nome, matrícula, turma, tipo, confiança, manual, ...)
+    """
+    data_hora = linha[0] or ""
+    return [
+        f"{data_hora[8:10]}/{data_hora[5:7]}/{data_hora[0:4]}" if data_hora else "",
+        data_hora[11:19],
+        linha[1] or "",
+        linha[2] or "",
+        linha[3] or "",
+        "Entrada" if linha[4] == "entrada" else "Saída",
+        f"{linha[5] or 0.0:.1f}",
+        "Manual" if linha[6] else "Automático"
+    ]
+
+
+def acompanhar(lotes: Iterable[List[tuple]], total: int = 0,
+               progresso: Optional[Callable[[int, int], None]] = None,
+               cancelar: Optional[threading.Event] = None) -> Iterator[List[tuple]]:
+    """
+    Repassa os lotes informando o progresso e atendendo ao cancelamento
+
+    Args:
+        lotes: Lotes de linhas vindos do banco
+        total: Total esperado de linhas (0 = desconhecido)
+        progresso: Chamado com (linhas processadas, total) após cada lote
+        cancelar: Evento que interrompe a exportação
+
+    Raises:
+        ExportacaoCancelada: Se o evento de cancelamento for acionado
+    """
+    processadas = 0
+    for lote in lotes:
+        if cancelar is not None and cancelar.is_set():
+            raise ExportacaoCancelada()
+        yield lote
+        processadas += len(lote)
+        if progresso:
+            progresso(processadas, total)
+
+
+@contextmanager
+def destino_temporario(arquivo: str):
+    """
+    Entrega um caminho temporário que substitui o arquivo final apenas no sucesso
+
+    Uma exportação cancelada ou com erro não deixa arquivo parcial nem
+    sobrescreve um relatório anterior com o mesmo nome.
+    """
+    temporario = arquivo + ".parcial"
+    try:
+        yield temporario
+        os.replace(temporario, arquivo)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def exportar_csv(lotes: Iterable[List[tuple]], arquivo: str, info: InfoRelatorio, total: int = 0,
+                 progresso: Optional[Callable[[int, int], None]] = None,
+                 cancelar: Optional[threading.Event] = None) -> int:
+    """
+    Exporta os registros para CSV (separador ";", UTF-8 com BOM para o Excel)
+
+    Args:
+        lotes: Lotes de linhas vindos do banco (ex.: Database.ler_registros_em_lotes)
+        arquivo: Caminho do arquivo de saída
+        info: Cabeçalho e rodapé do relatório
+        total: Total esperado de linhas, para o progresso
+        progresso: Chamado com (linhas escritas, total) após cada lote
+        cancelar: Evento que interrompe a exportação
+
+    Returns:
+        Número de registros exportados
+
+    Raises:
+        ExportacaoCancelada: Se o evento de cancelamento for acionado
+    """
+    escritas = 0
+    with destino_temporario(arquivo) as temporario:
+        with open(temporario, 'w', newline='', encoding='utf-8-sig', buffering=TAMANHO_BUFFER) as f:
+            writer = csv.writer(f, delimiter=';')
+
+            # Informações da escola
+            writer.writerow([info.escola])
+            writer.writerow([info.titulo])
+            writer.writerow([])  # Linha em branco
+
+            writer.writerow(CABECALHO_REGISTROS)
+            for lote in acompanhar(lotes, total, progresso, cancelar):
+                writer.writerows(map(formatar_linha, lote))
+                escritas += len(lote)
+
+            # Rodapé com créditos
+            writer.writerow([])
+            for linha in info.rodape:
+                writer.writerow([linha])
+
+    return escritas
+
+
+def _estilos_excel() -> list:
+    """Estilos nomeados da planilha, compartilhados por todas as células de cada tipo"""
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+    borda = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    centro = Alignment(horizontal="center", vertical="center")
+
+    def preenchimento(cor: str) -> PatternFill:
+        return PatternFill(start_color=cor, end_color=cor, fill_type="solid")
+
+    return [
+        NamedStyle("ge_escola", font=Font(bold=True, size=16, color="E94560")),
+        NamedStyle("ge_titulo", font=Font(bold=True, size=12)),
+        NamedStyle("ge_cabecalho", font=Font(bold=True, color="FFFFFF", size=11),
+                   fill=preenchimento("E94560"), alignment=centro, border=borda),
+        NamedStyle("ge_entrada", fill=preenchimento("D5F5E3"), alignment=centro, border=borda),
+        NamedStyle("ge_saida", fill=preenchimento("FADBD8"), alignment=centro, border=borda),
+        NamedStyle("ge_resumo", font=Font(bold=True)),
+        NamedStyle("ge_rodape", font=Font(italic=True, size=9, color="666666")),
+        NamedStyle("ge_creditos", font=Font(italic=True, size=9, color="3498DB")),
+    ]
+
+
+def exportar_excel(lotes: Iterable[List[tuple]], arquivo: str, info: InfoRelatorio, total: int = 0,
+                   progresso: Optional[Callable[[int, int], None]] = None,
+                   cancelar: Optional[threading.Event] = None) -> int:
+    """
+    Exporta os registros para Excel (.xlsx) em modo write-only
+
+    No modo write-only o openpyxl grava cada linha no arquivo assim que
+    ela é adicionada, então a memória não cresce com o número de linhas.
+    Os estilos são nomeados e registrados uma única vez; cada tipo de
+    registro tem uma linha de células já estilizada, reaproveitada com
+    novos valores a cada append.
+
+    Args e retorno iguais aos de exportar_csv.
+
+    Raises:
+        ExportacaoCancelada: Se o evento de cancelamento for acionado
+        RuntimeError: Se a biblioteca openpyxl não estiver instalada
+    """
+    if not OPENPYXL_AVAILABLE:
+        raise RuntimeError("Biblioteca openpyxl não instalada")
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    for estilo in _estilos_excel():
+        wb.add_named_style(estilo)
+
+    ws = wb.create_sheet("Registros")
+    for coluna, largura in enumerate(LARGURAS_EXCEL, 1):
+        ws.column_dimensions[get_column_letter(coluna)].width = largura
+    ws.freeze_panes = "A5"
+
+    def celula(valor, estilo: str):
+        c = WriteOnlyCell(ws, valor)
+        c.style = estilo
+        return c
+
+    ws.append([celula(info.escola, "ge_escola")])
+    ws.append([celula(info.titulo, "ge_titulo")])
+    ws.append([])
+    ws.append([celula(titulo, "ge_cabecalho") for titulo in CABECALHO_REGISTROS])
+
+    linha_entrada = [celula(None, "ge_entrada") for _ in CABECALHO_REGISTROS]
+    linha_saida = [celula(None, "ge_saida") for _ in CABECALHO_REGISTROS]
+
+    escritas = 0
+    entradas = 0
+    for lote in acompanhar(lotes, total, progresso, cancelar):
+        for linha in lote:
+            valores = formatar_linha(linha)
+            valores[6] = linha[5] or 0.0  # Confiança como número
+            if linha[4] == "entrada":
+                celulas = linha_entrada
+                entradas += 1
+            else:
+                celulas = linha_saida
+            for c, valor in zip(celulas, valores):
+                c.value = valor
+            ws.append(celulas)
+        escritas += len(lote)
+
+    # Resumo
+    ws.append([])
+    ws.append([celula("Resumo:", "ge_resumo")])
+    ws.append([f"Total: {escritas}"])
+    ws.append([f"Entradas: {entradas}"])
+    ws.append([f"Saídas: {escritas - entradas}"])
+
+    # Créditos
+    ws.append([])
+    for indice, texto in enumerate(info.rodape):
+        ws.append([celula(texto, "ge_rodape" if indice == 0 else "ge_creditos")])
+
+    with destino_temporario(arquivo) as temporario:
+        wb.save(temporario)
+
+    return escritas
+
+
+def exportar_pdf(lotes: Iterable[List[tuple]], arquivo: str, info: InfoRelatorio, total: int = 0,
+                 progresso: Optional[Callable[[int, int], None]] = None,
+                 cancelar: Optional[threading.Event] = None, por_turma: bool = False) -> int:
+    """
+    Exporta os registros para PDF, uma tabela por página
+
+    As páginas são desenhadas conforme os lotes chegam do banco, então o
+    progresso e o cancelamento acompanham a geração do arquivo, e o tempo
+    cresce linearmente com o número de páginas.
+
+    Args e retorno iguais aos de exportar_csv, além de:
+        por_turma: Uma seção por turma, cada uma começando em nova página
+            (os lotes devem vir ordenados por turma)
+
+    Raises:
+        ExportacaoCancelada: Se o evento de cancelamento for acionado
+        RuntimeError: Se a biblioteca reportlab não estiver instalada
+    """
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("Biblioteca reportlab não instalada")
+
+    from .relatorio_pdf import PaginasPdf
+
+    escritas = 0
+    with destino_temporario(arquivo) as temporario:
+        paginas = PaginasPdf(temporario, info)
+        secao = None
+        for lote in acompanhar(lotes, total, progresso, cancelar):
+            for linha in lote:
+                if por_turma and (escritas == 0 or linha[3] != secao):
+                    secao = linha[3]
+                    paginas.iniciar_secao(secao)
+                paginas.adicionar(linha)
+                escritas += 1
+        paginas.finalizar()
+
+    return escritas
+
+
+# Exportadores disponíveis, por formato
+EXPORTADORES = {
+    "csv": exportar_csv,
+    "xlsx": exportar_excel,
+    "pdf": exportar_pdf,
+}
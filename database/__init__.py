@@ -1,4 +1,7 @@
 # Módulo de banco de dados
-from .models import Database, Aluno, Registro
+from .models import Database, Aluno, AlunoResumo, Registro
+from .conexoes import ConfiguracaoBanco, GerenciadorConexoes
+from .escritor import EscritorRegistros
 
-__all__ = ['Database', 'Aluno', 'Registro']
+__all__ = ['Database', 'Aluno', 'AlunoResumo', 'Registro', 'ConfiguracaoBanco', 'GerenciadorConexoes',
+           'EscritorRegistros']
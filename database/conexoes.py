@@ -0,0 +1,151 @@
+"""
+Módulo de gerenciamento de conexões SQLite
+Uma conexão por thread, modo WAL e pragmas de desempenho
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+# Valores aceitos por PRAGMA synchronous (o valor é interpolado no SQL)
+MODOS_SYNCHRONOUS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+@dataclass
+class ConfiguracaoBanco:
+    """Parâmetros das conexões com o banco de dados"""
+    wal: bool = True  # Journal WAL: leitores não bloqueiam o escritor
+    synchronous: str = "NORMAL"  # OFF, NORMAL, FULL ou EXTRA
+    cache_mb: int = 16  # Cache de páginas por conexão
+    mmap_mb: int = 256  # Leitura do arquivo via mmap (0 = desativado)
+    max_conexoes: int = 4  # Conexões ociosas mantidas para reaproveitamento
+    timeout: float = 5.0  # Segundos de espera quando o banco está bloqueado
+
+    def __post_init__(self):
+        modo = str(self.synchronous).strip().upper()
+        if modo not in MODOS_SYNCHRONOUS:
+            raise ValueError(f"Modo synchronous inválido: {self.synchronous!r} "
+                             f"(use {', '.join(MODOS_SYNCHRONOUS)})")
+        self.synchronous = modo
+
+
+class GerenciadorConexoes:
+    """
+    Entrega uma conexão SQLite exclusiva para cada thread
+
+    Cada thread recebe sua própria conexão, então uma consulta longa de
+    relatório em uma thread não disputa o cursor com as inserções da
+    portaria em outra. Com o journal em WAL, leitores e o escritor também
+    não se bloqueiam no arquivo.
+
+    Conexões de threads encerradas (ou liberadas com ``liberar``) voltam
+    para um pool e são reaproveitadas pela próxima thread que pedir uma.
+    """
+
+    def __init__(self, db_path: str, configuracao: Optional[ConfiguracaoBanco] = None):
+        """
+        Inicializa o gerenciador
+
+        Args:
+            db_path: Caminho do arquivo do banco
+            configuracao: Pragmas e tamanho do pool (padrão se omitido)
+        """
+        self.db_path = db_path
+        self.configuracao = configuracao or ConfiguracaoBanco()
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Chave é a própria Thread: o ident pode ser reutilizado pelo SO depois que ela termina
+        self._em_uso: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._ociosas: List[sqlite3.Connection] = []
+        self._fechado = False
+
+        # Estatísticas
+        self.conexoes_criadas = 0
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        """Abre uma nova conexão e aplica os pragmas configurados"""
+        cfg = self.configuracao
+        # A conexão pode passar para outra thread depois que a dona termina
+        conn = sqlite3.connect(self.db_path, timeout=cfg.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+
+        if cfg.wal:
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={cfg.synchronous}')
+        conn.execute(f'PRAGMA cache_size={-int(cfg.cache_mb) * 1024}')
+        conn.execute(f'PRAGMA mmap_size={int(cfg.mmap_mb) * 1024 * 1024}')
+
+        self.conexoes_criadas += 1
+        return conn
+
+    def _recuperar_abandonadas(self):
+        """Devolve ao pool as conexões de threads que já terminaram (com o lock)"""
+        for thread, conn in list(self._em_uso.items()):
+            if not thread.is_alive():
+                del self._em_uso[thread]
+                self._guardar(conn)
+
+    def _guardar(self, conn: sqlite3.Connection):
+        """Coloca a conexão no pool de ociosas ou a fecha se o pool está cheio (com o lock)"""
+        if conn.in_transaction:
+            conn.rollback()
+        if len(self._ociosas) < self.configuracao.max_conexoes:
+            self._ociosas.append(conn)
+        else:
+            conn.close()
+
+    def conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, obtendo uma do pool se necessário"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        with self._lock:
+            if self._fechado:
+                raise sqlite3.ProgrammingError("Banco de dados fechado")
+            self._recuperar_abandonadas()
+            conn = self._ociosas.pop() if self._ociosas else None
+            if conn is None:
+                conn = self._criar_conexao()
+            self._em_uso[threading.current_thread()] = conn
+
+        self._local.conn = conn
+        return conn
+
+    def liberar(self):
+        """Devolve ao pool a conexão da thread atual (ex.: ao fim de uma thread de exportação)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+
+        with self._lock:
+            self._em_uso.pop(threading.current_thread(), None)
+            if self._fechado:
+                conn.close()
+            else:
+                self._guardar(conn)
+
+    @property
+    def total_conexoes(self) -> int:
+        """Conexões abertas (em uso e ociosas)"""
+        with self._lock:
+            return len(self._em_uso) + len(self._ociosas)
+
+    def fechar(self):
+        """Fecha todas as conexões, inclusive as de outras threads"""
+        with self._lock:
+            self._fechado = True
+            conexoes = list(self._em_uso.values()) + self._ociosas
+            self._em_uso.clear()
+            self._ociosas = []
+
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Erro ao fechar conexão com o banco: {e}")
+        self._local.conn = None
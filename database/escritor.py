@@ -0,0 +1,194 @@
+"""
+Módulo do escritor assíncrono de registros
+Agrupa as inserções de registros em lotes gravados em segundo plano
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from .models import Database, Registro
+
+
+class _PedidoFlush:
+    """Marcador na fila: grava o lote pendente imediatamente e avisa o chamador"""
+
+    def __init__(self):
+        self.concluido = threading.Event()
+        self.sucesso = False  # True se tudo o que veio antes do pedido foi gravado
+
+
+class EscritorRegistros:
+    """
+    Escritor de registros em segundo plano
+
+    Cada reconhecimento gerava um INSERT seguido de commit (um fsync) na
+    thread da interface. O escritor recebe os registros em uma fila e os
+    grava em lote, em uma única transação, a cada ``intervalo_ms`` ou
+    quando ``max_lote`` registros se acumulam, o que vier primeiro.
+
+    Em caso de erro na gravação (ex.: arquivo bloqueado), o lote é mantido
+    e gravado na próxima tentativa; os flush em espera retornam False.
+    """
+
+    def __init__(self, db: Database, intervalo_ms: int = 200, max_lote: int = 100,
+                 ao_gravar: Optional[Callable[[List[Registro]], None]] = None):
+        """
+        Inicializa e inicia o escritor
+
+        Args:
+            db: Banco de dados (a thread do escritor usa conexão própria)
+            intervalo_ms: Tempo máximo que um registro espera na fila
+            max_lote: Registros que disparam a gravação antes do intervalo
+            ao_gravar: Chamado na thread do escritor após cada lote gravado
+        """
+        self.db = db
+        self.intervalo = intervalo_ms / 1000
+        self.max_lote = max_lote
+        self.ao_gravar = ao_gravar
+
+        self._fila: "queue.Queue" = queue.Queue()
+        self._executando = True
+
+        # Estatísticas
+        self.registros_gravados = 0
+        self.lotes_gravados = 0
+        self.ultimo_flush_ms = 0.0
+        self.maior_flush_ms = 0.0
+        self._tempo_total_flush = 0.0
+
+        self._thread = threading.Thread(target=self._loop, name="EscritorRegistros", daemon=True)
+        self._thread.start()
+
+    @property
+    def profundidade(self) -> int:
+        """Registros aguardando na fila"""
+        return self._fila.qsize()
+
+    @property
+    def media_flush_ms(self) -> float:
+        """Tempo médio de gravação de um lote"""
+        return self._tempo_total_flush / self.lotes_gravados * 1000 if self.lotes_gravados else 0.0
+
+    def enfileirar(self, registro: Registro) -> bool:
+        """
+        Enfileira um registro para gravação (não bloqueia)
+
+        Args:
+            registro: Registro a gravar (data_hora é preenchida se vazia)
+
+        Returns:
+            False se o escritor não está mais em execução (o registro não é enfileirado)
+        """
+        if not self._executando or not self._thread.is_alive():
+            return False
+        if registro.data_hora is None:
+            registro.data_hora = datetime.now()
+
+        # O intervalo mínimo entre registros já considera o que está na fila
+        self.db.ultimos_registros.atualizar(registro.aluno_id, registro.tipo, registro.data_hora)
+        self._fila.put(registro)
+        return True
+
+    def _loop(self):
+        """Loop da thread do escritor"""
+        pendentes: List[Registro] = []
+        pedidos: List[_PedidoFlush] = []
+        prazo = None
+
+        while self._executando or pendentes or not self._fila.empty():
+            espera = None if prazo is None else max(0.0, prazo - time.monotonic())
+            try:
+                item = self._fila.get(timeout=espera)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, _PedidoFlush):
+                pedidos.append(item)
+            elif item is not None:
+                pendentes.append(item)
+                if prazo is None:
+                    prazo = time.monotonic() + self.intervalo
+
+            vencido = prazo is not None and time.monotonic() >= prazo
+            descartados = False
+            if pendentes and (vencido or pedidos or len(pendentes) >= self.max_lote):
+                if self._gravar(pendentes):
+                    pendentes = []
+                    prazo = None
+                elif self._executando:
+                    # Tenta de novo após o intervalo
+                    prazo = time.monotonic() + self.intervalo
+                else:
+                    print(f"ERRO: {len(pendentes)} registros não puderam ser gravados")
+                    pendentes = []
+                    descartados = True
+            elif not pendentes:
+                prazo = None
+
+            # Só há sucesso se nada do que veio antes dos pedidos ficou pendente
+            for pedido in pedidos:
+                pedido.sucesso = not pendentes and not descartados
+                pedido.concluido.set()
+            pedidos = []
+
+        self.db.liberar_conexao()
+
+    def _gravar(self, registros: List[Registro]) -> bool:
+        """Grava um lote em uma única transação"""
+        inicio = time.perf_counter()
+        try:
+            self.db.inserir_registros(registros)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar {len(registros)} registros: {e}")
+            return False
+        except Exception as e:
+            # Qualquer outra falha também mantém o lote: a thread não pode morrer em silêncio
+            print(f"Erro inesperado ao gravar {len(registros)} registros: {type(e).__name__}: {e}")
+            return False
+
+        duracao = time.perf_counter() - inicio
+        self.registros_gravados += len(registros)
+        self.lotes_gravados += 1
+        self.ultimo_flush_ms = duracao * 1000
+        self.maior_flush_ms = max(self.maior_flush_ms, self.ultimo_flush_ms)
+        self._tempo_total_flush += duracao
+
+        if self.ao_gravar:
+            try:
+                self.ao_gravar(registros)
+            except Exception as e:
+                print(f"Erro no aviso de registros gravados: {e}")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Grava imediatamente todos os registros enfileirados até agora
+
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = indefinido)
+
+        Returns:
+            True se todos os registros foram gravados dentro do prazo (False
+            se a gravação falhou e os registros continuam na fila)
+        """
+        if not self._thread.is_alive():
+            return self._fila.empty()
+        pedido = _PedidoFlush()
+        self._fila.put(pedido)
+        return pedido.concluido.wait(timeout) and pedido.sucesso
+
+    def parar(self):
+        """Grava o que falta na fila e encerra a thread do escritor"""
+        self.flush()
+        self._executando = False
+        self._fila.put(_PedidoFlush())  # Acorda a thread para encerrar
+        self._thread.join()
+
+        if self.lotes_gravados:
+            print(f"Escritor de registros: {self.registros_gravados} registros em "
+                  f"{self.lotes_gravados} lotes, flush médio {self.media_flush_ms:.1f} ms, "
+                  f"maior {self.maior_flush_ms:.1f} ms")
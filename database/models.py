@@ -4,11 +4,14 @@ Módulo de modelos e gerenciamento do banco de dados SQLite
 
 import sqlite3
 import os
-from datetime import datetime, date
+import threading
+from datetime import datetime, date, timedelta
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Tuple
 import pickle
 
+from .conexoes import ConfiguracaoBanco, GerenciadorConexoes
+
 
 @dataclass
 class Aluno:
@@ -37,28 +40,253 @@ class Registro:
     aluno_turma: Optional[str] = None  # Para exibição
 
 
+@dataclass
+class FiltroRegistros:
+    """Critérios de consulta de registros (campos vazios não filtram)"""
+    data_inicio: Optional[date] = None  # Primeiro dia (inclusive)
+    data_fim: Optional[date] = None  # Último dia (inclusive)
+    tipo: Optional[str] = None  # entrada ou saida
+    turma: Optional[str] = None
+    manual: Optional[bool] = None  # True = manual, False = automático
+    busca: str = ""  # Trecho do nome ou da matrícula
+
+    @classmethod
+    def do_dia(cls, data: date, **kwargs) -> "FiltroRegistros":
+        """Filtro de um único dia"""
+        return cls(data_inicio=data, data_fim=data, **kwargs)
+
+    @property
+    def somente_periodo(self) -> bool:
+        """Indica se o filtro usa apenas o período (atendido pelo resumo_diario)"""
+        return self.tipo is None and self.turma is None and self.manual is None and not self.busca
+
+
+class AlunoResumo:
+    """
+    Dados de um aluno mantidos no cache em memória
+
+    Mesmos campos de Aluno, exceto o BLOB do encoding facial. Usa
+    __slots__ para ocupar pouca memória mesmo com milhares de alunos.
+    """
+    __slots__ = ('id', 'matricula', 'nome', 'turma', 'ativo', 'data_cadastro', 'foto_path')
+
+    def __init__(self, id: int, matricula: str, nome: str, turma: str, ativo: bool = True,
+                 data_cadastro: Optional[datetime] = None, foto_path: Optional[str] = None):
+        self.id = id
+        self.matricula = matricula
+        self.nome = nome
+        self.turma = turma
+        self.ativo = ativo
+        self.data_cadastro = data_cadastro
+        self.foto_path = foto_path
+
+    def __repr__(self) -> str:
+        return f"AlunoResumo(id={self.id}, matricula={self.matricula!r}, nome={self.nome!r})"
+
+
+class CacheAlunos:
+    """
+    Cache em memória do cadastro de alunos (id e matrícula -> AlunoResumo)
+
+    Carregado por completo na primeira consulta. As alterações feitas pelo
+    Database (inserir, atualizar, desativar) invalidam apenas o aluno
+    afetado, que é relido do banco.
+    """
+
+    def __init__(self, carregar_todos, carregar_um):
+        """
+        Args:
+            carregar_todos: Função que retorna todos os AlunoResumo
+            carregar_um: Função que retorna o AlunoResumo de um ID (ou None)
+        """
+        self._carregar_todos = carregar_todos
+        self._carregar_um = carregar_um
+        self._por_id: Dict[int, AlunoResumo] = {}
+        self._por_matricula: Dict[str, AlunoResumo] = {}
+        self._carregado = False
+        self._lock = threading.Lock()
+
+    def _garantir_carregado(self):
+        """Carrega todos os alunos na primeira consulta"""
+        if self._carregado:
+            return
+        with self._lock:
+            if self._carregado:
+                return
+            alunos = self._carregar_todos()
+            self._por_id = {aluno.id: aluno for aluno in alunos}
+            self._por_matricula = {aluno.matricula: aluno for aluno in alunos}
+            self._carregado = True
+
+    def por_id(self, aluno_id: int) -> Optional[AlunoResumo]:
+        """Busca um aluno pelo ID (somente memória após a carga inicial)"""
+        self._garantir_carregado()
+        return self._por_id.get(aluno_id)
+
+    def por_matricula(self, matricula: str) -> Optional[AlunoResumo]:
+        """Busca um aluno pela matrícula (somente memória após a carga inicial)"""
+        self._garantir_carregado()
+        return self._por_matricula.get(matricula)
+
+    def invalidar(self, aluno_id: int):
+        """Relê um aluno do banco após uma alteração"""
+        with self._lock:
+            if not self._carregado:
+                return
+            antigo = self._por_id.pop(aluno_id, None)
+            if antigo is not None:
+                self._por_matricula.pop(antigo.matricula, None)
+            novo = self._carregar_um(aluno_id)
+            if novo is not None:
+                self._por_id[novo.id] = novo
+                self._por_matricula[novo.matricula] = novo
+
+    def limpar(self):
+        """Descarta o cache (recarregado na próxima consulta)"""
+        with self._lock:
+            self._por_id = {}
+            self._por_matricula = {}
+            self._carregado = False
+
+
+class IndiceUltimoRegistro:
+    """
+    Último registro (tipo e horário) de cada aluno, mantido em memória
+
+    Carregado uma vez na abertura do banco e atualizado a cada inserção, o
+    índice permite verificar o intervalo mínimo entre registros com uma
+    consulta a um dicionário, sem SQL no caminho do reconhecimento.
+    """
+
+    def __init__(self):
+        self._ultimos: Dict[int, Tuple[str, datetime]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ultimos)
+
+    def carregar(self, linhas: Iterable[Tuple[int, str, datetime]]):
+        """Substitui o conteúdo por linhas (aluno_id, tipo, data_hora)"""
+        ultimos = {aluno_id: (tipo, data_hora) for aluno_id, tipo, data_hora in linhas}
+        with self._lock:
+            self._ultimos = ultimos
+
+    def atualizar(self, aluno_id: int, tipo: str, data_hora: datetime):
+        """Registra um novo registro do aluno (ignora registros mais antigos que o atual)"""
+        with self._lock:
+            atual = self._ultimos.get(aluno_id)
+            if atual is None or data_hora >= atual[1]:
+                self._ultimos[aluno_id] = (tipo, data_hora)
+
+    def ultimo(self, aluno_id: int) -> Optional[Tuple[str, datetime]]:
+        """Retorna (tipo, data_hora) do último registro do aluno, se houver"""
+        return self._ultimos.get(aluno_id)
+
+    def registrado_recentemente(self, aluno_id: int, tipo: str, segundos: float,
+                                agora: Optional[datetime] = None) -> bool:
+        """
+        Indica se o aluno já tem um registro do mesmo tipo dentro do intervalo
+
+        Args:
+            aluno_id: ID do aluno
+            tipo: Tipo do registro pretendido (entrada ou saida)
+            segundos: Intervalo mínimo entre registros
+            agora: Horário de referência (datetime.now() se omitido)
+        """
+        ultimo = self._ultimos.get(aluno_id)
+        if ultimo is None or ultimo[0] != tipo:
+            return False
+        if agora is None:
+            agora = datetime.now()
+        return (agora - ultimo[1]).total_seconds() < segundos
+
+
+class ContadoresDiarios:
+    """
+    Totais de registros do dia por tipo e turma, mantidos em memória
+
+    Inicializados a partir da tabela resumo_diario e incrementados a cada
+    inserção feita por este processo, de modo que os contadores da tela
+    principal não precisam de consulta ao banco.
+    """
+
+    def __init__(self):
+        self.data: Optional[date] = None
+        self._totais: Dict[Tuple[str, str], int] = {}
+        # Reentrante: quem grava registros segura o lock do commit até o incremento,
+        # e a recarga segura o mesmo lock da consulta à troca dos totais
+        self.lock = threading.RLock()
+
+    def carregar(self, data: date, linhas: Iterable[Tuple[str, str, int]]):
+        """Substitui os totais pelos do dia informado: linhas (tipo, turma, total)"""
+        with self.lock:
+            self._totais = {(tipo, turma): total for tipo, turma, total in linhas}
+            self.data = data
+
+    def incrementar(self, data: date, tipo: str, turma: str):
+        """Soma um registro (ignorado se for de outro dia)"""
+        with self.lock:
+            if data == self.data:
+                chave = (tipo, turma)
+                self._totais[chave] = self._totais.get(chave, 0) + 1
+
+    def por_tipo(self) -> dict:
+        """Totais do dia por tipo"""
+        resultado = {'entrada': 0, 'saida': 0}
+        with self.lock:
+            for (tipo, _), total in self._totais.items():
+                resultado[tipo] = resultado.get(tipo, 0) + total
+        return resultado
+
+    def por_turma(self) -> Dict[str, dict]:
+        """Totais do dia por turma e tipo"""
+        resultado: Dict[str, dict] = {}
+        with self.lock:
+            for (tipo, turma), total in self._totais.items():
+                resultado.setdefault(turma, {'entrada': 0, 'saida': 0})[tipo] = total
+        return resultado
+
+
 class Database:
     """Gerenciador do banco de dados SQLite"""
 
-    def __init__(self, db_path: str = "data/guardiao_escolar.db"):
-        """Inicializa conexão com o banco de dados"""
+    def __init__(self, db_path: str = "data/guardiao_escolar.db",
+                 configuracao: Optional[ConfiguracaoBanco] = None):
+        """
+        Inicializa conexão com o banco de dados
+
+        Args:
+            db_path: Caminho do arquivo do banco
+            configuracao: Pragmas e pool de conexões (padrão: WAL, synchronous=NORMAL)
+        """
         # Garante que o diretório existe
         os.makedirs(os.path.dirname(db_path) if os.path.dirname(db_path) else "data", exist_ok=True)
 
         self.db_path = db_path
-        self.conn = None
+        self.configuracao = configuracao or ConfiguracaoBanco()
+        self.conexoes = None
+        self.ultimos_registros = IndiceUltimoRegistro()
+        self.cache_alunos = CacheAlunos(self._carregar_resumos, self._carregar_resumo)
+        self.contadores_hoje = ContadoresDiarios()
         self._connect()
         self._create_tables()
+        self._carregar_ultimos_registros()
 
     def _connect(self):
         """Estabelece conexão com o banco"""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
+            self.conexoes = GerenciadorConexoes(self.db_path, self.configuracao)
+            # Abre a conexão da thread atual para validar o arquivo e aplicar o modo WAL
+            self.conexoes.conexao()
         except sqlite3.Error as e:
             print(f"Erro ao conectar ao banco de dados: {e}")
             raise
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexão exclusiva da thread atual"""
+        return self.conexoes.conexao()
+
     def _create_tables(self):
         """Cria as tabelas necessárias se não existirem"""
         cursor = self.conn.cursor()
@@ -86,17 +314,129 @@ class Database:
                 data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 confianca REAL DEFAULT 0.0,
                 manual INTEGER DEFAULT 0,
+                turma TEXT,
                 FOREIGN KEY (aluno_id) REFERENCES alunos(id)
             )
         ''')
 
         # Índices para melhor performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_data ON registros(data_hora)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_aluno ON registros(aluno_id)')
+        # (data_hora, tipo) cobre as consultas por dia; (aluno_id, data_hora) o último registro
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_data_tipo ON registros(data_hora, tipo)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registros_aluno_data ON registros(aluno_id, data_hora)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_alunos_matricula ON alunos(matricula)')
 
+        # Índices antigos, redundantes com os compostos acima
+        cursor.execute('DROP INDEX IF EXISTS idx_registros_data')
+        cursor.execute('DROP INDEX IF EXISTS idx_registros_aluno')
+
+        self._create_resumo_diario(cursor)
+
         self.conn.commit()
 
+    def _create_resumo_diario(self, cursor):
+        """
+        Cria a tabela agregada resumo_diario e os triggers que a mantêm
+
+        Cada registro guarda a turma do aluno no momento da gravação (coluna
+        registros.turma). A inserção soma 1 ao total de (data, tipo, turma) e
+        a exclusão subtrai 1 da mesma turma, mesmo que o aluno tenha mudado de
+        turma depois. Na criação (ou ao migrar um banco sem registros.turma),
+        a tabela é preenchida a partir do histórico existente.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumo_diario'")
+        existia = cursor.fetchone() is not None
+
+        # Bancos anteriores à coluna turma: a turma dos registros antigos é a atual do aluno
+        cursor.execute('PRAGMA table_info(registros)')
+        if 'turma' not in [row['name'] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE registros ADD COLUMN turma TEXT')
+            cursor.execute('''
+                UPDATE registros
+                SET turma = COALESCE((SELECT turma FROM alunos WHERE id = registros.aluno_id), '')
+            ''')
+            existia = False
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS resumo_diario (
+                data TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                turma TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (data, tipo, turma)
+            ) WITHOUT ROWID
+        ''')
+
+        # Recriados sempre: a versão anterior do trigger de exclusão lia a turma atual do aluno
+        for trigger in ('trg_registros_turma', 'trg_resumo_diario_inserir', 'trg_resumo_diario_excluir'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+        # Inserções que não informam a turma (scripts, benchmarks) recebem a turma atual do aluno
+        cursor.execute('''
+            CREATE TRIGGER trg_registros_turma
+            AFTER INSERT ON registros
+            WHEN NEW.turma IS NULL
+            BEGIN
+                UPDATE registros
+                SET turma = COALESCE((SELECT turma FROM alunos WHERE id = NEW.aluno_id), '')
+                WHERE id = NEW.id;
+            END
+        ''')
+
+        # data_hora é gravada como texto ISO: os 10 primeiros caracteres são a data
+        cursor.execute('''
+            CREATE TRIGGER trg_resumo_diario_inserir
+            AFTER INSERT ON registros
+            BEGIN
+                INSERT INTO resumo_diario (data, tipo, turma, total)
+                VALUES (
+                    substr(NEW.data_hora, 1, 10),
+                    NEW.tipo,
+                    COALESCE(NEW.turma, (SELECT turma FROM alunos WHERE id = NEW.aluno_id), ''),
+                    1
+                )
+                ON CONFLICT (data, tipo, turma) DO UPDATE SET total = total + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER trg_resumo_diario_excluir
+            AFTER DELETE ON registros
+            BEGIN
+                UPDATE resumo_diario SET total = total - 1
+                WHERE data = substr(OLD.data_hora, 1, 10)
+                  AND tipo = OLD.tipo
+                  AND turma = COALESCE(OLD.turma, '');
+            END
+        ''')
+
+        if not existia:
+            cursor.execute('DELETE FROM resumo_diario')
+            cursor.execute('''
+                INSERT INTO resumo_diario (data, tipo, turma, total)
+                SELECT substr(data_hora, 1, 10), tipo, COALESCE(turma, ''), COUNT(*)
+                FROM registros
+                GROUP BY 1, 2, 3
+            ''')
+
+    def _carregar_ultimos_registros(self):
+        """Carrega o último registro de cada aluno no índice em memória"""
+        # O MAX agrupado percorre só o índice (aluno_id, data_hora); o join volta
+        # ao registro pelo mesmo índice. Em empate de horário vale o de maior id.
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT r.aluno_id, r.tipo, r.data_hora
+            FROM (
+                SELECT aluno_id, MAX(data_hora) AS ultima
+                FROM registros
+                GROUP BY aluno_id
+            ) u
+            JOIN registros r ON r.aluno_id = u.aluno_id AND r.data_hora = u.ultima
+            ORDER BY r.aluno_id, r.id
+        ''')
+        self.ultimos_registros.carregar(
+            (row['aluno_id'], row['tipo'], datetime.fromisoformat(row['data_hora']))
+            for row in cursor.fetchall() if row['data_hora']
+        )
+
     # ==================== OPERAÇÕES COM ALUNOS ====================
 
     def inserir_aluno(self, aluno: Aluno) -> int:
@@ -115,10 +455,49 @@ class Database:
                 aluno.foto_path
             ))
             self.conn.commit()
+            self.cache_alunos.invalidar(cursor.lastrowid)
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             raise ValueError(f"Matrícula {aluno.matricula} já existe no sistema")
 
+    def inserir_alunos(self, alunos: List[Aluno]) -> List[int]:
+        """
+        Insere vários alunos em uma única transação (um único commit)
+
+        Returns:
+            IDs dos alunos, na ordem recebida
+
+        Raises:
+            ValueError: Se alguma matrícula já existir (nenhum aluno é inserido)
+        """
+        cursor = self.conn.cursor()
+        ids = []
+        try:
+            for aluno in alunos:
+                cursor.execute('''
+                    INSERT INTO alunos (matricula, nome, turma, face_encoding, ativo, foto_path)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (
+                    aluno.matricula,
+                    aluno.nome,
+                    aluno.turma,
+                    aluno.face_encoding,
+                    1 if aluno.ativo else 0,
+                    aluno.foto_path
+                ))
+                ids.append(cursor.lastrowid)
+            self.conn.commit()
+        except sqlite3.IntegrityError:
+            self.conn.rollback()
+            raise ValueError(f"Matrícula {aluno.matricula} já existe no sistema")
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+        for aluno_id in ids:
+            self.cache_alunos.invalidar(aluno_id)
+        return ids
+
     def atualizar_aluno(self, aluno: Aluno) -> bool:
         """Atualiza dados de um aluno existente"""
         cursor = self.conn.cursor()
@@ -135,6 +514,7 @@ class Database:
             aluno.id
         ))
         self.conn.commit()
+        self.cache_alunos.invalidar(aluno.id)
         return cursor.rowcount > 0
 
     def buscar_aluno_por_id(self, aluno_id: int) -> Optional[Aluno]:
@@ -147,6 +527,14 @@ class Database:
             return self._row_to_aluno(row)
         return None
 
+    def obter_aluno(self, aluno_id: int) -> Optional[AlunoResumo]:
+        """Busca um aluno pelo ID no cache em memória (sem o encoding facial)"""
+        return self.cache_alunos.por_id(aluno_id)
+
+    def obter_aluno_por_matricula(self, matricula: str) -> Optional[AlunoResumo]:
+        """Busca um aluno pela matrícula no cache em memória (sem o encoding facial)"""
+        return self.cache_alunos.por_matricula(matricula)
+
     def buscar_aluno_por_matricula(self, matricula: str) -> Optional[Aluno]:
         """Busca um aluno pela matrícula"""
         cursor = self.conn.cursor()
@@ -176,8 +564,36 @@ class Database:
         cursor = self.conn.cursor()
         cursor.execute('UPDATE alunos SET ativo = 0 WHERE id = ?', (aluno_id,))
         self.conn.commit()
+        self.cache_alunos.invalidar(aluno_id)
         return cursor.rowcount > 0
 
+    _COLUNAS_RESUMO = 'id, matricula, nome, turma, ativo, data_cadastro, foto_path'
+
+    def _carregar_resumos(self) -> List[AlunoResumo]:
+        """Lê todos os alunos para o cache, sem a coluna do encoding"""
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT {self._COLUNAS_RESUMO} FROM alunos')
+        return [self._row_to_resumo(row) for row in cursor.fetchall()]
+
+    def _carregar_resumo(self, aluno_id: int) -> Optional[AlunoResumo]:
+        """Lê um aluno para o cache, sem a coluna do encoding"""
+        cursor = self.conn.cursor()
+        cursor.execute(f'SELECT {self._COLUNAS_RESUMO} FROM alunos WHERE id = ?', (aluno_id,))
+        row = cursor.fetchone()
+        return self._row_to_resumo(row) if row else None
+
+    def _row_to_resumo(self, row) -> AlunoResumo:
+        """Converte uma linha do banco para AlunoResumo"""
+        return AlunoResumo(
+            id=row['id'],
+            matricula=row['matricula'],
+            nome=row['nome'],
+            turma=row['turma'],
+            ativo=bool(row['ativo']),
+            data_cadastro=datetime.fromisoformat(row['data_cadastro']) if row['data_cadastro'] else None,
+            foto_path=row['foto_path']
+        )
+
     def _row_to_aluno(self, row) -> Aluno:
         """Converte uma linha do banco para objeto Aluno"""
         return Aluno(
@@ -193,22 +609,91 @@ class Database:
 
     # ==================== OPERAÇÕES COM REGISTROS ====================
 
+    @staticmethod
+    def _intervalo_dia(data: date) -> tuple:
+        """
+        Limites do intervalo semiaberto [início, fim) de um dia
+
+        As datas são gravadas como texto ISO ("AAAA-MM-DD HH:MM:SS"), então
+        comparar com "AAAA-MM-DD" do dia e do dia seguinte seleciona o dia
+        inteiro sem aplicar funções à coluna, permitindo o uso do índice.
+        """
+        return data.isoformat(), (data + timedelta(days=1)).isoformat()
+
+    def _row_to_registro(self, row) -> Registro:
+        """Converte uma linha do banco (com dados do aluno) para objeto Registro"""
+        return Registro(
+            id=row['id'],
+            aluno_id=row['aluno_id'],
+            tipo=row['tipo'],
+            data_hora=datetime.fromisoformat(row['data_hora']) if row['data_hora'] else None,
+            confianca=row['confianca'],
+            manual=bool(row['manual']),
+            aluno_nome=row['aluno_nome'],
+            aluno_matricula=row['aluno_matricula'],
+            aluno_turma=row['aluno_turma']
+        )
+
     def inserir_registro(self, registro: Registro) -> int:
         """Insere um novo registro de entrada/saída"""
+        data_hora = registro.data_hora or datetime.now()
+        turma = self._turma_do_aluno(registro.aluno_id)
         cursor = self.conn.cursor()
         cursor.execute('''
-            INSERT INTO registros (aluno_id, tipo, data_hora, confianca, manual)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO registros (aluno_id, tipo, data_hora, confianca, manual, turma)
+            VALUES (?, ?, ?, ?, ?, ?)
         ''', (
             registro.aluno_id,
             registro.tipo,
-            registro.data_hora or datetime.now(),
+            data_hora,
             registro.confianca,
-            1 if registro.manual else 0
+            1 if registro.manual else 0,
+            turma
         ))
-        self.conn.commit()
+        # Commit e contadores sob o mesmo lock da recarga dos contadores (ver _contadores_do_dia)
+        with self.contadores_hoje.lock:
+            self.conn.commit()
+            self._registro_inserido(registro.aluno_id, registro.tipo, data_hora, turma)
         return cursor.lastrowid
 
+    def inserir_registros(self, registros: List[Registro]) -> int:
+        """Insere vários registros em uma única transação (um único commit)"""
+        agora = datetime.now()
+        linhas = [(
+            registro.aluno_id,
+            registro.tipo,
+            registro.data_hora or agora,
+            registro.confianca,
+            1 if registro.manual else 0,
+            self._turma_do_aluno(registro.aluno_id)
+        ) for registro in registros]
+
+        cursor = self.conn.cursor()
+        with self.contadores_hoje.lock:
+            try:
+                cursor.executemany('''
+                    INSERT INTO registros (aluno_id, tipo, data_hora, confianca, manual, turma)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', linhas)
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+
+            for aluno_id, tipo, data_hora, _, _, turma in linhas:
+                self._registro_inserido(aluno_id, tipo, data_hora, turma)
+        return len(registros)
+
+    def _turma_do_aluno(self, aluno_id: int) -> str:
+        """Turma atual do aluno, gravada junto com o registro"""
+        aluno = self.cache_alunos.por_id(aluno_id)
+        return aluno.turma if aluno else ''
+
+    def _registro_inserido(self, aluno_id: int, tipo: str, data_hora: datetime, turma: str):
+        """Atualiza os índices em memória após a gravação de um registro"""
+        self.ultimos_registros.atualizar(aluno_id, tipo, data_hora)
+        self.contadores_hoje.incrementar(data_hora.date(), tipo, turma)
+
     def listar_registros_do_dia(self, data: date = None) -> List[Registro]:
         """Lista todos os registros de um dia específico"""
         if data is None:
@@ -219,44 +704,245 @@ class Database:
             SELECT r.*, a.nome as aluno_nome, a.matricula as aluno_matricula, a.turma as aluno_turma
             FROM registros r
             JOIN alunos a ON r.aluno_id = a.id
-            WHERE DATE(r.data_hora) = ?
+            WHERE r.data_hora >= ? AND r.data_hora < ?
             ORDER BY r.data_hora DESC
-        ''', (data.isoformat(),))
+        ''', self._intervalo_dia(data))
+
+        return [self._row_to_registro(row) for row in cursor.fetchall()]
+
+    def _where_registros(self, filtro: FiltroRegistros,
+                         apos: Optional[Tuple[str, int]] = None) -> Tuple[str, list]:
+        """
+        Monta a cláusula WHERE (sobre registros r e alunos a) de um filtro
+
+        Args:
+            filtro: Critérios da consulta
+            apos: Chave (data_hora, id) a partir da qual continuar, em ordem decrescente
+        """
+        condicoes = []
+        parametros = []
+
+        # Intervalo semiaberto sobre data_hora, para usar o índice
+        if filtro.data_inicio is not None:
+            condicoes.append('r.data_hora >= ?')
+            parametros.append(filtro.data_inicio.isoformat())
+        if apos is not None:
+            # A chave vem de uma linha do próprio intervalo, então substitui o
+            # limite superior (o SQLite usa apenas um limite por índice)
+            condicoes.append('r.data_hora <= ? AND (r.data_hora, r.id) < (?, ?)')
+            parametros.extend([apos[0], apos[0], apos[1]])
+        elif filtro.data_fim is not None:
+            condicoes.append('r.data_hora < ?')
+            parametros.append((filtro.data_fim + timedelta(days=1)).isoformat())
+        if filtro.tipo is not None:
+            condicoes.append('r.tipo = ?')
+            parametros.append(filtro.tipo)
+        if filtro.turma is not None:
+            # Turma gravada no registro, a mesma do resumo_diario e dos contadores
+            condicoes.append('r.turma = ?')
+            parametros.append(filtro.turma)
+        if filtro.manual is not None:
+            condicoes.append('r.manual = ?')
+            parametros.append(1 if filtro.manual else 0)
+        if filtro.busca:
+            padrao = '%' + filtro.busca.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            condicoes.append("(a.nome LIKE ? ESCAPE '\\' OR a.matricula LIKE ? ESCAPE '\\')")
+            parametros.extend([padrao, padrao])
+
+        where = ('WHERE ' + ' AND '.join(condicoes)) if condicoes else ''
+        return where, parametros
+
+    def consultar_registros(self, filtro: FiltroRegistros, apos: Optional[Tuple[str, int]] = None,
+                            limite: int = 500) -> List[tuple]:
+        """
+        Retorna uma página de registros, do mais recente para o mais antigo
+
+        A paginação é por chave (data_hora, id) e não por OFFSET: cada página
+        começa logo após a última linha da anterior, com custo independente
+        da posição.
+
+        Args:
+            filtro: Critérios da consulta
+            apos: Chave (data_hora, id) da última linha da página anterior
+            limite: Tamanho máximo da página
+
+        Returns:
+            Tuplas (data_hora, nome, matrícula, turma, tipo, confiança, manual, id, aluno_id),
+            com a turma do aluno no momento do registro
+        """
+        where, parametros = self._where_registros(filtro, apos)
 
-        registros = []
-        for row in cursor.fetchall():
-            reg = Registro(
-                id=row['id'],
-                aluno_id=row['aluno_id'],
-                tipo=row['tipo'],
-                data_hora=datetime.fromisoformat(row['data_hora']) if row['data_hora'] else None,
-                confianca=row['confianca'],
-                manual=bool(row['manual']),
-                aluno_nome=row['aluno_nome'],
-                aluno_matricula=row['aluno_matricula'],
-                aluno_turma=row['aluno_turma']
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT r.data_hora, a.nome, a.matricula, r.turma, r.tipo, r.confianca, r.manual, r.id, r.aluno_id
+            FROM registros r
+            JOIN alunos a ON r.aluno_id = a.id
+            {where}
+            ORDER BY r.data_hora DESC, r.id DESC
+            LIMIT ?
+        ''', parametros + [limite])
+        return [tuple(row) for row in cursor.fetchall()]
+
+    def iterar_registros(self, filtro: FiltroRegistros, tamanho_pagina: int = 500):
+        """
+        Percorre todos os registros do filtro, uma página por vez
+
+        Cada página é uma consulta curta, então nenhum cursor fica aberto
+        entre as páginas.
+
+        Yields:
+            Tuplas no formato de consultar_registros
+        """
+        apos = None
+        while True:
+            pagina = self.consultar_registros(filtro, apos, tamanho_pagina)
+            yield from pagina
+            if len(pagina) < tamanho_pagina:
+                break
+            apos = (pagina[-1][0], pagina[-1][7])
+
+    def listar_registros(self, filtro: FiltroRegistros) -> List[Registro]:
+        """Lista os registros do filtro como objetos Registro"""
+        return [
+            Registro(
+                id=linha[7],
+                aluno_id=linha[8],
+                tipo=linha[4],
+                data_hora=datetime.fromisoformat(linha[0]) if linha[0] else None,
+                confianca=linha[5],
+                manual=bool(linha[6]),
+                aluno_nome=linha[1],
+                aluno_matricula=linha[2],
+                aluno_turma=linha[3]
             )
-            registros.append(reg)
+            for linha in self.iterar_registros(filtro)
+        ]
+
+    def ler_registros_em_lotes(self, filtro: FiltroRegistros, tamanho_lote: int = 1000,
+                               por_turma: bool = False):
+        """
+        Lê os registros do filtro em ordem cronológica, em lotes de um único cursor
+
+        Destinado às exportações: as linhas são lidas com fetchmany e nunca
+        ficam todas na memória. Deve ser consumido por completo (ou fechado)
+        na mesma thread; com o journal em WAL, a leitura não bloqueia as
+        inserções da portaria.
+
+        Args:
+            filtro: Critérios da consulta
+            tamanho_lote: Linhas lidas do banco por vez
+            por_turma: Agrupa por turma (cronológica dentro de cada turma)
+
+        Yields:
+            Listas de até tamanho_lote tuplas no formato de consultar_registros
+        """
+        where, parametros = self._where_registros(filtro)
+        ordem = 'r.turma, r.data_hora, r.id' if por_turma else 'r.data_hora, r.id'
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT r.data_hora, a.nome, a.matricula, r.turma, r.tipo, r.confianca, r.manual, r.id, r.aluno_id
+            FROM registros r
+            JOIN alunos a ON r.aluno_id = a.id
+            {where}
+            ORDER BY {ordem}
+        ''', parametros)
+        try:
+            while True:
+                lote = cursor.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                yield [tuple(row) for row in lote]
+        finally:
+            cursor.close()
+
+    def contar_registros(self, filtro: FiltroRegistros) -> int:
+        """Total de registros de um filtro"""
+        return sum(t['entrada'] + t['saida'] for t in self.resumo_registros(filtro).values())
+
+    def resumo_registros(self, filtro: FiltroRegistros) -> dict:
+        """
+        Totais de entradas e saídas por turma para um filtro, em uma única consulta
+
+        Filtros só de período são atendidos pela tabela resumo_diario. Nos
+        dois caminhos a turma é a gravada no registro, não a atual do aluno.
+
+        Returns:
+            Dicionário turma -> {'entrada': total, 'saida': total}
+        """
+        hoje = date.today()
+        if filtro.somente_periodo and filtro.data_inicio == filtro.data_fim == hoje:
+            return self._contadores_do_dia().por_turma()
 
-        return registros
+        cursor = self.conn.cursor()
+        if filtro.somente_periodo:
+            condicoes = []
+            parametros = []
+            if filtro.data_inicio is not None:
+                condicoes.append('data >= ?')
+                parametros.append(filtro.data_inicio.isoformat())
+            if filtro.data_fim is not None:
+                condicoes.append('data <= ?')
+                parametros.append(filtro.data_fim.isoformat())
+            where = ('WHERE ' + ' AND '.join(condicoes)) if condicoes else ''
+            cursor.execute(f'''
+                SELECT turma, tipo, SUM(total) AS total
+                FROM resumo_diario
+                {where}
+                GROUP BY turma, tipo
+            ''', parametros)
+        else:
+            where, parametros = self._where_registros(filtro)
+            cursor.execute(f'''
+                SELECT COALESCE(r.turma, '') AS turma, r.tipo AS tipo, COUNT(*) AS total
+                FROM registros r
+                LEFT JOIN alunos a ON r.aluno_id = a.id
+                {where}
+                GROUP BY 1, r.tipo
+            ''', parametros)
+
+        resultado = {}
+        for row in cursor.fetchall():
+            resultado.setdefault(row['turma'], {'entrada': 0, 'saida': 0})[row['tipo']] = row['total']
+        return resultado
 
-    def contar_registros_hoje(self) -> dict:
-        """Conta entradas e saídas do dia"""
+    def listar_turmas(self) -> List[str]:
+        """Lista as turmas com alunos cadastrados"""
         cursor = self.conn.cursor()
-        hoje = date.today().isoformat()
+        cursor.execute('SELECT DISTINCT turma FROM alunos ORDER BY turma')
+        return [row['turma'] for row in cursor.fetchall()]
+
+    def _contadores_do_dia(self) -> ContadoresDiarios:
+        """Contadores em memória do dia atual (recarregados na virada do dia)"""
+        hoje = date.today()
+        if self.contadores_hoje.data != hoje:
+            # Consulta e troca sob o lock das gravações: cada registro entra na consulta
+            # ou no incremento posterior, nunca nos dois nem em nenhum
+            with self.contadores_hoje.lock:
+                if self.contadores_hoje.data != hoje:
+                    cursor = self.conn.cursor()
+                    cursor.execute(
+                        'SELECT tipo, turma, total FROM resumo_diario WHERE data = ?', (hoje.isoformat(),)
+                    )
+                    self.contadores_hoje.carregar(
+                        hoje, ((row['tipo'], row['turma'], row['total']) for row in cursor.fetchall())
+                    )
+        return self.contadores_hoje
 
-        cursor.execute('''
-            SELECT tipo, COUNT(*) as total
-            FROM registros
-            WHERE DATE(data_hora) = ?
-            GROUP BY tipo
-        ''', (hoje,))
+    def contar_registros_hoje(self) -> dict:
+        """Conta entradas e saídas do dia (contadores em memória, sem consulta)"""
+        return self._contadores_do_dia().por_tipo()
 
-        resultado = {'entrada': 0, 'saida': 0}
-        for row in cursor.fetchall():
-            resultado[row['tipo']] = row['total']
+    def resumo_por_turma(self, data: date = None) -> dict:
+        """
+        Totais de entradas e saídas por turma em um dia
 
-        return resultado
+        Args:
+            data: Dia desejado (hoje se omitido)
+
+        Returns:
+            Dicionário turma -> {'entrada': total, 'saida': total}
+        """
+        return self.resumo_registros(FiltroRegistros.do_dia(data or date.today()))
 
     def ultimo_registro_aluno(self, aluno_id: int) -> Optional[Registro]:
         """Retorna o último registro de um aluno"""
@@ -272,20 +958,15 @@ class Database:
 
         row = cursor.fetchone()
         if row:
-            return Registro(
-                id=row['id'],
-                aluno_id=row['aluno_id'],
-                tipo=row['tipo'],
-                data_hora=datetime.fromisoformat(row['data_hora']) if row['data_hora'] else None,
-                confianca=row['confianca'],
-                manual=bool(row['manual']),
-                aluno_nome=row['aluno_nome'],
-                aluno_matricula=row['aluno_matricula'],
-                aluno_turma=row['aluno_turma']
-            )
+            return self._row_to_registro(row)
         return None
 
+    def liberar_conexao(self):
+        """Devolve ao pool a conexão da thread atual (chamar ao fim de threads auxiliares)"""
+        if self.conexoes:
+            self.conexoes.liberar()
+
     def close(self):
-        """Fecha a conexão com o banco de dados"""
-        if self.conn:
-            self.conn.close()
+        """Fecha todas as conexões com o banco de dados"""
+        if self.conexoes:
+            self.conexoes.fechar()
@@ -19,8 +19,14 @@ Desenvolvido por: Axio - Sistemas e Automações Inteligentes
                   Vanthuir Maia
 """
 
+import time
+
+# Início da inicialização (antes de qualquer importação pesada)
+_INICIO = time.perf_counter()
+
 import sys
 import os
+from importlib.util import find_spec
 
 # Adiciona o diretório atual ao path para imports relativos
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -36,8 +42,35 @@ for diretorio in DIRETORIOS:
     os.makedirs(diretorio, exist_ok=True)
 
 
+class TemposInicializacao:
+    """Mede a duração de cada etapa da inicialização"""
+
+    def __init__(self, inicio: float):
+        self.inicio = inicio
+        self.ultimo = inicio
+        self.etapas = []
+
+    def marcar(self, etapa: str):
+        """Registra o fim de uma etapa (a duração conta desde a marcação anterior)"""
+        agora = time.perf_counter()
+        self.etapas.append((etapa, agora - self.ultimo))
+        self.ultimo = agora
+
+    def imprimir(self):
+        """Imprime as etapas registradas e o total"""
+        print(" Tempo de inicialização:")
+        for etapa, duracao in self.etapas:
+            print(f"   {etapa:<32}{duracao * 1000:>8.0f} ms")
+        print(f"   {'total':<32}{(self.ultimo - self.inicio) * 1000:>8.0f} ms")
+
+
 def verificar_dependencias():
-    """Verifica se todas as dependências estão instaladas"""
+    """
+    Verifica se todas as dependências estão instaladas
+
+    Usa find_spec, que localiza o pacote sem importá-lo: o face_recognition,
+    por exemplo, carregaria o dlib e os modelos só para ser verificado.
+    """
     dependencias = {
         'PyQt5': 'PyQt5',
         'cv2': 'opencv-python',
@@ -45,18 +78,10 @@ def verificar_dependencias():
         'PIL': 'Pillow'
     }
 
-    faltando = []
-
-    for modulo, pacote in dependencias.items():
-        try:
-            __import__(modulo)
-        except ImportError:
-            faltando.append(pacote)
+    faltando = [pacote for modulo, pacote in dependencias.items() if find_spec(modulo) is None]
 
     # Verifica face_recognition separadamente (pode falhar por causa do dlib)
-    try:
-        import face_recognition
-    except ImportError:
+    if find_spec('face_recognition') is None:
         print("\n" + "=" * 60)
         print("AVISO: Biblioteca face_recognition não instalada!")
         print("=" * 60)
@@ -85,15 +110,18 @@ def verificar_dependencias():
 
 def main():
     """Função principal - inicia a aplicação"""
+    tempos = TemposInicializacao(_INICIO)
 
     # Verifica dependências
     if not verificar_dependencias():
         input("\nPressione ENTER para sair...")
         sys.exit(1)
+    tempos.marcar("verificação de dependências")
 
     # Importa PyQt5
     from PyQt5.QtWidgets import QApplication, QMessageBox
     from PyQt5.QtGui import QFont
+    from PyQt5.QtCore import QTimer
 
     # Cria aplicação
     app = QApplication(sys.argv)
@@ -103,19 +131,36 @@ def main():
     # Configura fonte padrão
     font = QFont("Segoe UI", 10)
     app.setFont(font)
+    tempos.marcar("QApplication")
 
     # Tenta iniciar a janela principal
     try:
         from ui.main_window import MainWindow
         from core.config import get_config
+        tempos.marcar("importação da interface")
 
         # Carrega configurações
         config = get_config()
 
         # Cria e exibe janela principal
         window = MainWindow()
+        tempos.marcar("janela principal")
         window.show()
 
+        # A janela já foi desenhada quando o loop de eventos processa o timer
+        QTimer.singleShot(0, lambda: (tempos.marcar("primeira exibição da janela"), tempos.imprimir()))
+
+        # Câmera, galeria e modelos ficam prontos em segundo plano, após a janela
+        def decorrido() -> str:
+            return f"{(time.perf_counter() - _INICIO) * 1000:.0f} ms"
+
+        window.camera_pronta.connect(
+            lambda ok: print(f" Câmera {'ativa' if ok else 'não disponível'} em {decorrido()}"))
+        window.galeria_pronta.connect(lambda _: print(f" Galeria carregada em {decorrido()}"))
+        window.modelos_prontos.connect(
+            lambda ok: print(f" Modelos {'carregados' if ok else 'indisponíveis (modo simulado)'} em {decorrido()}"))
+        window.primeiro_frame_exibido.connect(lambda: print(f" Primeiro frame da câmera em {decorrido()}"))
+
         # Mensagem inicial
         print("\n" + "=" * 60)
         print("   GUARDIÃO ESCOLAR - Sistema de Controle de Acesso")
@@ -123,7 +168,7 @@ def main():
         print(f"\n Escola: {config.nome_completo_escola}")
         print(f" Versão: {config.config.versao}")
         print("\n Sistema iniciado com sucesso!")
-        print(" Câmera ativa e pronta para reconhecimento.")
+        print(" Câmera e reconhecimento iniciando em segundo plano (ver barra de status).")
         print("\n Atalhos:")
         print("   - ESPAÇO: Capturar foto (na tela de cadastro)")
         print("   - ESC: Fechar janelas de diálogo")
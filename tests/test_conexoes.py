@@ -0,0 +1,38 @@
+"""
+Testes do gerenciador de conexões por thread
+"""
+
+import threading
+
+import pytest
+
+from database.conexoes import ConfiguracaoBanco, GerenciadorConexoes
+
+
+def test_synchronous_validado():
+    assert ConfiguracaoBanco(synchronous="full").synchronous == "FULL"
+    with pytest.raises(ValueError):
+        ConfiguracaoBanco(synchronous="NORMAL; DROP TABLE alunos")
+
+
+def test_conexao_por_thread_e_reaproveitamento(tmp_path):
+    gerenciador = GerenciadorConexoes(str(tmp_path / "teste.db"))
+    principal = gerenciador.conexao()
+    assert gerenciador.conexao() is principal
+
+    conexoes = []
+
+    def usar():
+        conexoes.append(gerenciador.conexao())
+
+    for _ in range(3):
+        # Threads sequenciais (o SO pode reutilizar o ident): a conexão da
+        # thread encerrada volta ao pool e é a mesma entregue à seguinte
+        thread = threading.Thread(target=usar)
+        thread.start()
+        thread.join()
+
+    assert all(conn is not principal for conn in conexoes)
+    assert conexoes[0] is conexoes[1] is conexoes[2]
+    assert gerenciador.total_conexoes == 2
+    gerenciador.fechar()
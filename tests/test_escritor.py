@@ -0,0 +1,55 @@
+"""
+Testes do escritor assíncrono de registros: resultado do flush e
+recuperação após falhas de gravação
+"""
+
+import sqlite3
+
+import pytest
+
+from database.escritor import EscritorRegistros
+from database.models import Aluno, Database, Registro
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "teste.db"))
+
+
+@pytest.fixture
+def aluno(db):
+    return db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+
+
+def _total(db):
+    return db.conn.execute('SELECT COUNT(*) FROM registros').fetchone()[0]
+
+
+@pytest.mark.parametrize("erro", [sqlite3.OperationalError("database is locked"), RuntimeError("falha")])
+def test_flush_informa_falha_e_lote_e_regravado(db, aluno, monkeypatch, erro):
+    escritor = EscritorRegistros(db, intervalo_ms=20)
+    inserir = db.inserir_registros
+
+    def inserir_falha(registros):
+        raise erro
+
+    monkeypatch.setattr(db, "inserir_registros", inserir_falha)
+    assert escritor.enfileirar(Registro(aluno_id=aluno, tipo="entrada"))
+    assert not escritor.flush(timeout=5)
+
+    # A thread continua viva e grava o lote mantido assim que o banco volta
+    monkeypatch.setattr(db, "inserir_registros", inserir)
+    assert escritor.enfileirar(Registro(aluno_id=aluno, tipo="saida"))
+    assert escritor.flush(timeout=5)
+    assert _total(db) == 2
+
+    escritor.parar()
+
+
+def test_enfileirar_depois_de_parar(db, aluno):
+    escritor = EscritorRegistros(db)
+    assert escritor.enfileirar(Registro(aluno_id=aluno, tipo="entrada"))
+    escritor.parar()
+
+    assert _total(db) == 1
+    assert not escritor.enfileirar(Registro(aluno_id=aluno, tipo="saida"))
@@ -0,0 +1,29 @@
+"""
+Testes da busca em lote do índice IVF
+"""
+
+import numpy as np
+
+from core.galeria import GaleriaFacial
+from core.indice import IndiceIVF
+
+
+def _galeria(total: int, rng: np.random.Generator) -> GaleriaFacial:
+    galeria = GaleriaFacial(dimensao=128, capacidade=total)
+    for aluno_id, encoding in enumerate(rng.normal(0.0, 0.08, size=(total, 128)).astype(np.float32)):
+        galeria.adicionar(aluno_id, f"Aluno {aluno_id}", encoding)
+    return galeria
+
+
+def test_lote_igual_as_buscas_individuais():
+    rng = np.random.default_rng(0)
+    galeria = _galeria(IndiceIVF.MINIMO_LINHAS * 2, rng)
+    indice = IndiceIVF(galeria, sondagens=3)
+    consultas = galeria.matriz[rng.integers(0, len(galeria), 40)] + rng.normal(0.0, 0.02, (40, 128)).astype(np.float32)
+
+    lote = indice.buscar_lote(consultas)
+    individuais = [indice.buscar(consulta) for consulta in consultas]
+
+    assert [linha for linha, _ in lote] == [linha for linha, _ in individuais]
+    np.testing.assert_allclose([d for _, d in lote], [d for _, d in individuais], rtol=1e-4)
+    assert indice.buscar_lote(np.empty((0, 128), dtype=np.float32)) == []
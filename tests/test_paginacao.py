@@ -0,0 +1,86 @@
+"""
+Testes da paginação por chave (data_hora, id) das consultas de registros
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models import Aluno, Database, FiltroRegistros, Registro
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "teste.db"))
+
+
+@pytest.fixture
+def alunos(db):
+    return [db.inserir_aluno(Aluno(matricula=str(i), nome=f"Aluno {i}", turma="1A")) for i in range(3)]
+
+
+def _chaves(linhas):
+    return [(linha[0], linha[7]) for linha in linhas]
+
+
+def test_empates_de_horario_divididos_entre_paginas(db, alunos):
+    # 10 registros no mesmo segundo: só o id separa as páginas
+    instante = datetime(2026, 3, 10, 7, 30)
+    db.inserir_registros([Registro(aluno_id=alunos[i % 3], tipo="entrada", data_hora=instante)
+                          for i in range(10)])
+    filtro = FiltroRegistros.do_dia(date(2026, 3, 10))
+
+    primeira = db.consultar_registros(filtro, limite=4)
+    segunda = db.consultar_registros(filtro, (primeira[-1][0], primeira[-1][7]), limite=4)
+    assert [linha[7] for linha in primeira] == [10, 9, 8, 7]
+    assert [linha[7] for linha in segunda] == [6, 5, 4, 3]
+
+    linhas = list(db.iterar_registros(filtro, tamanho_pagina=4))
+    assert [linha[7] for linha in linhas] == list(range(10, 0, -1))
+
+
+@pytest.mark.parametrize("tamanho_pagina", [1, 3, 5, 6, 7])
+def test_iteracao_sem_repetir_nem_perder_linhas(db, alunos, tamanho_pagina):
+    inicio = datetime(2026, 3, 10, 7, 0)
+    # Horários repetidos em pares, fora da ordem dos ids
+    db.inserir_registros([Registro(aluno_id=alunos[i % 3], tipo="entrada" if i % 2 else "saida",
+                                   data_hora=inicio + timedelta(minutes=(i * 7) % 3))
+                          for i in range(6)])
+    filtro = FiltroRegistros.do_dia(date(2026, 3, 10))
+
+    chaves = _chaves(db.iterar_registros(filtro, tamanho_pagina))
+    assert len(chaves) == 6
+    assert chaves == sorted(set(chaves), reverse=True)
+
+
+def test_limites_do_periodo_respeitados_em_todas_as_paginas(db, alunos):
+    db.inserir_registros([
+        Registro(aluno_id=alunos[0], tipo="entrada", data_hora=datetime(2026, 3, 9, 23, 59, 59)),
+        Registro(aluno_id=alunos[0], tipo="entrada", data_hora=datetime(2026, 3, 10, 0, 0)),
+        Registro(aluno_id=alunos[1], tipo="entrada", data_hora=datetime(2026, 3, 11, 23, 59, 59)),
+        Registro(aluno_id=alunos[2], tipo="entrada", data_hora=datetime(2026, 3, 11, 23, 59, 59)),
+        Registro(aluno_id=alunos[2], tipo="entrada", data_hora=datetime(2026, 3, 12, 0, 0)),
+    ])
+    filtro = FiltroRegistros(data_inicio=date(2026, 3, 10), data_fim=date(2026, 3, 11))
+
+    for tamanho_pagina in (1, 2, 3):
+        assert [linha[7] for linha in db.iterar_registros(filtro, tamanho_pagina)] == [4, 3, 2]
+
+
+def test_pagina_cheia_no_fim_encerra_a_iteracao(db, alunos):
+    instante = datetime(2026, 3, 10, 7, 30)
+    db.inserir_registros([Registro(aluno_id=alunos[0], tipo="entrada", data_hora=instante)] * 4)
+    filtro = FiltroRegistros.do_dia(date(2026, 3, 10))
+
+    ultima = db.consultar_registros(filtro, limite=4)[-1]
+    assert db.consultar_registros(filtro, (ultima[0], ultima[7]), limite=4) == []
+    assert len(list(db.iterar_registros(filtro, tamanho_pagina=4))) == 4
+
+
+def test_filtros_combinados_com_a_chave(db, alunos):
+    instante = datetime(2026, 3, 10, 7, 30)
+    db.inserir_registros([Registro(aluno_id=alunos[i % 3], tipo="entrada" if i % 2 else "saida",
+                                   data_hora=instante) for i in range(9)])
+    filtro = FiltroRegistros.do_dia(date(2026, 3, 10), tipo="entrada")
+
+    assert [linha[7] for linha in db.iterar_registros(filtro, tamanho_pagina=2)] == [8, 6, 4, 2]
@@ -0,0 +1,143 @@
+"""
+Testes do journal da galeria: recuperação após registros incompletos ou
+corrompidos e falhas de gravação
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import core.persistencia as persistencia
+from core.facial_recognition import FacialRecognition
+from core.persistencia import OP_CADASTRAR, OP_REMOVER, OP_RENOMEAR, JournalGaleria, OperacaoGaleria
+
+
+def _encoding(semente: int) -> np.ndarray:
+    return np.random.default_rng(semente).normal(0.0, 0.1, 128).astype(np.float32)
+
+
+def _operacoes():
+    return [
+        OperacaoGaleria(OP_CADASTRAR, 1, "Ana", _encoding(1)),
+        OperacaoGaleria(OP_RENOMEAR, 1, "Ana Maria"),
+        OperacaoGaleria(OP_CADASTRAR, 2, "Bruno", _encoding(2)),
+        OperacaoGaleria(OP_REMOVER, 2),
+    ]
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "galeria.journal")
+
+
+def test_journal_relido_na_ordem_gravada(caminho):
+    journal = JournalGaleria(caminho)
+    journal.anexar(_operacoes()[:2])
+    journal.anexar(_operacoes()[2:])
+    journal.fechar()
+
+    lidas = list(JournalGaleria(caminho).ler())
+    assert [(op.operacao, op.aluno_id, op.nome) for op in lidas] == [
+        (OP_CADASTRAR, 1, "Ana"), (OP_RENOMEAR, 1, "Ana Maria"), (OP_CADASTRAR, 2, "Bruno"), (OP_REMOVER, 2, ""),
+    ]
+    np.testing.assert_array_equal(lidas[0].encoding, _encoding(1))
+    assert lidas[1].encoding is None
+
+
+def test_registro_final_incompleto_e_descartado(caminho):
+    journal = JournalGaleria(caminho)
+    journal.anexar(_operacoes()[:3])
+    journal.fechar()
+    tamanho_valido = os.path.getsize(caminho)
+    journal.anexar(_operacoes()[3:])
+    journal.fechar()
+    # Queda no meio da escrita do último registro
+    with open(caminho, 'r+b') as f:
+        f.truncate(tamanho_valido + 5)
+
+    journal = JournalGaleria(caminho)
+    assert len(list(journal.ler())) == 3
+    assert journal.total_registros == 3
+    assert os.path.getsize(caminho) == tamanho_valido
+
+    # Novos registros vêm logo depois do último válido
+    journal.anexar(_operacoes()[3:])
+    journal.fechar()
+    assert len(list(JournalGaleria(caminho).ler())) == 4
+
+
+def test_crc_invalido_encerra_a_leitura(caminho):
+    journal = JournalGaleria(caminho)
+    journal.anexar(_operacoes()[:1])
+    journal.fechar()
+    tamanho_primeiro = os.path.getsize(caminho)
+    journal.anexar(_operacoes()[1:])
+    journal.fechar()
+    # Um byte alterado no payload do segundo registro
+    with open(caminho, 'r+b') as f:
+        f.seek(tamanho_primeiro + 10)
+        byte = f.read(1)
+        f.seek(tamanho_primeiro + 10)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    assert [op.aluno_id for op in JournalGaleria(caminho).ler()] == [1]
+    assert os.path.getsize(caminho) == tamanho_primeiro
+
+
+def test_falha_na_gravacao_nao_esconde_os_lotes_seguintes(caminho, monkeypatch):
+    journal = JournalGaleria(caminho)
+    journal.anexar(_operacoes()[:1])
+
+    fsync = os.fsync
+
+    def fsync_falha(fd):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(persistencia.os, "fsync", fsync_falha)
+    with pytest.raises(OSError):
+        journal.anexar(_operacoes()[1:2])
+    monkeypatch.setattr(persistencia.os, "fsync", fsync)
+
+    journal.anexar(_operacoes()[2:3])
+    journal.fechar()
+    assert [op.aluno_id for op in JournalGaleria(caminho).ler()] == [1, 2]
+
+
+def test_cadastro_falha_se_o_journal_nao_for_gravado(tmp_path, monkeypatch):
+    facial_recognition = FacialRecognition(str(tmp_path / "faces" / "encodings.pkl"))
+    assert facial_recognition.cadastrar_rosto(1, "Ana", [_encoding(1)])
+
+    def anexar_falha(operacoes):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(facial_recognition.journal, "anexar", anexar_falha)
+    assert not facial_recognition.cadastrar_rosto(2, "Bruno", [_encoding(2)])
+    assert facial_recognition.cadastrar_rostos_lote([(3, "Carla", [_encoding(3)])]) == 0
+    assert not facial_recognition.remover_rosto(1)
+    assert not facial_recognition.atualizar_nome(1, "Ana Maria")
+
+    # A galeria em memória continua igual à do disco
+    assert list(facial_recognition.known_ids) == [1]
+    assert list(facial_recognition.known_names) == ["Ana"]
+
+
+def test_compactacao_com_galeria_em_uso_mantem_o_journal(tmp_path, monkeypatch):
+    diretorio = tmp_path / "faces"
+    facial_recognition = FacialRecognition(str(diretorio / "encodings.pkl"))
+    facial_recognition.cadastrar_rostos_lote([(1, "Ana", [_encoding(1)]), (2, "Bruno", [_encoding(2)])])
+
+    def replace_em_uso(origem, destino):
+        raise PermissionError("arquivo em uso por outro processo")
+
+    monkeypatch.setattr(persistencia.os, "replace", replace_em_uso)
+    assert not facial_recognition.compactar()
+    assert facial_recognition.journal.total_registros == 2
+    assert not os.path.exists(facial_recognition.galeria_path + ".tmp")
+    monkeypatch.undo()
+
+    # Nenhuma alteração perdida: o journal é reaplicado na próxima abertura
+    reaberta = FacialRecognition(str(diretorio / "encodings.pkl"))
+    assert list(reaberta.known_ids) == [1, 2]
+    assert reaberta.compactar()
+    assert reaberta.journal.total_registros == 0
@@ -0,0 +1,107 @@
+"""
+Testes da tabela resumo_diario e dos contadores do dia em memória
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.models import Aluno, Database, FiltroRegistros, Registro
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / "teste.db"))
+
+
+def _resumo(db):
+    cursor = db.conn.execute('SELECT data, tipo, turma, total FROM resumo_diario WHERE total <> 0')
+    return {(row['data'], row['tipo'], row['turma']): row['total'] for row in cursor.fetchall()}
+
+
+def test_insercao_soma_na_turma_do_aluno(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    b = db.inserir_aluno(Aluno(matricula="2", nome="Bruno", turma="2B"))
+    dia = datetime(2026, 3, 10, 7, 30)
+    db.inserir_registros([
+        Registro(aluno_id=a, tipo="entrada", data_hora=dia),
+        Registro(aluno_id=b, tipo="entrada", data_hora=dia),
+        Registro(aluno_id=a, tipo="saida", data_hora=dia + timedelta(hours=5)),
+    ])
+    db.inserir_registro(Registro(aluno_id=b, tipo="entrada", data_hora=dia + timedelta(days=1)))
+
+    assert _resumo(db) == {
+        ("2026-03-10", "entrada", "1A"): 1,
+        ("2026-03-10", "entrada", "2B"): 1,
+        ("2026-03-10", "saida", "1A"): 1,
+        ("2026-03-11", "entrada", "2B"): 1,
+    }
+
+
+def test_exclusao_subtrai_da_turma_do_registro(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    db.inserir_registro(Registro(aluno_id=a, tipo="entrada", data_hora=datetime(2026, 3, 10, 7, 30)))
+
+    # Mudança de turma depois do registro: a exclusão ainda desconta da turma antiga
+    db.conn.execute("UPDATE alunos SET turma = '2B' WHERE id = ?", (a,))
+    db.conn.execute("DELETE FROM registros WHERE aluno_id = ?", (a,))
+    db.conn.commit()
+
+    assert _resumo(db) == {}
+
+
+def test_insercao_sem_turma_usa_a_turma_atual(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    db.conn.execute(
+        "INSERT INTO registros (aluno_id, tipo, data_hora) VALUES (?, 'entrada', '2026-03-10 07:30:00')", (a,)
+    )
+    db.conn.commit()
+
+    assert db.conn.execute('SELECT turma FROM registros').fetchone()['turma'] == "1A"
+    assert _resumo(db) == {("2026-03-10", "entrada", "1A"): 1}
+
+
+def test_contadores_do_dia_acompanham_as_insercoes(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    db.inserir_registro(Registro(aluno_id=a, tipo="entrada"))
+    assert db.contar_registros_hoje() == {'entrada': 1, 'saida': 0}
+
+    db.inserir_registro(Registro(aluno_id=a, tipo="saida"))
+    db.inserir_registro(Registro(aluno_id=a, tipo="entrada", data_hora=datetime.now() - timedelta(days=1)))
+    assert db.contar_registros_hoje() == {'entrada': 1, 'saida': 1}
+    assert db.resumo_por_turma() == {"1A": {'entrada': 1, 'saida': 1}}
+
+
+def test_recarga_concorrente_nao_duplica_nem_perde_registros(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    gravados = 200
+
+    def gravar():
+        for _ in range(gravados):
+            db.inserir_registros([Registro(aluno_id=a, tipo="entrada")])
+
+    escritor = threading.Thread(target=gravar)
+    escritor.start()
+    while escritor.is_alive():
+        # Força a recarga a partir do banco enquanto a outra thread grava
+        db.contadores_hoje.data = None
+        db.contar_registros_hoje()
+    escritor.join()
+
+    assert db.contar_registros_hoje()['entrada'] == gravados
+    assert _resumo(db) == {(date.today().isoformat(), "entrada", "1A"): gravados}
+
+
+def test_resumo_filtrado_usa_a_turma_do_registro(db):
+    a = db.inserir_aluno(Aluno(matricula="1", nome="Ana", turma="1A"))
+    dia = date(2026, 3, 10)
+    db.inserir_registro(Registro(aluno_id=a, tipo="entrada", data_hora=datetime(2026, 3, 10, 7, 30)))
+    db.atualizar_aluno(Aluno(id=a, matricula="1", nome="Ana", turma="2B"))
+
+    por_periodo = db.resumo_registros(FiltroRegistros.do_dia(dia))
+    assert por_periodo == {"1A": {'entrada': 1, 'saida': 0}}
+    assert db.resumo_registros(FiltroRegistros.do_dia(dia, tipo="entrada")) == por_periodo
+    assert db.resumo_registros(FiltroRegistros.do_dia(dia, turma="1A")) == por_periodo
+    assert db.resumo_registros(FiltroRegistros.do_dia(dia, turma="2B")) == {}
+    assert [linha[3] for linha in db.iterar_registros(FiltroRegistros.do_dia(dia, turma="1A"))] == ["1A"]
@@ -3,7 +3,6 @@ Janela de Cadastro de Alunos
 Interface para capturar fotos e cadastrar novos alunos no sistema
 """
 
-import cv2
 import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGridLayout,
@@ -16,6 +15,7 @@ from PyQt5.QtGui import QImage, QPixmap
 from database.models import Database, Aluno
 from core.facial_recognition import FacialRecognition
 from core.camera_handler import CameraHandler
+from core.contexto_frame import ContextoFrame
 
 
 class CadastroWindow(QDialog):
@@ -34,6 +34,7 @@ class CadastroWindow(QDialog):
         self.encodings_capturados = []
         self.max_fotos = 5
         self.captura_ativa = True
+        self.ultima_sequencia = 0  # Último frame exibido
 
         # Configura interface
         self._setup_ui()
@@ -184,20 +185,24 @@ class CadastroWindow(QDialog):
         if not self.captura_ativa:
             return
 
-        frame = self.camera.capturar_frame()
-        if frame is None:
+        capturado = self.camera.capturar_frame_detalhado()
+        if capturado is None or capturado.sequencia == self.ultima_sequencia:
             return
 
+        self.ultima_sequencia = capturado.sequencia
+        frame = capturado.frame
+
         # Espelha
-        frame = self.camera.espelhar_frame(frame)
+        contexto = ContextoFrame(self.camera.espelhar_frame(frame))
 
         # Detecta rostos para feedback visual
-        face_locations = self.facial_recognition.detectar_rostos(frame)
+        face_locations = self.facial_recognition.detectar_rostos(contexto)
+        rgb_frame = contexto.rgb
 
         if face_locations:
             # Desenha retângulo verde ao redor do rosto
             for face_loc in face_locations:
-                frame = self.camera.desenhar_retangulo_rosto(frame, face_loc, (0, 255, 0), 3)
+                rgb_frame = self.camera.desenhar_retangulo_rosto(rgb_frame, face_loc, (0, 255, 0), 3)
 
             self.instrucao_label.setText("Rosto detectado! Pressione ESPAÇO ou clique em CAPTURAR")
             self.instrucao_label.setStyleSheet("color: #27ae60;")
@@ -206,11 +211,10 @@ class CadastroWindow(QDialog):
             self.instrucao_label.setStyleSheet("color: #f39c12;")
 
         # Exibe frame
-        self._exibir_frame(frame)
+        self._exibir_frame(rgb_frame)
 
-    def _exibir_frame(self, frame):
-        """Exibe o frame na interface"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def _exibir_frame(self, rgb_frame):
+        """Exibe o frame (já em RGB) na interface"""
         h, w, ch = rgb_frame.shape
         bytes_per_line = ch * w
         qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
@@ -231,9 +235,10 @@ class CadastroWindow(QDialog):
 
         # Espelha
         frame = self.camera.espelhar_frame(frame)
+        contexto = ContextoFrame(frame)
 
         # Gera encoding
-        encoding = self.facial_recognition.gerar_encoding(frame)
+        encoding = self.facial_recognition.gerar_encoding(contexto)
 
         if encoding is None:
             QMessageBox.warning(self, "Erro",
@@ -246,7 +251,7 @@ class CadastroWindow(QDialog):
 
         # Atualiza miniatura
         index = len(self.fotos_capturadas) - 1
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb_frame = contexto.rgb
         h, w, ch = rgb_frame.shape
         qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888)
         pixmap = QPixmap.fromImage(qt_image)
@@ -310,7 +315,7 @@ class CadastroWindow(QDialog):
             return
 
         # Verifica se matrícula já existe
-        aluno_existente = self.db.buscar_aluno_por_matricula(matricula)
+        aluno_existente = self.db.obter_aluno_por_matricula(matricula)
         if aluno_existente:
             QMessageBox.warning(self, "Erro", f"Já existe um aluno com a matrícula {matricula}")
             self.input_matricula.setFocus()
@@ -3,6 +3,7 @@ Janela de Configurações do Sistema
 Interface para personalizar o Guardião Escolar
 """
 
+import os
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLabel, QPushButton, QLineEdit, QFrame, QMessageBox,
@@ -114,6 +115,39 @@ class ConfigWindow(QDialog):
         )
         rec_form.addWidget(self.input_tempo_registros, 2, 1)
 
+        # Índice de busca
+        rec_form.addWidget(QLabel("Índice de busca:"), 3, 0)
+        self.input_indice = QComboBox()
+        self.input_indice.addItem("Exato (força bruta)", "exato")
+        self.input_indice.addItem("Aproximado (IVF)", "ivf")
+        self.input_indice.setToolTip(
+            "Exato: compara com todos os alunos cadastrados\n"
+            "Aproximado: mais rápido para galerias muito grandes"
+        )
+        rec_form.addWidget(self.input_indice, 3, 1)
+
+        # Sondagens do índice aproximado
+        rec_form.addWidget(QLabel("Sondagens (IVF):"), 4, 0)
+        self.input_sondagens = QSpinBox()
+        self.input_sondagens.setRange(1, 256)
+        self.input_sondagens.setToolTip(
+            "Listas visitadas por busca no índice aproximado\n"
+            "Maior valor = mais preciso, porém mais lento"
+        )
+        rec_form.addWidget(self.input_sondagens, 4, 1)
+
+        # Processos de reconhecimento
+        rec_form.addWidget(QLabel("Processos de reconhecimento:"), 5, 0)
+        self.input_processos = QSpinBox()
+        self.input_processos.setRange(0, os.cpu_count() or 1)
+        self.input_processos.setSpecialValueText("Desativado")
+        self.input_processos.setToolTip(
+            "Processos que executam detecção e encoding em paralelo\n"
+            "Use mais de um para aproveitar todos os núcleos da CPU\n"
+            "(vale após reiniciar o sistema)"
+        )
+        rec_form.addWidget(self.input_processos, 5, 1)
+
         rec_layout.addWidget(rec_group)
         rec_layout.addStretch()
 
@@ -210,6 +244,12 @@ class ConfigWindow(QDialog):
         self.input_tolerancia.setValue(cfg.tolerancia_reconhecimento)
         self.input_tempo_registros.setValue(cfg.tempo_entre_registros)
 
+        index = self.input_indice.findData(cfg.indice_reconhecimento)
+        if index >= 0:
+            self.input_indice.setCurrentIndex(index)
+        self.input_sondagens.setValue(cfg.ivf_sondagens)
+        self.input_processos.setValue(cfg.processos_reconhecimento)
+
     def _salvar(self):
         """Salva as configurações"""
         # Valida campos obrigatórios
@@ -232,6 +272,9 @@ class ConfigWindow(QDialog):
         self.config.set("estado", self.input_estado.currentText())
         self.config.set("tolerancia_reconhecimento", self.input_tolerancia.value())
         self.config.set("tempo_entre_registros", self.input_tempo_registros.value())
+        self.config.set("indice_reconhecimento", self.input_indice.currentData())
+        self.config.set("ivf_sondagens", self.input_sondagens.value())
+        self.config.set("processos_reconhecimento", self.input_processos.value())
 
         # Salva no arquivo
         if self.config.salvar():
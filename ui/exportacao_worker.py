@@ -0,0 +1,79 @@
+"""
+Worker de Exportação de Registros
+Gera os relatórios fora da thread da interface gráfica
+"""
+
+import threading
+from dataclasses import replace
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.relatorios import EXPORTADORES, ExportacaoCancelada, InfoRelatorio
+from database.models import Database, FiltroRegistros
+
+
+class ExportacaoWorker(QThread):
+    """
+    Thread que exporta os registros de um filtro para arquivo
+
+    A thread usa conexão própria com o banco e lê os registros em lotes,
+    então a interface continua respondendo e a memória usada não depende
+    do tamanho do período exportado.
+    """
+
+    # Linhas exportadas e total esperado
+    progresso = pyqtSignal(int, int)
+    # Arquivo gerado e número de registros
+    concluida = pyqtSignal(str, int)
+    # Mensagem de erro
+    falhou = pyqtSignal(str)
+    cancelada = pyqtSignal()
+
+    def __init__(self, db: Database, filtro: FiltroRegistros, formato: str, arquivo: str,
+                 info: InfoRelatorio, parent=None, por_turma: bool = False):
+        """
+        Args:
+            db: Banco de dados
+            filtro: Registros a exportar
+            formato: Chave de EXPORTADORES ("csv", "xlsx" ou "pdf")
+            arquivo: Caminho do arquivo de saída
+            info: Cabeçalho e rodapé do relatório
+            parent: Objeto Qt pai
+            por_turma: Relatório agrupado por turma (apenas PDF)
+        """
+        super().__init__(parent)
+
+        self.db = db
+        self.filtro = filtro
+        self.exportar = EXPORTADORES[formato]
+        self.arquivo = arquivo
+        self.info = info
+        self.por_turma = por_turma
+        self._cancelar = threading.Event()
+
+    def cancelar(self):
+        """Pede a interrupção da exportação (o arquivo parcial é descartado)"""
+        self._cancelar.set()
+
+    def run(self):
+        lotes = None
+        try:
+            # Totais por turma em uma consulta agregada, para o progresso e os resumos
+            resumo = self.db.resumo_registros(self.filtro)
+            total = sum(t['entrada'] + t['saida'] for t in resumo.values())
+            info = replace(self.info, resumo=resumo)
+
+            lotes = self.db.ler_registros_em_lotes(self.filtro, por_turma=self.por_turma)
+            opcoes = {'por_turma': True} if self.por_turma else {}
+            linhas = self.exportar(lotes, self.arquivo, info, total,
+                                   self.progresso.emit, self._cancelar, **opcoes)
+        except ExportacaoCancelada:
+            self.cancelada.emit()
+        except Exception as e:
+            self.falhou.emit(str(e))
+        else:
+            self.concluida.emit(self.arquivo, linhas)
+        finally:
+            if lotes is not None:
+                lotes.close()
+            self.db.liberar_conexao()
@@ -3,9 +3,10 @@ Janela Principal do Sistema Guardião Escolar
 Interface principal com preview da câmera e controles de acesso
 """
 
-import cv2
 import os
+import threading
 from datetime import datetime
+from typing import Optional
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFrame, QMessageBox,
@@ -15,12 +16,16 @@ from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap
 
 from database.models import Database, Registro
-from core.facial_recognition import FacialRecognition, ResultadoReconhecimento
+from database.conexoes import ConfiguracaoBanco
+from database.escritor import EscritorRegistros
+from core.facial_recognition import FacialRecognition, ResultadoReconhecimento, aquecer_modelos
 from core.camera_handler import CameraHandler
 from core.config import get_config
+from core.contexto_frame import ContextoFrame
 from .cadastro_window import CadastroWindow
 from .registros_window import RegistrosWindow
 from .config_window import ConfigWindow
+from .reconhecimento_worker import ReconhecimentoWorker
 
 
 class MainWindow(QMainWindow):
@@ -29,6 +34,22 @@ class MainWindow(QMainWindow):
     # Sinal emitido quando um aluno é reconhecido
     aluno_reconhecido = pyqtSignal(int, str, float)
 
+    # Emitido (pela thread do escritor) após gravar um lote de registros
+    registros_gravados = pyqtSignal(int)
+
+    # Emitido uma única vez, quando o primeiro frame da câmera é exibido
+    primeiro_frame_exibido = pyqtSignal()
+
+    # Emitidos pelas threads de inicialização quando cada subsistema termina
+    camera_pronta = pyqtSignal(bool)  # Câmera aberta com sucesso
+    galeria_pronta = pyqtSignal(object)  # FacialRecognition (None se falhou)
+    modelos_prontos = pyqtSignal(bool)  # Modelos do dlib carregados (False = simulado)
+
+    # Cores dos subsistemas na barra de status
+    COR_CARREGANDO = "#f39c12"
+    COR_PRONTO = "#27ae60"
+    COR_FALHA = "#e74c3c"
+
     def __init__(self):
         super().__init__()
 
@@ -36,11 +57,34 @@ class MainWindow(QMainWindow):
         self.config = get_config()
 
         # Inicializa componentes do sistema
-        self.db = Database()
-        self.facial_recognition = FacialRecognition(
-            tolerance=self.config.config.tolerancia_reconhecimento
+        cfg = self.config.config
+        self.db = Database(configuracao=ConfiguracaoBanco(
+            wal=cfg.banco_wal,
+            synchronous=cfg.banco_synchronous,
+            cache_mb=cfg.banco_cache_mb,
+            mmap_mb=cfg.banco_mmap_mb,
+            max_conexoes=cfg.banco_conexoes
+        ))
+
+        # Registros de reconhecimento são gravados em lote, fora da thread da interface
+        self.escritor_registros = EscritorRegistros(
+            self.db,
+            intervalo_ms=cfg.escritor_intervalo_ms,
+            max_lote=cfg.escritor_max_lote,
+            ao_gravar=lambda registros: self.registros_gravados.emit(len(registros))
+        )
+        self.registros_gravados.connect(self._on_registros_gravados)
+        self.camera = CameraHandler(
+            usar_thread=cfg.captura_em_thread,
+            fonte=cfg.fonte_frames,
+            fonte_tempo_real=cfg.fonte_tempo_real
         )
-        self.camera = CameraHandler()
+
+        # Galeria e worker de reconhecimento são criados em segundo plano
+        # (ver _iniciar_em_segundo_plano)
+        self.facial_recognition: Optional[FacialRecognition] = None
+        self.reconhecimento_worker: Optional[ReconhecimentoWorker] = None
+        self._thread_camera: Optional[threading.Thread] = None
 
         # Estado do sistema
         self.modo_atual = "entrada"  # entrada ou saida
@@ -48,15 +92,22 @@ class MainWindow(QMainWindow):
         self.tempo_feedback = 0  # Contador para exibir feedback
         self.reconhecimento_ativo = True
         self.frame_contador = 0  # Para processar a cada N frames
+        # Com o pool de processos todo frame é enviado (o motor recusa o excesso)
+        self.intervalo_reconhecimento = 1 if self.config.config.processos_reconhecimento > 0 else 5
+        self.ultima_sequencia = 0  # Último frame exibido (evita reprocessar repetidos)
+        self._frame_exibido = False
 
         # Configura interface
         self._setup_ui()
+        self._setup_status_bar()
         self._setup_timers()
-        self._iniciar_camera()
 
         # Atualiza contadores
         self._atualizar_contadores()
 
+        # Câmera, galeria e modelos carregam depois que a janela aparece
+        QTimer.singleShot(0, self._iniciar_em_segundo_plano)
+
     def _setup_ui(self):
         """Configura a interface gráfica"""
         self.setWindowTitle(f"Guardião Escolar - {self.config.config.nome_escola}")
@@ -232,6 +283,7 @@ class MainWindow(QMainWindow):
         self.btn_cadastro = QPushButton("CADASTRAR ALUNO")
         self.btn_cadastro.setObjectName("btnCadastro")
         self.btn_cadastro.clicked.connect(self._abrir_cadastro)
+        self.btn_cadastro.setEnabled(False)  # Habilitado quando a galeria carregar
         right_layout.addWidget(self.btn_cadastro)
 
         # Ver registros
@@ -269,86 +321,188 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(right_panel, stretch=1)
 
+    def _setup_status_bar(self):
+        """Cria a barra de status com o estado de cada subsistema"""
+        barra = self.statusBar()
+        self.status_subsistemas = {}
+        for chave in ("camera", "galeria", "modelos"):
+            label = QLabel()
+            label.setObjectName("statusSubsistema")
+            barra.addWidget(label)
+            self.status_subsistemas[chave] = label
+
+        self._status_subsistema("camera", "Câmera: iniciando...", self.COR_CARREGANDO)
+        self._status_subsistema("galeria", "Galeria: carregando...", self.COR_CARREGANDO)
+        self._status_subsistema("modelos", "Modelos: carregando...", self.COR_CARREGANDO)
+
+    def _status_subsistema(self, chave: str, texto: str, cor: str):
+        """Atualiza o texto e a cor de um subsistema na barra de status"""
+        label = self.status_subsistemas[chave]
+        label.setText(texto)
+        label.setStyleSheet(f"color: {cor};")
+
     def _setup_timers(self):
         """Configura os timers do sistema"""
         # Timer para atualizar frame da câmera (30ms = ~33fps)
+        # (iniciado em _on_camera_pronta, depois que a captura está aberta)
         self.camera_timer = QTimer()
         self.camera_timer.timeout.connect(self._atualizar_frame)
-        self.camera_timer.start(30)
 
         # Timer para limpar feedback (1 segundo)
         self.feedback_timer = QTimer()
         self.feedback_timer.timeout.connect(self._decrementar_feedback)
         self.feedback_timer.start(1000)
 
-    def _iniciar_camera(self):
-        """Inicia a câmera"""
-        if self.camera.iniciar():
+    # ==================== INICIALIZAÇÃO ====================
+
+    def _iniciar_em_segundo_plano(self):
+        """
+        Abre a câmera, carrega a galeria e aquece os modelos em paralelo
+
+        Cada etapa roda em uma thread própria e avisa a interface por sinal
+        ao terminar; a janela responde desde o início e a barra de status
+        mostra o que já está pronto.
+        """
+        self.camera_pronta.connect(self._on_camera_pronta)
+        self.galeria_pronta.connect(self._on_galeria_pronta)
+        self.modelos_prontos.connect(self._on_modelos_prontos)
+
+        cfg = self.config.config
+        opcoes_galeria = dict(
+            tolerance=cfg.tolerancia_reconhecimento,
+            indice=cfg.indice_reconhecimento,
+            ivf_listas=cfg.ivf_listas,
+            ivf_sondagens=cfg.ivf_sondagens
+        )
+
+        self._thread_camera = threading.Thread(target=self._abrir_camera, name="InicioCamera", daemon=True)
+        self._thread_camera.start()
+        threading.Thread(target=self._carregar_galeria, args=(opcoes_galeria,),
+                         name="CargaGaleria", daemon=True).start()
+        threading.Thread(target=lambda: self.modelos_prontos.emit(aquecer_modelos()),
+                         name="AquecimentoModelos", daemon=True).start()
+
+    def _abrir_camera(self):
+        """Abre a câmera configurada ou, se falhar, a primeira encontrada (thread de inicialização)"""
+        sucesso = self.camera.iniciar()
+        if not sucesso and not self.camera.fonte:
+            outras = [i for i in self.camera.listar_cameras_disponiveis() if i != self.camera.camera_index]
+            if outras:
+                self.camera.camera_index = outras[0]
+                sucesso = self.camera.iniciar()
+        self.camera_pronta.emit(sucesso)
+
+    def _carregar_galeria(self, opcoes: dict):
+        """Carrega a galeria de rostos (thread de inicialização)"""
+        try:
+            facial_recognition = FacialRecognition(**opcoes)
+        except Exception as e:
+            print(f"Erro ao carregar galeria: {e}")
+            facial_recognition = None
+        self.galeria_pronta.emit(facial_recognition)
+
+    def _on_camera_pronta(self, sucesso: bool):
+        """Atualiza a interface com o resultado da abertura da câmera"""
+        if sucesso:
+            self.camera_timer.start(30)
             self.status_camera.setText("Status: Câmera ativa")
             self.status_camera.setStyleSheet("color: #27ae60;")
+            self._status_subsistema("camera", f"Captura ativa: {self.camera.descricao}", self.COR_PRONTO)
         else:
             self.status_camera.setText("Status: Câmera não disponível")
             self.status_camera.setStyleSheet("color: #e74c3c;")
             self.camera_label.setText("Câmera não disponível\nVerifique a conexão")
+            self._status_subsistema("camera", "Câmera: não disponível", self.COR_FALHA)
+
+    def _on_galeria_pronta(self, facial_recognition):
+        """Inicia o reconhecimento quando a galeria termina de carregar"""
+        if facial_recognition is None:
+            self._status_subsistema("galeria", "Galeria: erro ao carregar", self.COR_FALHA)
+            return
+
+        self.facial_recognition = facial_recognition
+
+        # Worker de reconhecimento (fora da thread da interface)
+        self.reconhecimento_worker = ReconhecimentoWorker(
+            self.facial_recognition, self,
+            processos=self.config.config.processos_reconhecimento
+        )
+        self.reconhecimento_worker.resultados_prontos.connect(self._on_resultados_reconhecimento)
+        self.reconhecimento_worker.start()
+
+        self.btn_cadastro.setEnabled(True)
+        self._status_subsistema("galeria", f"Galeria: {facial_recognition.total_cadastrados()} rostos",
+                                self.COR_PRONTO)
+
+    def _on_modelos_prontos(self, carregados: bool):
+        """Informa se os modelos de reconhecimento foram carregados"""
+        if carregados:
+            self._status_subsistema("modelos", "Modelos: prontos", self.COR_PRONTO)
+        else:
+            self._status_subsistema("modelos", "Modelos: modo simulado", self.COR_FALHA)
 
     def _atualizar_frame(self):
         """Atualiza o frame da câmera e processa reconhecimento"""
-        frame = self.camera.capturar_frame()
+        capturado = self.camera.capturar_frame_detalhado()
 
-        if frame is None:
+        if capturado is None or capturado.sequencia == self.ultima_sequencia:
             return
 
+        self.ultima_sequencia = capturado.sequencia
+        frame = capturado.frame
+
         # Espelha o frame para efeito espelho
         frame = self.camera.espelhar_frame(frame)
 
-        # Processa reconhecimento a cada 5 frames (para performance)
+        # Contexto compartilhado: a conversão para RGB é feita uma única vez
+        # e reaproveitada pela exibição e pelo encoding no worker
+        contexto = ContextoFrame(frame)
+
+        # Envia para reconhecimento a cada N frames (o worker descarta frames antigos)
         self.frame_contador += 1
-        if self.frame_contador >= 5 and self.reconhecimento_ativo and self.tempo_feedback == 0:
+        if (self.frame_contador >= self.intervalo_reconhecimento and self.reconhecimento_ativo
+                and self.tempo_feedback == 0 and self.reconhecimento_worker is not None):
             self.frame_contador = 0
-            self._processar_reconhecimento(frame)
+            self.reconhecimento_worker.enviar_frame(contexto)
+
+        rgb_frame = contexto.rgb
 
-        # Aplica overlay se houver feedback ativo
+        # Aplica overlay se houver feedback ativo (cores em RGB)
         if self.tempo_feedback > 0:
             if self.ultimo_reconhecimento and self.ultimo_reconhecimento.reconhecido:
                 # Verde para reconhecido
-                frame = self.camera.adicionar_overlay(frame, (0, 255, 0), 0.2)
+                rgb_frame = self.camera.adicionar_overlay(rgb_frame, (0, 255, 0), 0.2)
             else:
                 # Vermelho para não reconhecido
-                frame = self.camera.adicionar_overlay(frame, (0, 0, 255), 0.2)
+                rgb_frame = self.camera.adicionar_overlay(rgb_frame, (255, 0, 0), 0.2)
 
         # Converte para QImage e exibe
-        self._exibir_frame(frame)
-
-    def _processar_reconhecimento(self, frame):
-        """Processa reconhecimento facial no frame"""
-        # Detecta rostos
-        face_locations = self.facial_recognition.detectar_rostos(frame)
+        self._exibir_frame(rgb_frame)
 
-        if not face_locations:
+    def _on_resultados_reconhecimento(self, resultados):
+        """Recebe os resultados do worker de reconhecimento (na thread da interface)"""
+        # Descarta resultados que chegaram após pausar o reconhecimento
+        if not self.reconhecimento_ativo or self.tempo_feedback > 0:
             return
 
-        # Tenta reconhecer o primeiro rosto detectado
-        resultado = self.facial_recognition.reconhecer_rosto(frame, face_locations[0])
-
-        if resultado.reconhecido:
-            self._registrar_reconhecimento(resultado)
+        # Registra todos os alunos reconhecidos no frame
+        for resultado in resultados:
+            if resultado.reconhecido:
+                self._registrar_reconhecimento(resultado)
 
     def _registrar_reconhecimento(self, resultado: ResultadoReconhecimento):
         """Registra um reconhecimento bem-sucedido"""
-        # Busca dados completos do aluno
-        aluno = self.db.buscar_aluno_por_id(resultado.aluno_id)
+        # Verifica se já não registrou recentemente (evita duplicatas, sem consultar o banco)
+        if self.db.ultimos_registros.registrado_recentemente(
+                resultado.aluno_id, self.modo_atual, self.config.config.tempo_entre_registros):
+            return
+
+        # Busca dados do aluno (cache em memória)
+        aluno = self.db.obter_aluno(resultado.aluno_id)
 
         if not aluno:
             return
 
-        # Verifica se já não registrou recentemente (evita duplicatas)
-        ultimo = self.db.ultimo_registro_aluno(aluno.id)
-        if ultimo and ultimo.tipo == self.modo_atual:
-            diferenca = (datetime.now() - ultimo.data_hora).total_seconds()
-            tempo_minimo = self.config.config.tempo_entre_registros
-            if diferenca < tempo_minimo:
-                return
-
         # Cria registro
         registro = Registro(
             aluno_id=aluno.id,
@@ -358,11 +512,13 @@ class MainWindow(QMainWindow):
             manual=False
         )
 
-        self.db.inserir_registro(registro)
+        if not self.escritor_registros.enfileirar(registro):
+            # Escritor encerrado: grava direto para não perder o registro
+            self.db.inserir_registro(registro)
+            self._atualizar_contadores()
 
-        # Atualiza interface
+        # Atualiza interface (os contadores são atualizados quando o lote for gravado)
         self._exibir_feedback_reconhecimento(aluno, resultado.confianca)
-        self._atualizar_contadores()
 
         # Ativa feedback visual
         self.ultimo_reconhecimento = resultado
@@ -392,11 +548,8 @@ class MainWindow(QMainWindow):
         if self.tempo_feedback > 0:
             self.tempo_feedback -= 1
 
-    def _exibir_frame(self, frame):
-        """Converte e exibe o frame na interface"""
-        # Converte BGR para RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
+    def _exibir_frame(self, rgb_frame):
+        """Exibe o frame (já em RGB) na interface"""
         # Cria QImage
         h, w, ch = rgb_frame.shape
         bytes_per_line = ch * w
@@ -409,6 +562,10 @@ class MainWindow(QMainWindow):
 
         self.camera_label.setPixmap(pixmap)
 
+        if not self._frame_exibido:
+            self._frame_exibido = True
+            self.primeiro_frame_exibido.emit()
+
     def _set_modo(self, modo: str):
         """Define o modo de operação (entrada/saída)"""
         self.modo_atual = modo
@@ -424,6 +581,16 @@ class MainWindow(QMainWindow):
             self.modo_label.setText("Registrando: SAÍDA")
             self.modo_label.setStyleSheet("color: #e74c3c; font-weight: bold;")
 
+    def _on_registros_gravados(self, quantidade: int):
+        """Atualiza a interface após o escritor gravar um lote (na thread da interface)"""
+        self._atualizar_contadores()
+        escritor = self.escritor_registros
+        self.status_camera.setToolTip(
+            f"Fila de registros: {escritor.profundidade}\n"
+            f"Último lote: {quantidade} registros em {escritor.ultimo_flush_ms:.1f} ms\n"
+            f"Média: {escritor.media_flush_ms:.1f} ms"
+        )
+
     def _atualizar_contadores(self):
         """Atualiza os contadores de entrada/saída"""
         contagens = self.db.contar_registros_hoje()
@@ -439,6 +606,11 @@ class MainWindow(QMainWindow):
 
     def _abrir_registros(self):
         """Abre a janela de visualização de registros"""
+        # Garante que os registros enfileirados apareçam na listagem
+        if not self.escritor_registros.flush():
+            QMessageBox.warning(self, "Aviso",
+                                "Há registros na fila que ainda não puderam ser gravados "
+                                "e não aparecerão na listagem")
         registros = RegistrosWindow(self.db, self)
         registros.exec_()
 
@@ -450,8 +622,15 @@ class MainWindow(QMainWindow):
             self.config = get_config()
             self.escola_label.setText(self.config.nome_completo_escola)
             self.setWindowTitle(f"Guardião Escolar - {self.config.config.nome_escola}")
-            # Atualiza tolerância do reconhecimento facial
+            # Atualiza tolerância e índice do reconhecimento facial
+            if self.facial_recognition is None:
+                return
             self.facial_recognition.tolerance = self.config.config.tolerancia_reconhecimento
+            self.facial_recognition.configurar_indice(
+                self.config.config.indice_reconhecimento,
+                self.config.config.ivf_listas,
+                self.config.config.ivf_sondagens
+            )
 
     def _abrir_registro_manual(self):
         """Abre diálogo para registro manual"""
@@ -477,7 +656,7 @@ class MainWindow(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             matricula = matricula_input.text().strip()
             if matricula:
-                aluno = self.db.buscar_aluno_por_matricula(matricula)
+                aluno = self.db.obter_aluno_por_matricula(matricula)
                 if aluno:
                     registro = Registro(
                         aluno_id=aluno.id,
@@ -747,13 +926,31 @@ class MainWindow(QMainWindow):
             QLineEdit:focus {
                 border-color: #e94560;
             }
+
+            QStatusBar {
+                background-color: #0f0f1a;
+            }
+
+            QLabel#statusSubsistema {
+                font-size: 12px;
+                padding: 2px 10px;
+            }
         """
 
     def closeEvent(self, event):
         """Evento de fechamento da janela"""
-        # Para a câmera
+        # Encerra o worker de reconhecimento
+        if self.reconhecimento_worker is not None:
+            self.reconhecimento_worker.parar()
+
+        # Para a câmera (aguardando a abertura, se ainda estiver em andamento)
+        if self._thread_camera is not None:
+            self._thread_camera.join(timeout=5.0)
         self.camera.parar()
 
+        # Grava os registros ainda na fila antes de fechar o banco
+        self.escritor_registros.parar()
+
         # Fecha conexão com banco
         self.db.close()
 
@@ -0,0 +1,168 @@
+"""
+Worker de Reconhecimento Facial
+Executa detecção e reconhecimento fora da thread da interface gráfica
+"""
+
+import threading
+from typing import Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core.contexto_frame import ContextoFrame
+from core.facial_recognition import FacialRecognition
+from core.motor_processos import MotorProcessos
+from core.rastreador import RastreadorRostos
+
+
+class ReconhecimentoWorker(QThread):
+    """
+    Thread dedicada ao reconhecimento facial
+
+    Recebe frames por uma caixa de correio de uma única posição: se um novo
+    frame chega enquanto o anterior ainda não foi processado, o antigo é
+    descartado. Assim o worker sempre trabalha no frame mais recente e o
+    preview da câmera nunca espera pelo reconhecimento.
+
+    Os rostos detectados passam por um rastreador: enquanto a identidade de
+    um rosto estiver em cache com confiança suficiente, o encoding não é
+    recalculado.
+
+    Com ``processos`` > 0, detecção e encoding rodam em um MotorProcessos:
+    o worker envia os frames ao pool sem esperar e processa os resultados
+    na ordem dos frames, enquanto os processos usam os demais núcleos.
+    """
+
+    # Emitido com a lista de ResultadoReconhecimento de cada frame com rostos
+    resultados_prontos = pyqtSignal(list)
+
+    def __init__(self, facial_recognition: FacialRecognition, parent=None, processos: int = 0):
+        """
+        Args:
+            facial_recognition: Instância usada para comparar com a galeria
+            parent: Objeto Qt pai
+            processos: Processos do pool de detecção/encoding (0 = nesta thread)
+        """
+        super().__init__(parent)
+
+        self.facial_recognition = facial_recognition
+        self.motor = MotorProcessos(processos) if processos > 0 else None
+        self.rastreador = RastreadorRostos()
+        self._versao_galeria = facial_recognition.galeria.versao
+
+        # Caixa de correio de uma posição
+        self._condicao = threading.Condition()
+        self._frame: Optional[ContextoFrame] = None
+        self._executando = True
+
+        # Estatísticas
+        self.frames_processados = 0
+        self.frames_descartados = 0
+
+    def enviar_frame(self, frame: ContextoFrame):
+        """
+        Entrega um frame para reconhecimento (não bloqueia)
+
+        Args:
+            frame: Contexto do frame (os buffers já calculados são reaproveitados).
+                O frame BGR não deve ser modificado após o envio.
+        """
+        with self._condicao:
+            if self._frame is not None:
+                self.frames_descartados += 1
+            self._frame = frame
+            self._condicao.notify()
+
+    def _proximo_frame(self, timeout: Optional[float] = None) -> Optional[ContextoFrame]:
+        """Aguarda e retira o frame mais recente da caixa de correio"""
+        with self._condicao:
+            if self._frame is None and self._executando:
+                self._condicao.wait_for(lambda: self._frame is not None or not self._executando,
+                                        timeout)
+            frame = self._frame
+            self._frame = None
+            return frame
+
+    def run(self):
+        """Loop principal do worker"""
+        if self.motor is not None:
+            self._executar_com_motor()
+            return
+
+        while self._executando:
+            contexto = self._proximo_frame()
+            if contexto is None:
+                continue
+
+            try:
+                face_locations = self.facial_recognition.detectar_rostos(contexto)
+                self._processar_rostos(
+                    face_locations,
+                    lambda indices: self.facial_recognition.reconhecer_rostos(
+                        contexto, [face_locations[i] for i in indices]
+                    )
+                )
+            except Exception as e:
+                print(f"Erro no reconhecimento: {e}")
+
+    def _executar_com_motor(self):
+        """Loop do worker com detecção e encoding no pool de processos"""
+        self.motor.aquecer()
+        while self._executando:
+            # Com frames em voo, acorda periodicamente para coletar os resultados
+            contexto = self._proximo_frame(0.01 if self.motor.pendentes else None)
+            if contexto is not None and self.motor.enviar(contexto.bgr) is None:
+                self.frames_descartados += 1
+
+            for processado in self.motor.coletar():
+                try:
+                    locations = processado.face_locations
+                    encodings = processado.encodings
+                    self._processar_rostos(
+                        locations,
+                        lambda indices: self.facial_recognition.identificar_encodings(
+                            encodings[indices], [locations[i] for i in indices]
+                        )
+                    )
+                except Exception as e:
+                    print(f"Erro no reconhecimento: {e}")
+
+    def _processar_rostos(self, face_locations, reconhecer):
+        """
+        Associa os rostos às trilhas e reconhece apenas os que precisam
+
+        Args:
+            face_locations: Rostos detectados no frame
+            reconhecer: Função que recebe as posições (em face_locations) dos
+                rostos pendentes e devolve um ResultadoReconhecimento para cada um
+        """
+        # Identidades em cache deixam de valer quando a galeria muda
+        versao = self.facial_recognition.galeria.versao
+        if versao != self._versao_galeria:
+            self._versao_galeria = versao
+            self.rastreador.limpar()
+
+        trilhas = self.rastreador.atualizar(face_locations)
+        if not trilhas:
+            return
+
+        # Reconhece de uma vez apenas os rostos sem identidade em cache
+        pendentes = [i for i, t in enumerate(trilhas) if self.rastreador.precisa_codificar(t)]
+        if pendentes:
+            novos = reconhecer(pendentes)
+            for i, resultado in zip(pendentes, novos):
+                self.rastreador.registrar_resultado(trilhas[i], resultado)
+
+        resultados = [self.rastreador.resultado_em_cache(t) for t in trilhas]
+        self.frames_processados += 1
+        self.resultados_prontos.emit(resultados)
+
+    def parar(self):
+        """Encerra o worker e aguarda o fim da thread"""
+        with self._condicao:
+            self._executando = False
+            self._frame = None
+            self._condicao.notify()
+        self.wait()
+
+        if self.motor is not None:
+            self.motor.parar()
@@ -0,0 +1,161 @@
+"""
+Modelo de Dados da Tabela de Registros
+Modelo virtualizado: guarda os registros em colunas compactas e formata as
+células apenas quando a tabela as desenha
+"""
+
+import sys
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+
+# Posições dos campos nas linhas vindas do banco
+CAMPO_DATA_HORA = 0
+CAMPO_NOME = 1
+CAMPO_MATRICULA = 2
+CAMPO_TURMA = 3
+CAMPO_TIPO = 4
+CAMPO_CONFIANCA = 5
+CAMPO_MANUAL = 6
+
+
+class ModeloRegistros(QAbstractTableModel):
+    """
+    Modelo da tabela de registros com carga incremental
+
+    Em vez de um QTableWidgetItem por célula, cada coluna é guardada em uma
+    estrutura compacta (listas de texto e arrays numéricos) e o texto, a cor
+    e o alinhamento de cada célula são calculados em data() somente para as
+    linhas visíveis. As linhas são lidas da fonte em lotes por fetchMore,
+    conforme a tabela é rolada.
+    """
+
+    COLUNAS = ["Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança", "Modo"]
+    TAMANHO_LOTE = 500
+
+    COR_ENTRADA = QColor("#27ae60")
+    COR_SAIDA = QColor("#e74c3c")
+    COR_MANUAL = QColor("#f39c12")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fonte: Optional[Iterator[tuple]] = None
+        self._mostrar_data = False
+        self._limpar_colunas()
+
+    def _limpar_colunas(self):
+        """Descarta as linhas carregadas"""
+        self._horarios = []  # "HH:MM:SS" ou "dd/mm HH:MM:SS"
+        self._nomes = []
+        self._matriculas = []
+        self._turmas = []  # Textos repetidos compartilham o mesmo objeto (sys.intern)
+        self._entrada = bytearray()  # 1 = entrada, 0 = saída
+        self._confiancas = array('f')
+        self._manual = bytearray()
+
+    def carregar(self, linhas: Iterable[tuple], mostrar_data: bool = False):
+        """
+        Substitui o conteúdo do modelo por uma nova fonte de linhas
+
+        Args:
+            linhas: Linhas (data_hora, nome, matrícula, turma, tipo, confiança,
+                manual, ...), lidas sob demanda em lotes de TAMANHO_LOTE
+            mostrar_data: Exibe dia e mês junto do horário (períodos de vários dias)
+        """
+        self.beginResetModel()
+        self._limpar_colunas()
+        self._fonte = iter(linhas)
+        self._mostrar_data = mostrar_data
+        self.endResetModel()
+
+    # ==================== CARGA INCREMENTAL ====================
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._fonte is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fonte is None:
+            return
+
+        lote = list(islice(self._fonte, self.TAMANHO_LOTE))
+        if len(lote) < self.TAMANHO_LOTE:
+            self._fonte = None
+        if not lote:
+            return
+
+        inicio = len(self._nomes)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lote) - 1)
+        for linha in lote:
+            data_hora = str(linha[CAMPO_DATA_HORA] or "")
+            if self._mostrar_data and data_hora:
+                self._horarios.append(f"{data_hora[8:10]}/{data_hora[5:7]} {data_hora[11:19]}")
+            else:
+                self._horarios.append(data_hora[11:19])
+            self._nomes.append(linha[CAMPO_NOME] or "")
+            self._matriculas.append(linha[CAMPO_MATRICULA] or "")
+            self._turmas.append(sys.intern(linha[CAMPO_TURMA] or ""))
+            self._entrada.append(1 if linha[CAMPO_TIPO] == "entrada" else 0)
+            self._confiancas.append(linha[CAMPO_CONFIANCA] or 0.0)
+            self._manual.append(1 if linha[CAMPO_MANUAL] else 0)
+        self.endInsertRows()
+
+    def carregar_tudo(self):
+        """Lê da fonte todas as linhas restantes"""
+        while self.canFetchMore():
+            self.fetchMore()
+
+    # ==================== INTERFACE DO MODELO ====================
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._nomes)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUNAS[section]
+        return None
+
+    def eh_entrada(self, linha: int) -> bool:
+        """Indica se a linha é um registro de entrada"""
+        return bool(self._entrada[linha])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        linha, coluna = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if coluna == 0:
+                return self._horarios[linha] or "--:--:--"
+            if coluna == 1:
+                return self._nomes[linha] or "---"
+            if coluna == 2:
+                return self._matriculas[linha] or "---"
+            if coluna == 3:
+                return self._turmas[linha] or "---"
+            if coluna == 4:
+                return "ENTRADA" if self._entrada[linha] else "SAÍDA"
+            if coluna == 5:
+                return f"{self._confiancas[linha]:.1f}%"
+            if coluna == 6:
+                return "Manual" if self._manual[linha] else "Auto"
+
+        elif role == Qt.TextAlignmentRole:
+            if coluna == 1:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+            return int(Qt.AlignCenter)
+
+        elif role == Qt.ForegroundRole:
+            if coluna == 4:
+                return self.COR_ENTRADA if self._entrada[linha] else self.COR_SAIDA
+            if coluna == 6 and self._manual[linha]:
+                return self.COR_MANUAL
+
+        return None
+
@@ -4,36 +4,19 @@ Interface para visualizar histórico de entradas e saídas
 """
 
 import os
-import csv
-from datetime import date, datetime
+from datetime import date
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QFrame, QTableWidget, QTableWidgetItem,
-    QHeaderView, QDateEdit, QComboBox, QMessageBox, QFileDialog, QMenu
+    QLabel, QPushButton, QFrame, QTableView,
+    QHeaderView, QDateEdit, QComboBox, QMessageBox, QFileDialog, QMenu, QLineEdit,
+    QProgressDialog
 )
-from PyQt5.QtCore import Qt, QDate
-from PyQt5.QtGui import QColor
-
-from database.models import Database
+from PyQt5.QtCore import Qt, QDate, QTimer
+from database.models import Database, FiltroRegistros
 from core.config import get_config
-
-# Importações opcionais para exportação
-try:
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4, landscape
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import mm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+from core.relatorios import InfoRelatorio, descrever_periodo, OPENPYXL_AVAILABLE, REPORTLAB_AVAILABLE
+from .exportacao_worker import ExportacaoWorker
+from .registros_model import ModeloRegistros
 
 
 class RegistrosWindow(QDialog):
@@ -43,6 +26,7 @@ class RegistrosWindow(QDialog):
         super().__init__(parent)
 
         self.db = db
+        self.exportacao = None  # ExportacaoWorker em andamento
 
         # Configura interface
         self._setup_ui()
@@ -76,15 +60,23 @@ class RegistrosWindow(QDialog):
         filtros_layout = QHBoxLayout()
         filtros_layout.setSpacing(10)
 
-        # Data
-        filtros_layout.addWidget(QLabel("Data:"))
+        # Período
+        filtros_layout.addWidget(QLabel("De:"))
         self.date_edit = QDateEdit()
         self.date_edit.setDate(QDate.currentDate())
         self.date_edit.setCalendarPopup(True)
         self.date_edit.setDisplayFormat("dd/MM/yyyy")
-        self.date_edit.dateChanged.connect(self._carregar_registros)
+        self.date_edit.dateChanged.connect(self._on_data_inicio_alterada)
         filtros_layout.addWidget(self.date_edit)
 
+        filtros_layout.addWidget(QLabel("Até:"))
+        self.date_fim_edit = QDateEdit()
+        self.date_fim_edit.setDate(QDate.currentDate())
+        self.date_fim_edit.setCalendarPopup(True)
+        self.date_fim_edit.setDisplayFormat("dd/MM/yyyy")
+        self.date_fim_edit.dateChanged.connect(self._on_data_fim_alterada)
+        filtros_layout.addWidget(self.date_fim_edit)
+
         # Tipo
         filtros_layout.addWidget(QLabel("Tipo:"))
         self.tipo_combo = QComboBox()
@@ -92,10 +84,38 @@ class RegistrosWindow(QDialog):
         self.tipo_combo.currentIndexChanged.connect(self._aplicar_filtro)
         filtros_layout.addWidget(self.tipo_combo)
 
+        # Turma
+        filtros_layout.addWidget(QLabel("Turma:"))
+        self.turma_combo = QComboBox()
+        self.turma_combo.addItem("Todas")
+        self.turma_combo.addItems(self.db.listar_turmas())
+        self.turma_combo.currentIndexChanged.connect(self._aplicar_filtro)
+        filtros_layout.addWidget(self.turma_combo)
+
+        # Modo
+        filtros_layout.addWidget(QLabel("Modo:"))
+        self.modo_combo = QComboBox()
+        self.modo_combo.addItems(["Todos", "Automático", "Manual"])
+        self.modo_combo.currentIndexChanged.connect(self._aplicar_filtro)
+        filtros_layout.addWidget(self.modo_combo)
+
         header_layout.addLayout(filtros_layout)
 
         main_layout.addWidget(header)
 
+        # Busca por nome ou matrícula (consulta após uma pausa na digitação)
+        self.busca_edit = QLineEdit()
+        self.busca_edit.setObjectName("buscaRegistros")
+        self.busca_edit.setPlaceholderText("Buscar por nome ou matrícula...")
+        self.busca_edit.setClearButtonEnabled(True)
+        main_layout.addWidget(self.busca_edit)
+
+        self._timer_busca = QTimer(self)
+        self._timer_busca.setSingleShot(True)
+        self._timer_busca.setInterval(300)
+        self._timer_busca.timeout.connect(self._aplicar_filtro)
+        self.busca_edit.textChanged.connect(self._timer_busca.start)
+
         # ==================== RESUMO ====================
         resumo_frame = QFrame()
         resumo_frame.setObjectName("resumoFrame")
@@ -120,13 +140,18 @@ class RegistrosWindow(QDialog):
 
         main_layout.addWidget(resumo_frame)
 
+        # Totais por turma (entradas / saídas)
+        self.turmas_label = QLabel("")
+        self.turmas_label.setObjectName("resumoTurmas")
+        self.turmas_label.setWordWrap(True)
+        main_layout.addWidget(self.turmas_label)
+
         # ==================== TABELA ====================
-        self.tabela = QTableWidget()
+        self.modelo = ModeloRegistros(self)
+
+        self.tabela = QTableView()
         self.tabela.setObjectName("tabelaRegistros")
-        self.tabela.setColumnCount(7)
-        self.tabela.setHorizontalHeaderLabels([
-            "Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança", "Modo"
-        ])
+        self.tabela.setModel(self.modelo)
 
         # Configura colunas
         header = self.tabela.horizontalHeader()
@@ -147,10 +172,10 @@ class RegistrosWindow(QDialog):
 
         # Configurações da tabela
         self.tabela.setAlternatingRowColors(True)
-        self.tabela.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tabela.setSelectionMode(QTableWidget.SingleSelection)
+        self.tabela.setSelectionBehavior(QTableView.SelectRows)
+        self.tabela.setSelectionMode(QTableView.SingleSelection)
         self.tabela.verticalHeader().setVisible(False)
-        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabela.setEditTriggers(QTableView.NoEditTriggers)
 
         main_layout.addWidget(self.tabela)
 
@@ -180,92 +205,76 @@ class RegistrosWindow(QDialog):
         main_layout.addLayout(botoes_layout)
 
     def _carregar_registros(self):
-        """Carrega os registros da data selecionada"""
-        data_selecionada = self.date_edit.date().toPyDate()
+        """Carrega os registros do período selecionado com os filtros atuais"""
+        self._aplicar_filtro()
 
-        # Busca registros do banco
-        self.registros = self.db.listar_registros_do_dia(data_selecionada)
+    def _on_data_inicio_alterada(self, data: QDate):
+        """Mantém o fim do período depois do início"""
+        if self.date_fim_edit.date() < data:
+            self.date_fim_edit.blockSignals(True)
+            self.date_fim_edit.setDate(data)
+            self.date_fim_edit.blockSignals(False)
+        self._carregar_registros()
 
-        # Aplica filtro e atualiza tabela
-        self._aplicar_filtro()
+    def _on_data_fim_alterada(self, data: QDate):
+        """Mantém o início do período antes do fim"""
+        if self.date_edit.date() > data:
+            self.date_edit.blockSignals(True)
+            self.date_edit.setDate(data)
+            self.date_edit.blockSignals(False)
+        self._carregar_registros()
+
+    def _periodo(self):
+        """Datas de início e fim do período selecionado"""
+        return self.date_edit.date().toPyDate(), self.date_fim_edit.date().toPyDate()
+
+    def _tipo_selecionado(self):
+        """Tipo escolhido no filtro ("entrada", "saida" ou None para todos)"""
+        return {"Entrada": "entrada", "Saída": "saida"}.get(self.tipo_combo.currentText())
+
+    def _filtro_atual(self) -> FiltroRegistros:
+        """Monta o filtro de consulta a partir dos controles da janela"""
+        turma = self.turma_combo.currentText()
+        data_inicio, data_fim = self._periodo()
+        return FiltroRegistros(
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+            tipo=self._tipo_selecionado(),
+            turma=None if self.turma_combo.currentIndex() == 0 else turma,
+            manual={"Automático": False, "Manual": True}.get(self.modo_combo.currentText()),
+            busca=self.busca_edit.text().strip()
+        )
 
     def _aplicar_filtro(self):
-        """Aplica filtro de tipo aos registros"""
-        tipo_filtro = self.tipo_combo.currentText()
-
-        # Filtra registros
-        if tipo_filtro == "Todos":
-            registros_filtrados = self.registros
-        elif tipo_filtro == "Entrada":
-            registros_filtrados = [r for r in self.registros if r.tipo == "entrada"]
-        else:
-            registros_filtrados = [r for r in self.registros if r.tipo == "saida"]
+        """Consulta o banco com os filtros atuais"""
+        self._timer_busca.stop()
+        filtro = self._filtro_atual()
 
-        # Atualiza tabela
-        self._atualizar_tabela(registros_filtrados)
+        # O filtro é aplicado no SQL e as páginas são lidas conforme a tabela é rolada
+        varios_dias = filtro.data_inicio != filtro.data_fim
+        self.modelo.carregar(self.db.iterar_registros(filtro, ModeloRegistros.TAMANHO_LOTE),
+                             mostrar_data=varios_dias)
+        self.tabela.setColumnWidth(0, 130 if varios_dias else 80)
 
         # Atualiza resumo
-        self._atualizar_resumo()
-
-    def _atualizar_tabela(self, registros):
-        """Atualiza a tabela com os registros"""
-        self.tabela.setRowCount(len(registros))
-
-        for row, registro in enumerate(registros):
-            # Horário
-            horario = registro.data_hora.strftime("%H:%M:%S") if registro.data_hora else "--:--:--"
-            item_horario = QTableWidgetItem(horario)
-            item_horario.setTextAlignment(Qt.AlignCenter)
-            self.tabela.setItem(row, 0, item_horario)
-
-            # Nome
-            item_nome = QTableWidgetItem(registro.aluno_nome or "---")
-            self.tabela.setItem(row, 1, item_nome)
-
-            # Matrícula
-            item_matricula = QTableWidgetItem(registro.aluno_matricula or "---")
-            item_matricula.setTextAlignment(Qt.AlignCenter)
-            self.tabela.setItem(row, 2, item_matricula)
-
-            # Turma
-            item_turma = QTableWidgetItem(registro.aluno_turma or "---")
-            item_turma.setTextAlignment(Qt.AlignCenter)
-            self.tabela.setItem(row, 3, item_turma)
-
-            # Tipo
-            tipo_texto = "ENTRADA" if registro.tipo == "entrada" else "SAÍDA"
-            item_tipo = QTableWidgetItem(tipo_texto)
-            item_tipo.setTextAlignment(Qt.AlignCenter)
-            if registro.tipo == "entrada":
-                item_tipo.setForeground(QColor("#27ae60"))
-            else:
-                item_tipo.setForeground(QColor("#e74c3c"))
-            self.tabela.setItem(row, 4, item_tipo)
-
-            # Confiança
-            confianca_texto = f"{registro.confianca:.1f}%"
-            item_confianca = QTableWidgetItem(confianca_texto)
-            item_confianca.setTextAlignment(Qt.AlignCenter)
-            self.tabela.setItem(row, 5, item_confianca)
-
-            # Modo
-            modo_texto = "Manual" if registro.manual else "Auto"
-            item_modo = QTableWidgetItem(modo_texto)
-            item_modo.setTextAlignment(Qt.AlignCenter)
-            if registro.manual:
-                item_modo.setForeground(QColor("#f39c12"))
-            self.tabela.setItem(row, 6, item_modo)
-
-    def _atualizar_resumo(self):
-        """Atualiza o resumo de registros"""
-        total = len(self.registros)
-        entradas = len([r for r in self.registros if r.tipo == "entrada"])
-        saidas = len([r for r in self.registros if r.tipo == "saida"])
-
-        self.total_label.setText(f"Total: {total}")
+        self._atualizar_resumo(filtro)
+
+    def _atualizar_resumo(self, filtro: FiltroRegistros):
+        """Atualiza o resumo de registros (uma única consulta agregada)"""
+        por_turma = self.db.resumo_registros(filtro)
+        entradas = sum(t['entrada'] for t in por_turma.values())
+        saidas = sum(t['saida'] for t in por_turma.values())
+
+        self.total_label.setText(f"Total: {entradas + saidas}")
         self.entradas_label.setText(f"Entradas: {entradas}")
         self.saidas_label.setText(f"Saídas: {saidas}")
 
+        self.turmas_label.setText("   ".join(
+            f"{turma or '---'}: {totais['entrada']} / {totais['saida']}"
+            for turma, totais in sorted(por_turma.items())
+        ))
+        self.turmas_label.setToolTip("Entradas / saídas por turma")
+
     def _mostrar_menu_exportar(self):
         """Mostra menu com opções de exportação"""
         menu = QMenu(self)
@@ -299,390 +308,141 @@ class RegistrosWindow(QDialog):
         else:
             action_excel.triggered.connect(self._exportar_excel)
 
-        # Opção PDF
+        # Opções PDF
         action_pdf = menu.addAction("📑 Exportar PDF")
+        action_pdf_turma = menu.addAction("📑 Exportar PDF por turma")
         if not REPORTLAB_AVAILABLE:
             action_pdf.setEnabled(False)
             action_pdf.setText("📑 PDF (instale reportlab)")
+            action_pdf_turma.setVisible(False)
         else:
-            action_pdf.triggered.connect(self._exportar_pdf)
+            action_pdf.triggered.connect(lambda: self._exportar_pdf())
+            action_pdf_turma.triggered.connect(lambda: self._exportar_pdf(por_turma=True))
 
         # Mostra o menu abaixo do botão
         menu.exec_(self.btn_exportar.mapToGlobal(self.btn_exportar.rect().bottomLeft()))
 
-    def _get_registros_para_exportar(self):
-        """Retorna os registros filtrados para exportação"""
-        tipo_filtro = self.tipo_combo.currentText()
+    def _descricao_periodo(self) -> str:
+        """Período selecionado no formato dos títulos dos relatórios"""
+        return descrever_periodo(*self._periodo())
+
+    def _nome_arquivo_padrao(self, extensao: str, por_turma: bool = False) -> str:
+        """Nome sugerido para o arquivo exportado"""
+        data_inicio, data_fim = self._periodo()
+        nome = f"registros_{data_inicio.isoformat()}"
+        if data_inicio != data_fim:
+            nome += f"_a_{data_fim.isoformat()}"
+        if por_turma:
+            nome += "_por_turma"
+        return f"{nome}.{extensao}"
+
+    def _info_relatorio(self) -> InfoRelatorio:
+        """Cabeçalho e rodapé dos relatórios exportados"""
+        config = get_config()
+        data_inicio, data_fim = self._periodo()
+        return InfoRelatorio(
+            escola=config.nome_completo_escola,
+            titulo=f"Registros de Acesso - {self._descricao_periodo()}",
+            rodape=[f"Gerado por: Guardião Escolar v{config.config.versao}", config.creditos_desenvolvedor],
+            varios_dias=data_inicio != data_fim
+        )
 
-        if tipo_filtro == "Todos":
-            return self.registros
-        elif tipo_filtro == "Entrada":
-            return [r for r in self.registros if r.tipo == "entrada"]
-        else:
-            return [r for r in self.registros if r.tipo == "saida"]
+    def _iniciar_exportacao(self, formato: str, titulo: str, filtro_arquivos: str, por_turma: bool = False):
+        """
+        Pergunta o arquivo de destino e exporta os registros filtrados em segundo plano
 
-    def _exportar_csv(self):
-        """Exporta registros para arquivo CSV"""
-        registros = self._get_registros_para_exportar()
-        config = get_config()
+        Args:
+            formato: Chave de EXPORTADORES ("csv", "xlsx" ou "pdf")
+            titulo: Título do diálogo de salvar
+            filtro_arquivos: Filtro de extensões do diálogo de salvar
+            por_turma: Relatório agrupado por turma (apenas PDF)
+        """
+        if self.exportacao is not None:
+            return
 
-        if not registros:
+        filtro = self._filtro_atual()
+        total = self.db.contar_registros(filtro)
+        if total == 0:
             QMessageBox.warning(self, "Aviso", "Não há registros para exportar.")
             return
 
-        # Diálogo para salvar arquivo
-        data_str = self.date_edit.date().toString("yyyy-MM-dd")
-        nome_padrao = f"registros_{data_str}.csv"
-
         arquivo, _ = QFileDialog.getSaveFileName(
-            self, "Salvar CSV", nome_padrao, "Arquivos CSV (*.csv)"
+            self, titulo, self._nome_arquivo_padrao(formato, por_turma), filtro_arquivos
         )
 
         if not arquivo:
             return
 
-        try:
-            with open(arquivo, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f, delimiter=';')
-
-                # Informações da escola
-                writer.writerow([config.nome_completo_escola])
-                writer.writerow([f"Registros de Acesso - {self.date_edit.date().toString('dd/MM/yyyy')}"])
-                writer.writerow([])  # Linha em branco
-
-                # Cabeçalho
-                writer.writerow(["Data", "Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança (%)", "Modo"])
-
-                # Dados
-                for reg in registros:
-                    data = reg.data_hora.strftime("%d/%m/%Y") if reg.data_hora else ""
-                    horario = reg.data_hora.strftime("%H:%M:%S") if reg.data_hora else ""
-                    tipo = "Entrada" if reg.tipo == "entrada" else "Saída"
-                    modo = "Manual" if reg.manual else "Automático"
-
-                    writer.writerow([
-                        data,
-                        horario,
-                        reg.aluno_nome or "",
-                        reg.aluno_matricula or "",
-                        reg.aluno_turma or "",
-                        tipo,
-                        f"{reg.confianca:.1f}",
-                        modo
-                    ])
-
-                # Rodapé com créditos
-                writer.writerow([])
-                writer.writerow([f"Gerado por: Guardião Escolar v{config.config.versao}"])
-                writer.writerow([config.creditos_desenvolvedor])
-
-            QMessageBox.information(self, "Sucesso", f"Arquivo CSV exportado com sucesso!\n\n{arquivo}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar CSV:\n{str(e)}")
+        self.exportacao = ExportacaoWorker(self.db, filtro, formato, arquivo, self._info_relatorio(), self,
+                                           por_turma=por_turma)
 
-    def _exportar_excel(self):
-        """Exporta registros para arquivo Excel"""
-        if not OPENPYXL_AVAILABLE:
-            QMessageBox.warning(self, "Aviso", "Biblioteca openpyxl não instalada.\n\nExecute: pip install openpyxl")
-            return
-
-        registros = self._get_registros_para_exportar()
-        config = get_config()
+        self.progresso_exportacao = QProgressDialog(
+            f"Exportando {total} registros...", "Cancelar", 0, total, self
+        )
+        self.progresso_exportacao.setWindowTitle("Exportação")
+        self.progresso_exportacao.setWindowModality(Qt.WindowModal)
+        self.progresso_exportacao.setMinimumDuration(500)
+        self.progresso_exportacao.canceled.connect(self.exportacao.cancelar)
 
-        if not registros:
-            QMessageBox.warning(self, "Aviso", "Não há registros para exportar.")
-            return
+        self.exportacao.progresso.connect(
+            lambda feitas, _total: self.progresso_exportacao.setValue(min(feitas, total))
+        )
+        self.exportacao.concluida.connect(self._on_exportacao_concluida)
+        self.exportacao.falhou.connect(self._on_exportacao_falhou)
+        self.exportacao.cancelada.connect(self._on_exportacao_cancelada)
+        self.exportacao.finished.connect(self._on_exportacao_finalizada)
+
+        self.btn_exportar.setEnabled(False)
+        self.exportacao.start()
+
+    def _on_exportacao_concluida(self, arquivo: str, total: int):
+        """Exportação terminou com sucesso"""
+        self.progresso_exportacao.reset()
+        QMessageBox.information(
+            self, "Sucesso", f"{total} registros exportados com sucesso!\n\n{arquivo}"
+        )
 
-        # Diálogo para salvar arquivo
-        data_str = self.date_edit.date().toString("yyyy-MM-dd")
-        nome_padrao = f"registros_{data_str}.xlsx"
+    def _on_exportacao_falhou(self, mensagem: str):
+        """Exportação terminou com erro"""
+        self.progresso_exportacao.reset()
+        QMessageBox.critical(self, "Erro", f"Erro ao exportar:\n{mensagem}")
 
-        arquivo, _ = QFileDialog.getSaveFileName(
-            self, "Salvar Excel", nome_padrao, "Arquivos Excel (*.xlsx)"
-        )
+    def _on_exportacao_cancelada(self):
+        """Exportação interrompida pelo usuário"""
+        self.progresso_exportacao.reset()
 
-        if not arquivo:
-            return
+    def _on_exportacao_finalizada(self):
+        """Libera a janela para uma nova exportação"""
+        self.exportacao.deleteLater()
+        self.exportacao = None
+        self.btn_exportar.setEnabled(True)
 
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Registros"
-
-            # Estilos
-            header_font = Font(bold=True, color="FFFFFF", size=11)
-            header_fill = PatternFill(start_color="E94560", end_color="E94560", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            cell_alignment = Alignment(horizontal="center", vertical="center")
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-            entrada_fill = PatternFill(start_color="D5F5E3", end_color="D5F5E3", fill_type="solid")
-            saida_fill = PatternFill(start_color="FADBD8", end_color="FADBD8", fill_type="solid")
-
-            # Nome da escola
-            ws.merge_cells('A1:H1')
-            ws['A1'] = config.nome_completo_escola
-            ws['A1'].font = Font(bold=True, size=16, color="E94560")
-            ws['A1'].alignment = Alignment(horizontal="center")
-
-            # Título
-            data_formatada = self.date_edit.date().toString("dd/MM/yyyy")
-            ws.merge_cells('A2:H2')
-            ws['A2'] = f"Registros de Acesso - {data_formatada}"
-            ws['A2'].font = Font(bold=True, size=12)
-            ws['A2'].alignment = Alignment(horizontal="center")
-
-            # Cabeçalho
-            headers = ["Data", "Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança (%)", "Modo"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = thin_border
-
-            # Dados
-            for row_idx, reg in enumerate(registros, 5):
-                data = reg.data_hora.strftime("%d/%m/%Y") if reg.data_hora else ""
-                horario = reg.data_hora.strftime("%H:%M:%S") if reg.data_hora else ""
-                tipo = "Entrada" if reg.tipo == "entrada" else "Saída"
-                modo = "Manual" if reg.manual else "Automático"
-
-                row_data = [
-                    data,
-                    horario,
-                    reg.aluno_nome or "",
-                    reg.aluno_matricula or "",
-                    reg.aluno_turma or "",
-                    tipo,
-                    reg.confianca,
-                    modo
-                ]
-
-                row_fill = entrada_fill if reg.tipo == "entrada" else saida_fill
-
-                for col_idx, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.alignment = cell_alignment
-                    cell.border = thin_border
-                    cell.fill = row_fill
-
-            # Ajusta largura das colunas
-            ws.column_dimensions['A'].width = 12
-            ws.column_dimensions['B'].width = 10
-            ws.column_dimensions['C'].width = 30
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 10
-            ws.column_dimensions['F'].width = 10
-            ws.column_dimensions['G'].width = 14
-            ws.column_dimensions['H'].width = 12
-
-            # Resumo
-            total = len(registros)
-            entradas = len([r for r in registros if r.tipo == "entrada"])
-            saidas = len([r for r in registros if r.tipo == "saida"])
-            linha_resumo = len(registros) + 6
-
-            ws.cell(row=linha_resumo, column=1, value="Resumo:").font = Font(bold=True)
-            ws.cell(row=linha_resumo + 1, column=1, value=f"Total: {total}")
-            ws.cell(row=linha_resumo + 2, column=1, value=f"Entradas: {entradas}")
-            ws.cell(row=linha_resumo + 3, column=1, value=f"Saídas: {saidas}")
-
-            # Créditos do desenvolvedor
-            linha_creditos = linha_resumo + 5
-            ws.merge_cells(f'A{linha_creditos}:H{linha_creditos}')
-            ws.cell(row=linha_creditos, column=1, value=f"Gerado por: Guardião Escolar v{config.config.versao}")
-            ws.cell(row=linha_creditos, column=1).font = Font(italic=True, size=9, color="666666")
-            ws.cell(row=linha_creditos, column=1).alignment = Alignment(horizontal="center")
-
-            ws.merge_cells(f'A{linha_creditos + 1}:H{linha_creditos + 1}')
-            ws.cell(row=linha_creditos + 1, column=1, value=config.creditos_desenvolvedor)
-            ws.cell(row=linha_creditos + 1, column=1).font = Font(italic=True, size=9, color="3498DB")
-            ws.cell(row=linha_creditos + 1, column=1).alignment = Alignment(horizontal="center")
-
-            wb.save(arquivo)
-            QMessageBox.information(self, "Sucesso", f"Arquivo Excel exportado com sucesso!\n\n{arquivo}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar Excel:\n{str(e)}")
-
-    def _exportar_pdf(self):
-        """Exporta registros para arquivo PDF"""
-        if not REPORTLAB_AVAILABLE:
-            QMessageBox.warning(self, "Aviso", "Biblioteca reportlab não instalada.\n\nExecute: pip install reportlab")
-            return
+    def done(self, resultado):
+        """Interrompe uma exportação em andamento antes de fechar a janela"""
+        if self.exportacao is not None:
+            self.exportacao.cancelar()
+            self.exportacao.wait()
+        super().done(resultado)
 
-        registros = self._get_registros_para_exportar()
-        config = get_config()
+    def _exportar_csv(self):
+        """Exporta registros para arquivo CSV (em streaming, qualquer período)"""
+        self._iniciar_exportacao("csv", "Salvar CSV", "Arquivos CSV (*.csv)")
 
-        if not registros:
-            QMessageBox.warning(self, "Aviso", "Não há registros para exportar.")
+    def _exportar_excel(self):
+        """Exporta registros para arquivo Excel (planilha write-only, qualquer período)"""
+        if not OPENPYXL_AVAILABLE:
+            QMessageBox.warning(self, "Aviso", "Biblioteca openpyxl não instalada.\n\nExecute: pip install openpyxl")
             return
 
-        # Diálogo para salvar arquivo
-        data_str = self.date_edit.date().toString("yyyy-MM-dd")
-        nome_padrao = f"registros_{data_str}.pdf"
+        self._iniciar_exportacao("xlsx", "Salvar Excel", "Arquivos Excel (*.xlsx)")
 
-        arquivo, _ = QFileDialog.getSaveFileName(
-            self, "Salvar PDF", nome_padrao, "Arquivos PDF (*.pdf)"
-        )
-
-        if not arquivo:
+    def _exportar_pdf(self, por_turma: bool = False):
+        """Exporta registros para arquivo PDF (páginas desenhadas em segundo plano)"""
+        if not REPORTLAB_AVAILABLE:
+            QMessageBox.warning(self, "Aviso", "Biblioteca reportlab não instalada.\n\nExecute: pip install reportlab")
             return
 
-        try:
-            # Cria documento PDF em landscape para caber mais colunas
-            doc = SimpleDocTemplate(
-                arquivo,
-                pagesize=landscape(A4),
-                rightMargin=15*mm,
-                leftMargin=15*mm,
-                topMargin=15*mm,
-                bottomMargin=15*mm
-            )
-
-            elements = []
-            styles = getSampleStyleSheet()
-
-            # Nome da escola
-            escola_style = ParagraphStyle(
-                'Escola',
-                parent=styles['Heading1'],
-                fontSize=20,
-                textColor=colors.HexColor('#E94560'),
-                alignment=1,  # Center
-                spaceAfter=5
-            )
-            elements.append(Paragraph(config.nome_completo_escola, escola_style))
-
-            # Título
-            data_formatada = self.date_edit.date().toString("dd/MM/yyyy")
-            titulo_style = ParagraphStyle(
-                'Titulo',
-                parent=styles['Heading2'],
-                fontSize=14,
-                textColor=colors.HexColor('#333333'),
-                alignment=1,  # Center
-                spaceAfter=20
-            )
-            elements.append(Paragraph(f"Registros de Acesso - {data_formatada}", titulo_style))
-
-            # Resumo
-            total = len(registros)
-            entradas = len([r for r in registros if r.tipo == "entrada"])
-            saidas = len([r for r in registros if r.tipo == "saida"])
-
-            resumo_style = ParagraphStyle(
-                'Resumo',
-                parent=styles['Normal'],
-                fontSize=11,
-                alignment=1,
-                spaceAfter=15
-            )
-            elements.append(Paragraph(
-                f"<b>Total:</b> {total} registros | <b>Entradas:</b> {entradas} | <b>Saídas:</b> {saidas}",
-                resumo_style
-            ))
-            elements.append(Spacer(1, 10))
-
-            # Tabela de dados
-            table_data = [["Horário", "Nome", "Matrícula", "Turma", "Tipo", "Confiança", "Modo"]]
-
-            for reg in registros:
-                horario = reg.data_hora.strftime("%H:%M:%S") if reg.data_hora else "--:--:--"
-                tipo = "Entrada" if reg.tipo == "entrada" else "Saída"
-                modo = "Manual" if reg.manual else "Auto"
-
-                table_data.append([
-                    horario,
-                    reg.aluno_nome or "---",
-                    reg.aluno_matricula or "---",
-                    reg.aluno_turma or "---",
-                    tipo,
-                    f"{reg.confianca:.1f}%",
-                    modo
-                ])
-
-            # Cria tabela com larguras proporcionais
-            col_widths = [60, 180, 80, 60, 60, 60, 50]
-            table = Table(table_data, colWidths=col_widths)
-
-            # Estilo da tabela
-            table_style = TableStyle([
-                # Cabeçalho
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E94560')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-
-                # Corpo
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
-                ('ALIGN', (1, 1), (1, -1), 'LEFT'),  # Nome alinhado à esquerda
-                ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-
-                # Bordas
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#3a3a5c')),
-            ])
-
-            # Cores alternadas e cor por tipo
-            for i, reg in enumerate(registros, 1):
-                if reg.tipo == "entrada":
-                    bg_color = colors.HexColor('#D5F5E3')
-                else:
-                    bg_color = colors.HexColor('#FADBD8')
-                table_style.add('BACKGROUND', (0, i), (-1, i), bg_color)
-
-            table.setStyle(table_style)
-            elements.append(table)
-
-            # Rodapé
-            elements.append(Spacer(1, 20))
-            rodape_style = ParagraphStyle(
-                'Rodape',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.gray,
-                alignment=1
-            )
-            agora = datetime.now().strftime("%d/%m/%Y às %H:%M")
-            elements.append(Paragraph(f"Relatório gerado em {agora}", rodape_style))
-
-            # Créditos do desenvolvedor
-            creditos_style = ParagraphStyle(
-                'Creditos',
-                parent=styles['Normal'],
-                fontSize=9,
-                textColor=colors.HexColor('#3498db'),
-                alignment=1,
-                spaceBefore=10
-            )
-            elements.append(Paragraph(
-                f"<b>Guardião Escolar v{config.config.versao}</b><br/>"
-                f"{config.creditos_desenvolvedor}",
-                creditos_style
-            ))
-
-            # Gera PDF
-            doc.build(elements)
-            QMessageBox.information(self, "Sucesso", f"Arquivo PDF exportado com sucesso!\n\n{arquivo}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao exportar PDF:\n{str(e)}")
+        self._iniciar_exportacao("pdf", "Salvar PDF", "Arquivos PDF (*.pdf)", por_turma)
 
     def _get_stylesheet(self):
         """Retorna o stylesheet da janela"""
@@ -715,6 +475,11 @@ class RegistrosWindow(QDialog):
                 font-weight: bold;
             }
 
+            QLabel#resumoTurmas {
+                color: #a0a0a0;
+                font-size: 12px;
+            }
+
             QLabel#resumoEntrada {
                 color: #27ae60;
                 font-size: 16px;
@@ -751,6 +516,19 @@ class RegistrosWindow(QDialog):
                 padding-right: 10px;
             }
 
+            QLineEdit#buscaRegistros {
+                background-color: #0f0f1a;
+                color: white;
+                border: 1px solid #3a3a5c;
+                border-radius: 5px;
+                padding: 8px;
+                font-size: 14px;
+            }
+
+            QLineEdit#buscaRegistros:focus {
+                border-color: #e94560;
+            }
+
             QComboBox {
                 background-color: #0f0f1a;
                 color: white;
@@ -776,7 +554,7 @@ class RegistrosWindow(QDialog):
                 selection-background-color: #e94560;
             }
 
-            QTableWidget {
+            QTableView {
                 background-color: #16213e;
                 color: #ffffff;
                 border: 1px solid #3a3a5c;
@@ -785,15 +563,15 @@ class RegistrosWindow(QDialog):
                 font-size: 13px;
             }
 
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
             }
 
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e94560;
             }
 
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #1a1a2e;
             }
 